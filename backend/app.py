@@ -8,7 +8,10 @@ from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
 
-from .db import db
+from . import compression, hashing, http_cache, json_provider, metrics, order_journal, sessions, sqlite_tuning
+from .db import db, ensure_indexes as ensure_sql_indexes
+from .menu_cache import warm_menu_cache
+from .mongo import ensure_indexes
 from .routes.auth import auth_bp
 from .routes.chat import chat_bp
 from .routes.feedback import feedback_bp
@@ -32,17 +35,27 @@ def create_app() -> Flask:
     load_dotenv(dotenv_path=env_path)
 
     app = Flask(__name__)
+    json_provider.init_app(app)
 
     api_prefix = os.getenv("API_PREFIX", "/api").rstrip("/")
     database_url = os.getenv("DATABASE_URL", _default_sqlite_url())
     app.config["SQLALCHEMY_DATABASE_URI"] = database_url
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = sqlite_tuning.engine_options(database_url)
 
     cors_origins = os.getenv("CORS_ORIGINS", "*")
     origins = "*" if cors_origins.strip() == "*" else [o.strip() for o in cors_origins.split(",") if o.strip()]
     CORS(app, resources={rf"{api_prefix}/*": {"origins": origins}})
 
     db.init_app(app)
+    sqlite_tuning.init_app(app)
+    sessions.init_app(app)
+    hashing.init_app(app)
+    metrics.init_app(app)
+    # after_request hooks run last-registered first: ETags are computed on
+    # the plain body, then compression runs.
+    compression.init_app(app)
+    http_cache.init_app(app)
 
     # Ensure tables exist (prevents 'no such table' on first run).
     with app.app_context():
@@ -50,6 +63,18 @@ def create_app() -> Flask:
         from . import models  # noqa: F401
 
         db.create_all()
+        ensure_sql_indexes()
+
+    # Build Mongo indexes once per process; the collection helpers no longer
+    # issue create_index calls on every request. Then load the menu snapshot
+    # and its search index so the first request does not pay for it.
+    if os.getenv("MONGO_ENSURE_INDEXES", "1").strip() != "0" and ensure_indexes():
+        warm_menu_cache()
+
+    # Orders acknowledged from the write-behind journal by a process that
+    # then died are upserted now.
+    if order_journal.ORDERS_WRITE_BEHIND:
+        order_journal.replay_at_startup()
 
     # Blueprints
     app.register_blueprint(health_bp, url_prefix=f"{api_prefix}")
@@ -0,0 +1,6 @@
+import sys
+
+from .api import main
+
+
+sys.exit(main())
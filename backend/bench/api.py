@@ -0,0 +1,283 @@
+"""Throughput and latency of the hot API endpoints under concurrent clients.
+
+    python -m backend.bench [--menu-items 10000] [--orders 1000000]
+                            [--queue-entries 5000] [--clients 16] [--requests 2000]
+                            [--endpoints menu,orders,...] [--output results.json]
+
+Boots create_app() against a throwaway SQLite file and a scratch Mongo
+database, seeds it at the requested scale, then drives each endpoint from
+--clients threads and prints requests/s and p50/p95/p99 latency. Login runs
+a tenth of --requests since every call is a bcrypt check. Use --mongo memory
+to run against mongomock (if installed) when no mongod is around; numbers
+from it only make sense relative to each other, and keep --orders small.
+--data-store picks where tables and reservations live (see DATA_STORE).
+--output writes the results as JSON for comparing runs.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from .common import DEFAULT_MONGO_DB, DEFAULT_MONGO_URI, configure_env, percentile, summarize_ms
+
+BENCH_DATE = "2030-01-01"
+PASSWORD = "bench-password"
+CATEGORIES = ["Starters", "Soups", "Salads", "Mains", "Biryani", "Breads", "Desserts", "Beverages"]
+WORDS = ["paneer", "tikka", "masala", "butter", "garlic", "chicken", "spicy", "smoked", "herb", "lemon",
+         "mango", "coconut", "roasted", "crispy", "tandoori", "saffron", "mint", "chilli", "ginger", "honey"]
+QUEUE_SLOTS = ["12:00-13:20", "13:40-15:00", "18:40-20:00", "20:20-21:40"]
+HALLS = [("VIP Hall", "VIP"), ("AC Hall", "AC"), ("Main Hall", "Main")]
+SEGMENTS = ["Front", "Middle", "Back"]
+BATCH_SIZE = 10_000
+
+
+def _user(i: int) -> str:
+    return f"bench-user-{i}@example.com"
+
+
+def _batched(docs, insert) -> None:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            insert(batch)
+            batch = []
+    if batch:
+        insert(batch)
+
+
+def seed(args) -> None:
+    from ..hashing import password_hasher
+    from ..menu_cache import bump_menu_version
+    from ..mongo import get_menu_collection, get_orders_collection, get_queue_collection, get_users_collection
+    from ..repositories import get_repositories, table_id
+
+    started = time.perf_counter()
+    password_hash = password_hasher.hash_password(PASSWORD)
+    _batched(({
+        "name": f"Bench User {i}", "email": _user(i), "phone": f"9{i:09d}", "address": "Bench Street",
+        "passwordHash": password_hash, "loyaltyPoints": 100, "favorites": [],
+    } for i in range(args.users)), lambda b: get_users_collection().insert_many(b, ordered=False))
+
+    _batched(({
+        "id": f"bench-item-{i}",
+        "name": f"{WORDS[i % len(WORDS)].title()} {WORDS[(i * 7) % len(WORDS)].title()} {i}",
+        "description": " ".join(WORDS[(i + k) % len(WORDS)] for k in range(12)),
+        "price": 100 + i % 400,
+        "image": f"https://images.example.com/menu/{i}.jpg",
+        "isVeg": i % 2 == 0,
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "available": True,
+        "popular": i % 10 == 0,
+        "todaysSpecial": i % 50 == 0,
+        "calories": 200 + i % 600,
+        "prepTime": "20 min",
+        "offer": None,
+    } for i in range(args.menu_items)), lambda b: get_menu_collection().insert_many(b, ordered=False))
+    bump_menu_version()
+
+    first_order = datetime(2029, 1, 1)
+    _batched(({
+        "id": f"bench-order-{i}",
+        "userId": _user(i % args.users),
+        "items": [{"id": f"bench-item-{(i + k) % max(args.menu_items, 1)}", "quantity": 1 + k, "price": 150} for k in range(3)],
+        "subtotal": 900.0, "tax": 45.0, "loyaltyDiscount": 0, "loyaltyPointsRedeemed": 0, "total": 945.0,
+        "status": "delivered", "type": "dine-in",
+        "date": (first_order + timedelta(seconds=i * 30)).isoformat() + "Z",
+        "createdAt": "2029-01-01T00:00:00Z", "updatedAt": "2029-01-01T00:00:00Z",
+    } for i in range(args.orders)), lambda b: get_orders_collection().insert_many(b, ordered=False))
+
+    joined = datetime(2030, 1, 1, 9, 0)
+    _batched(({
+        "id": f"bench-queue-{i}",
+        "userId": _user(i % args.users),
+        "name": f"Guest {i}", "guests": 2 + i % 3, "notificationMethod": "sms", "contact": _user(i % args.users),
+        "hall": HALLS[i % len(HALLS)][1], "segment": SEGMENTS[i % len(SEGMENTS)],
+        "position": i // (len(HALLS) * len(SEGMENTS) * 3 * len(QUEUE_SLOTS)) + 1,
+        "estimatedWaitMinutes": 10, "joinedAt": (joined + timedelta(seconds=i)).isoformat() + "Z",
+        "queueDate": BENCH_DATE, "timeSlot": QUEUE_SLOTS[i % len(QUEUE_SLOTS)],
+        "notifiedAt15Min": False, "tableAvailable": False, "notificationExpiresAt": None,
+        "fromReservationCancellation": False,
+    } for i in range(args.queue_entries)), lambda b: get_queue_collection().insert_many(b, ordered=False))
+
+    from ..routes.reservations import RESERVATION_TIME_SLOTS
+
+    repos = get_repositories()
+    repos.tables.upsert({
+        "tableId": table_id(n + 1), "tableName": f"{HALLS[n % len(HALLS)][0]} {n + 1}",
+        "location": HALLS[n % len(HALLS)][0], "segment": SEGMENTS[(n // len(HALLS)) % len(SEGMENTS)],
+        "capacity": (2, 4, 6, 8)[n % 4],
+    } for n in range(args.tables))
+    # Half the tables booked in every slot.
+    for slot_n, slot in enumerate(RESERVATION_TIME_SLOTS):
+        for n in range(0, args.tables, 2):
+            repos.reservations.save({
+                "reservationId": f"bench-res-{slot_n}-{n}", "userId": _user(n % args.users), "tableNumber": n + 1,
+                "date": BENCH_DATE, "timeSlot": slot, "guests": 2, "location": HALLS[n % len(HALLS)][0],
+                "segment": SEGMENTS[(n // len(HALLS)) % len(SEGMENTS)], "userName": "Bench",
+                "userPhone": "9000000000", "status": "Confirmed",
+            })
+
+    print(
+        f"seeded {args.users} users, {args.menu_items} menu items, {args.orders} orders, "
+        f"{args.queue_entries} queue entries, {args.tables} tables in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def scenarios(args) -> Dict[str, Callable]:
+    """Endpoint name -> fn(client, n) issuing the n-th request; returns (response, expected status)."""
+    from ..routes.reservations import RESERVATION_TIME_SLOTS
+    from ..sessions import issue_token
+
+    def menu(client, n):
+        if n % 4 == 3:
+            return client.get(f"/api/menu-items?q={WORDS[n % len(WORDS)]}"), 200
+        return client.get("/api/menu-items" if n % 2 else f"/api/menu-items?category={CATEGORIES[n % len(CATEGORIES)]}"), 200
+
+    def orders(client, n):
+        return client.get(f"/api/orders?userId={_user(n % args.users)}&limit=50"), 200
+
+    def queue_poll(client, n):
+        return client.get(f"/api/queue/poll?userId={_user(n % args.users)}"), 200
+
+    def queue_join(client, n):
+        hall, segment = HALLS[n % len(HALLS)][1], SEGMENTS[n % len(SEGMENTS)]
+        contact = f"joiner{n}@example.com"
+        return client.post("/api/queue/join", headers={"Authorization": f"Bearer {issue_token(contact)[0]}"}, json={
+            "id": f"bench-join-{n}", "name": f"Joiner {n}", "guests": 2, "contact": contact,
+            "hall": hall, "segment": segment, "queueDate": BENCH_DATE, "timeSlot": QUEUE_SLOTS[n % len(QUEUE_SLOTS)],
+        }), 201
+
+    def availability(client, n):
+        slot = RESERVATION_TIME_SLOTS[n % len(RESERVATION_TIME_SLOTS)]
+        return client.get("/api/reservations/availability", query_string={
+            "date": BENCH_DATE, "timeSlot": slot, "guests": 2 + n % 4, "location": HALLS[n % len(HALLS)][0],
+        }), 200
+
+    def login(client, n):
+        return client.post("/api/auth/login", json={"email": _user(n % args.users), "password": PASSWORD}), 200
+
+    return {
+        "menu": menu,
+        "orders": orders,
+        "queue-poll": queue_poll,
+        "queue-join": queue_join,
+        "availability": availability,
+        "login": login,
+    }
+
+
+def drive(app, name: str, scenario: Callable, clients: int, requests: int) -> dict:
+    latencies: List[List[float]] = [[] for _ in range(clients)]
+    errors: List[str] = []
+    gate = threading.Barrier(clients + 1)
+
+    def worker(tid: int) -> None:
+        client = app.test_client()
+        samples = latencies[tid]
+        gate.wait()
+        for n in range(tid, requests, clients):
+            started = time.perf_counter()
+            res, expected = scenario(client, n)
+            samples.append(time.perf_counter() - started)
+            if res.status_code != expected:
+                errors.append(f"{res.status_code} {res.get_data(as_text=True)[:200]}")
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(clients)]
+    for t in threads:
+        t.start()
+    gate.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [s for per_thread in latencies for s in per_thread]
+    ms = [s * 1000 for s in samples]
+    print(f"{name:13s} {len(samples):7d} req  {len(samples) / elapsed:8.1f} req/s  {summarize_ms(samples)}  errors {len(errors)}")
+    if errors:
+        print(f"{'':13s} first error: {errors[0]}")
+    return {
+        "endpoint": name,
+        "requests": len(samples),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "rps": len(samples) / elapsed,
+        "p50Ms": percentile(ms, 50),
+        "p95Ms": percentile(ms, 95),
+        "p99Ms": percentile(ms, 99),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=DEFAULT_MONGO_URI)
+    parser.add_argument("--db", default=DEFAULT_MONGO_DB)
+    parser.add_argument("--mongo", choices=["server", "memory"], default="server",
+                        help="'memory' uses mongomock instead of a mongod")
+    parser.add_argument("--data-store", choices=["split", "sql", "mongo", "memory"],
+                        help="DATA_STORE for tables, offers, notifications and reservations")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--menu-items", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--queue-entries", type=int, default=5000)
+    parser.add_argument("--tables", type=int, default=60)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--endpoints", default="menu,orders,queue-poll,queue-join,availability,login")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the Mongo database afterwards")
+    args = parser.parse_args(argv)
+
+    configure_env(args.uri, args.db)
+    if args.data_store:
+        os.environ["DATA_STORE"] = args.data_store
+    from .. import mongo
+
+    if args.mongo == "memory":
+        try:
+            import mongomock
+        except ImportError:
+            print("--mongo memory needs mongomock (pip install mongomock)")
+            return 2
+        mongo._client = mongomock.MongoClient()
+
+    from ..app import create_app
+
+    app = create_app()
+    all_scenarios = scenarios(args)
+    selected = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in selected if e not in all_scenarios]
+    if unknown:
+        print(f"unknown endpoints: {', '.join(unknown)} (choose from {', '.join(all_scenarios)})")
+        return 2
+
+    db = mongo.get_db()
+    results = []
+    try:
+        db.client.drop_database(args.db)
+        mongo.ensure_indexes()
+        with app.app_context():
+            seed(args)
+        print(f"{args.clients} clients")
+        for name in selected:
+            requests = max(1, args.requests // 10) if name == "login" else args.requests
+            results.append(drive(app, name, all_scenarios[name], args.clients, requests))
+    finally:
+        if not args.keep:
+            db.client.drop_database(args.db)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
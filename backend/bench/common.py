@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+import statistics
+import tempfile
+from typing import List
+
+# Benchmarks never touch the app's real databases: they run against a
+# dedicated Mongo database (dropped afterwards) and a throwaway SQLite file.
+DEFAULT_MONGO_URI = "mongodb://127.0.0.1:27017"
+DEFAULT_MONGO_DB = "restaurant_bench"
+
+
+def configure_env(mongo_uri: str = DEFAULT_MONGO_URI, mongo_db: str = DEFAULT_MONGO_DB) -> None:
+    """Point backend.mongo / create_app at scratch stores. Call before importing them."""
+    os.environ["MONGO_URI"] = mongo_uri
+    os.environ["MONGO_DB_NAME"] = mongo_db
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize_ms(samples: List[float]) -> str:
+    """Format latency samples (seconds) as mean/p50/p95/p99 in milliseconds."""
+    ms = [s * 1000 for s in samples]
+    return (
+        f"mean {statistics.fmean(ms):8.2f}  "
+        f"p50 {percentile(ms, 50):8.2f}  "
+        f"p95 {percentile(ms, 95):8.2f}  "
+        f"p99 {percentile(ms, 99):8.2f}"
+    )
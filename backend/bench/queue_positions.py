@@ -0,0 +1,174 @@
+"""Stress test for queue position allocation.
+
+    python -m backend.bench.queue_positions [--threads 16] [--joins 50] [--leaves 10]
+
+Fires concurrent /queue/join and /reservation-waiting-queue requests at a
+handful of queue groups. Then every thread makes --leaves queue entries
+leave, each raced by a second thread: double cancels, and expired table
+offers hit by two /queue/poll calls or by a poll and a cancel at once.
+Then more joins land on the compacted groups, and finally every thread
+alternates joins with cancels of another thread's entries, so joins race
+the renumbering a cancel does. Checks that every group
+ends up with positions 1..n, each used exactly once. Exits non-zero on a
+duplicate or a gap. Needs a running mongod (see --uri).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from .common import DEFAULT_MONGO_DB, DEFAULT_MONGO_URI, configure_env
+
+QUEUE_GROUPS = [
+    {"queueDate": "2030-01-01", "timeSlot": "12:00-13:20", "guests": 2, "hall": "AC", "segment": "Front"},
+    {"queueDate": "2030-01-01", "timeSlot": "12:00-13:20", "guests": 4, "hall": "Main", "segment": "Back"},
+    {"queueDate": "2030-01-01", "timeSlot": "18:40-20:00", "guests": 2, "hall": "VIP", "segment": "Any"},
+]
+WAITING_SLOTS = [
+    {"date": "2030-01-01", "timeSlot": "12:00 PM – 1:20 PM"},
+    {"date": "2030-01-01", "timeSlot": "6:40 PM – 8:00 PM"},
+]
+
+
+def _check(label: str, positions_by_group) -> bool:
+    ok = True
+    for group, positions in sorted(positions_by_group.items()):
+        expected = list(range(1, len(positions) + 1))
+        if sorted(positions) != expected:
+            dupes = sorted({p for p in positions if positions.count(p) > 1})
+            missing = sorted(set(expected) - set(positions))
+            print(f"FAIL {label} {group}: duplicates={dupes} gaps={missing}")
+            ok = False
+        else:
+            print(f"ok   {label} {group}: {len(positions)} positions")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=DEFAULT_MONGO_URI)
+    parser.add_argument("--db", default=DEFAULT_MONGO_DB)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--joins", type=int, default=50, help="joins per thread")
+    parser.add_argument("--leaves", type=int, default=10, help="raced cancels/expiries per thread")
+    args = parser.parse_args(argv)
+
+    configure_env(args.uri, args.db)
+    from ..app import create_app
+    from ..mongo import get_db, get_queue_collection, get_waiting_queue_collection
+    from ..sessions import issue_token
+
+    app = create_app()
+    db = get_db()
+    for name in ("queue_entries", "reservation_waiting_queue", "counters"):
+        db.drop_collection(name)
+
+    errors = []
+
+    def auth(n: int) -> dict:
+        # Queue writes need the session of the guest they act for.
+        return {"Authorization": f"Bearer {issue_token(f'guest{n}@example.com')[0]}"}
+
+    def run(worker) -> float:
+        start_gate = threading.Barrier(args.threads)
+
+        def target(tid: int) -> None:
+            client = app.test_client()
+            start_gate.wait()
+            worker(client, tid)
+
+        threads = [threading.Thread(target=target, args=(t,)) for t in range(args.threads)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - started
+
+    def join(client, n: int, waiting: bool = True) -> None:
+        group = QUEUE_GROUPS[n % len(QUEUE_GROUPS)]
+        res = client.post("/api/queue/join", headers=auth(n), json={
+            **group, "id": f"q-{n}", "name": f"Guest {n}", "contact": f"guest{n}@example.com",
+        })
+        if res.status_code != 201:
+            errors.append(res.get_data(as_text=True))
+        if not waiting:
+            return
+        slot = WAITING_SLOTS[n % len(WAITING_SLOTS)]
+        res = client.post("/api/reservation-waiting-queue", headers=auth(n), json={
+            **slot, "queueId": f"w-{n}", "userId": f"guest{n}@example.com", "guests": 2,
+        })
+        if res.status_code != 201:
+            errors.append(res.get_data(as_text=True))
+
+    def joins(client, tid: int) -> None:
+        for i in range(args.joins):
+            join(client, tid * args.joins + i)
+
+    # Entry tid*leaves+i is raced by threads tid and tid+1: even ones are
+    # cancelled twice, odd ones have an expired table offer that one thread
+    # polls while the other polls again (odd i) or cancels (even i).
+    leaving = min(args.leaves, args.joins)
+
+    def leaves(client, tid: int) -> None:
+        for shift in (0, 1):
+            owner = (tid - shift) % args.threads
+            for i in range(leaving):
+                n = owner * args.joins + i
+                if n % 2 == 0 or (shift == 1 and i % 2 == 0):
+                    res = client.delete(f"/api/queue/q-{n}", headers=auth(n))
+                    ok = res.status_code in (200, 404)  # 404: the other side won
+                else:
+                    res = client.get(f"/api/queue/poll?userId=guest{n}@example.com")
+                    ok = res.status_code == 200
+                if not ok:
+                    errors.append(res.get_data(as_text=True))
+
+    def rejoins(client, tid: int) -> None:
+        for i in range(leaving):
+            join(client, (args.threads + tid) * args.joins + i, waiting=False)
+
+    def churn(client, tid: int) -> None:
+        victim = (tid + 1) % args.threads
+        for i in range(leaving):
+            join(client, (2 * args.threads + tid) * args.joins + i, waiting=False)
+            n = (args.threads + victim) * args.joins + i
+            res = client.delete(f"/api/queue/q-{n}", headers=auth(n))
+            if res.status_code != 200:
+                errors.append(res.get_data(as_text=True))
+
+    try:
+        elapsed = run(joins)
+        total = args.threads * args.joins * 2
+        print(f"{total} joins in {elapsed:.2f}s ({total / elapsed:.0f}/s), {len(errors)} errors")
+
+        get_queue_collection().update_many(
+            {"id": {"$in": [f"q-{t * args.joins + i}" for t in range(args.threads) for i in range(leaving)]}},
+            {"$set": {"tableAvailable": True, "notificationExpiresAt": "2000-01-01T00:00:00Z"}},
+        )
+        elapsed = run(leaves)
+        print(f"{args.threads * leaving} raced leaves in {elapsed:.2f}s, {len(errors)} errors")
+        elapsed = run(rejoins)
+        print(f"{args.threads * leaving} joins after leaves in {elapsed:.2f}s, {len(errors)} errors")
+        elapsed = run(churn)
+        print(f"{args.threads * leaving} joins racing as many cancels in {elapsed:.2f}s, {len(errors)} errors")
+
+        queue_positions = defaultdict(list)
+        for e in get_queue_collection().find({}, {"queueDate": 1, "timeSlot": 1, "guests": 1, "hall": 1, "segment": 1, "position": 1}):
+            queue_positions[(e["queueDate"], e["timeSlot"], e["guests"], e["hall"], e["segment"])].append(e["position"])
+        waiting_positions = defaultdict(list)
+        for e in get_waiting_queue_collection().find({}, {"date": 1, "timeSlot": 1, "position": 1}):
+            waiting_positions[(e["date"], e["timeSlot"])].append(e["position"])
+
+        ok = _check("queue", queue_positions) & _check("waiting", waiting_positions)
+    finally:
+        db.client.drop_database(args.db)
+
+    return 0 if ok and not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
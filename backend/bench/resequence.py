@@ -0,0 +1,77 @@
+"""Latency of cancelling the head of a queue group, by group size.
+
+    python -m backend.bench.resequence [--sizes 10,50,200,1000] [--runs 20]
+
+Compares the bulk resequence in routes/queue.py with the previous
+one-update_one-per-entry loop. Needs a running mongod (see --uri).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from .common import DEFAULT_MONGO_DB, DEFAULT_MONGO_URI, configure_env, summarize_ms
+
+GROUP = {"queueDate": "2030-01-01", "timeSlot": "12:00-13:20", "guests": 2, "hall": "AC", "segment": "Front"}
+
+
+def _seed(queue_col, size: int) -> None:
+    start = datetime(2030, 1, 1, 9, 0)
+    queue_col.delete_many({})
+    queue_col.insert_many([
+        {
+            **GROUP,
+            "id": f"bench-{i}",
+            "userId": f"bench-{i}@example.com",
+            "position": i + 1,
+            "joinedAt": (start + timedelta(seconds=i)).isoformat() + "Z",
+        }
+        for i in range(size)
+    ])
+
+
+def _legacy_resequence(queue_col) -> None:
+    entries = list(queue_col.find(GROUP).sort("joinedAt", 1))
+    for idx, entry in enumerate(entries, start=1):
+        queue_col.update_one({"id": entry["id"]}, {"$set": {"position": idx}})
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=DEFAULT_MONGO_URI)
+    parser.add_argument("--db", default=DEFAULT_MONGO_DB)
+    parser.add_argument("--sizes", default="10,50,200,1000")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    configure_env(args.uri, args.db)
+    from ..mongo import ensure_indexes, get_db, get_queue_collection
+    from ..routes.queue import _resequence_queue
+
+    ensure_indexes()
+    queue_col = get_queue_collection()
+    resequencers = {
+        "bulk": lambda: _resequence_queue(
+            GROUP["queueDate"], GROUP["timeSlot"], GROUP["guests"], GROUP["hall"], GROUP["segment"],
+        ),
+        "per-entry": lambda: _legacy_resequence(queue_col),
+    }
+
+    try:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            for label, resequence in resequencers.items():
+                samples = []
+                for _ in range(args.runs):
+                    _seed(queue_col, size)
+                    started = time.perf_counter()
+                    queue_col.delete_one({"id": "bench-0"})
+                    resequence()
+                    samples.append(time.perf_counter() - started)
+                print(f"queue={size:6d}  {label:9s}  {summarize_ms(samples)}")
+    finally:
+        get_db().client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
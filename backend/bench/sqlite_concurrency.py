@@ -0,0 +1,139 @@
+"""Read/write throughput of the SQLite database under several processes.
+
+    python -m backend.bench.sqlite_concurrency [--readers 4] [--writers 2] [--seconds 5]
+
+Mimics gunicorn workers sharing restaurant.db: reader processes run the
+notification feed query while writer processes mark notifications read,
+first with SQLite defaults (rollback journal, synchronous=FULL) and then
+with the pragmas and pool from backend/sqlite_tuning.py. Each mode gets a
+fresh database file in a temp directory.
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, desc, or_, select, text, update
+from sqlalchemy.exc import OperationalError
+
+USERS = 200
+
+
+def _engine(url: str, tuned: bool):
+    from ..sqlite_tuning import SQLITE_BUSY_TIMEOUT_MS, engine_options, install
+
+    if tuned:
+        engine = create_engine(url, **engine_options(url))
+        install(engine)
+    else:
+        engine = create_engine(url, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000})
+    return engine
+
+
+def _seed(url: str, tuned: bool, rows: int) -> None:
+    from ..models import Notification
+
+    engine = _engine(url, tuned)
+    table = Notification.__table__
+    table.create(engine)  # with its indexes
+    start = datetime(2030, 1, 1)
+    with engine.begin() as conn:
+        if not tuned:
+            conn.execute(text("PRAGMA journal_mode=DELETE"))
+        conn.execute(table.insert(), [
+            {
+                "id": f"n{i}", "user_id": None if i % 10 == 0 else f"user{i % USERS}", "type": "info",
+                "title": f"Notification {i}", "message": "Your table is ready", "reference_id": None,
+                "created_at": start + timedelta(seconds=i), "is_read": False,
+            }
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+def _worker(role: str, url: str, tuned: bool, rows: int, start_at: float, stop_at: float, results) -> None:
+    from ..models import Notification
+
+    table = Notification.__table__
+    engine = _engine(url, tuned)
+    rng = random.Random(os.getpid())
+    ops = errors = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    while time.time() < stop_at:
+        try:
+            if role == "read":
+                user = f"user{rng.randrange(USERS)}"
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(table).where(or_(table.c.user_id == user, table.c.user_id.is_(None)))
+                        .order_by(desc(table.c.created_at)).limit(50)
+                    ).fetchall()
+            else:
+                with engine.begin() as conn:
+                    conn.execute(update(table).where(table.c.id == f"n{rng.randrange(rows)}").values(is_read=True))
+            ops += 1
+        except OperationalError:
+            errors += 1
+    engine.dispose()
+    results.put((role, ops, errors))
+
+
+def run(mode: str, args) -> dict:
+    tuned = mode == "tuned"
+    url = f"sqlite:///{tempfile.mkdtemp()}/concurrency.db"
+    _seed(url, tuned, args.rows)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    start_at = time.time() + 2.0  # let spawned processes import first
+    stop_at = start_at + args.seconds
+    procs = [
+        ctx.Process(target=_worker, args=(role, url, tuned, args.rows, start_at, stop_at, results))
+        for role in ["read"] * args.readers + ["write"] * args.writers
+    ]
+    for p in procs:
+        p.start()
+    totals = {"read": [0, 0], "write": [0, 0]}
+    for _ in procs:
+        role, ops, errors = results.get()
+        totals[role][0] += ops
+        totals[role][1] += errors
+    for p in procs:
+        p.join()
+
+    summary = {
+        "reads_per_s": totals["read"][0] / args.seconds,
+        "writes_per_s": totals["write"][0] / args.seconds,
+        "errors": totals["read"][1] + totals["write"][1],
+    }
+    print(
+        f"{mode:8s} reads {summary['reads_per_s']:9.1f}/s  writes {summary['writes_per_s']:8.1f}/s  "
+        f"locked errors {summary['errors']}"
+    )
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.readers} reader and {args.writers} writer processes, {args.seconds:.0f}s per mode")
+    baseline = run("default", args)
+    tuned = run("tuned", args)
+    for key, label in (("reads_per_s", "reads"), ("writes_per_s", "writes")):
+        if baseline[key]:
+            print(f"{label}: {tuned[key] / baseline[key]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import gzip
+import os
+
+from flask import Flask, request
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+
+# gzip (or brotli, when installed and accepted) for response bodies of at
+# least COMPRESS_MIN_BYTES. Streamed responses (/queue/stream) are never
+# buffered for compression. Set COMPRESS_RESPONSES=0 when a reverse proxy
+# already compresses. The COMPRESS_* settings are read in init_app, once
+# backend/.env is loaded.
+_COMPRESSIBLE = ("application/json", "text/")
+
+
+def _compressible(response) -> bool:
+    mimetype = response.mimetype or ""
+    return any(mimetype.startswith(prefix) for prefix in _COMPRESSIBLE)
+
+
+def _weaken_etag(response) -> None:
+    # The compressed bytes differ from the identity body the ETag was made
+    # for; a weak tag still lets If-None-Match revalidate either form.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_app(app: Flask) -> None:
+    if os.getenv("COMPRESS_RESPONSES", "1").strip() == "0":
+        return
+    min_bytes = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+    gzip_level = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    brotli_quality = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+    @app.after_request
+    def _compress(response):
+        if response.direct_passthrough or response.is_streamed or not _compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.status_code < 200 or response.status_code in (204, 304) or "Content-Encoding" in response.headers:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            response.set_data(brotli.compress(data, quality=brotli_quality))
+            response.headers["Content-Encoding"] = "br"
+        elif accepted["gzip"]:
+            response.set_data(gzip.compress(data, compresslevel=gzip_level))
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            return response
+        _weaken_etag(response)
+        return response
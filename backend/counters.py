@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .mongo import get_counters_collection
+
+
+# Position counters live in the `counters` collection as {_id: key, seq: n},
+# one per queue group. Handing out a position is a single atomic $inc, so
+# concurrent joins can neither collide nor need a count query first.
+
+
+def counter_key(kind: str, *parts: Any) -> str:
+    return "|".join([kind, *(str(p) for p in parts)])
+
+
+def max_position(col, query: Dict[str, Any]) -> int:
+    """Highest `position` currently stored for a group, used to seed a new counter."""
+    top = col.find_one(query, {"_id": 0, "position": 1}, sort=[("position", DESCENDING)])
+    return int(top.get("position") or 0) if top else 0
+
+
+def next_position(key: str, seed: Callable[[], int]) -> int:
+    """Atomically allocate the next position for `key`.
+
+    The first call for a key seeds the counter from `seed()` so groups that
+    existed before the counter keep counting from where they are.
+    """
+    counters = get_counters_collection()
+    doc = counters.find_one_and_update(
+        {"_id": key}, {"$inc": {"seq": 1}}, return_document=ReturnDocument.AFTER
+    )
+    if doc is None:
+        try:
+            counters.insert_one({"_id": key, "seq": seed()})
+        except DuplicateKeyError:
+            pass  # another request seeded it first
+        doc = counters.find_one_and_update(
+            {"_id": key}, {"$inc": {"seq": 1}}, return_document=ReturnDocument.AFTER
+        )
+    return int(doc["seq"])
+
+
+def release_position(key: str) -> None:
+    """Give back one position after an entry leaves a compacted group."""
+    get_counters_collection().update_one({"_id": key, "seq": {"$gt": 0}}, {"$inc": {"seq": -1}})
@@ -4,3 +4,14 @@ from flask_sqlalchemy import SQLAlchemy
 
 
 db = SQLAlchemy()
+
+
+def ensure_indexes() -> None:
+    """Create declared indexes missing from existing tables.
+
+    create_all() only builds indexes together with a new table, so indexes
+    added to a model later never reach databases created before them.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from flask import Request
+
+
+class FieldsError(ValueError):
+    """Bad `fields` query parameter; str(exc) is the API error code."""
+
+
+class FieldSet:
+    """
+    The document fields a serializer reads, declared once next to it. Reads
+    use `projection` so Mongo never sends what the serializer would drop,
+    and list endpoints accept `?fields=a,b` (a subset of these names, which
+    are also the serialized keys) to fetch and return only those.
+    """
+
+    def __init__(self, *names: str):
+        self.names = names
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        # A fresh dict per query: drivers (mongomock among them) may modify
+        # the projection they are handed, and this one is shared by every request.
+        return self._project(self.names)
+
+    @staticmethod
+    def _project(names: Sequence[str]) -> Dict[str, int]:
+        return {"_id": 0, **{name: 1 for name in names}}
+
+    def requested(self, request: Request) -> Optional[Tuple[str, ...]]:
+        """Fields named by `?fields=`, or None for all of them."""
+        raw = request.args.get("fields")
+        if raw is None:
+            return None
+        wanted = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+        if not wanted or any(f not in self.names for f in wanted):
+            raise FieldsError("invalid_fields")
+        return wanted
+
+    def projection_for(self, wanted: Optional[Tuple[str, ...]]) -> Dict[str, int]:
+        return self._project(self.names if wanted is None else wanted)
+
+
+def sparse(item: Dict[str, Any], wanted: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """`item` cut down to the requested fields."""
+    if wanted is None:
+        return item
+    return {name: item[name] for name in wanted}
@@ -0,0 +1,83 @@
+"""
+Gunicorn settings for the API. Run from the repository root:
+
+    gunicorn -c backend/gunicorn.conf.py
+
+Every value can be overridden with a GUNICORN_* env var (see .env.example).
+`kill -HUP <master>` restarts the workers gracefully; with preload_app the
+code is loaded by the master, so deploying new code needs a full restart (or
+`kill -USR2` followed by `kill -TERM` on the old master).
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+
+
+def _int_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    return int(raw) if raw else default
+
+
+_cpus = multiprocessing.cpu_count()
+
+wsgi_app = "backend.wsgi:app"
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:5000")
+
+# Threaded workers: request handlers mostly wait on MongoDB/SQLite, and each
+# open /queue/stream holds a thread for up to QUEUE_STREAM_MAX_SECONDS (at most
+# QUEUE_STREAM_MAX_OPEN of them per worker), so a few processes with several
+# threads each go further than many sync workers.
+# bcrypt runs in its own process pool per worker (PASSWORD_HASH_WORKERS).
+worker_class = "gthread"
+workers = _int_env("GUNICORN_WORKERS", min(_cpus * 2 + 1, 9))
+threads = _int_env("GUNICORN_THREADS", 8)
+
+# Import create_app once in the master: indexes are built and the menu
+# snapshot is warmed a single time, then shared copy-on-write by the workers.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").strip() != "0"
+
+# Idle keep-alive for connections from the reverse proxy; keep it above the
+# proxy's own upstream keep-alive timeout.
+keepalive = _int_env("GUNICORN_KEEPALIVE", 5)
+timeout = _int_env("GUNICORN_TIMEOUT", 60)
+graceful_timeout = _int_env("GUNICORN_GRACEFUL_TIMEOUT", 30)
+
+# Recycle workers now and then to bound memory growth; jitter keeps them
+# from restarting all at once.
+max_requests = _int_env("GUNICORN_MAX_REQUESTS", 5000)
+max_requests_jitter = _int_env("GUNICORN_MAX_REQUESTS_JITTER", 500)
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # The in-process queue broker only wakes /queue/stream clients held by the
+    # worker that made the write; other workers' streams notice on their next
+    # heartbeat instead of immediately.
+    if server.cfg.workers > 1 and os.getenv("QUEUE_EVENTS", "memory").strip().lower() != "mongo":
+        server.log.warning(
+            "QUEUE_EVENTS=memory with %d workers: queue updates reach streams on other workers only "
+            "every 15s. Set QUEUE_EVENTS=mongo (needs a replica set) for instant pushes.",
+            server.cfg.workers,
+        )
+
+
+def post_fork(server, worker):
+    # Connections opened by the master (index build, menu warm-up) belong to
+    # it; each worker opens its own. The Mongo client resets itself in forked
+    # children (see mongo.reset_client).
+    from backend.queue_events import set_queue_events
+
+    set_queue_events(None)
+
+    wsgi = sys.modules.get("backend.wsgi")
+    if wsgi is not None:
+        from backend.db import db
+
+        with wsgi.app.app_context():
+            # close=False: leave the parent's connections to the parent.
+            db.engine.dispose(close=False)
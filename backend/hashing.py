@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+import bcrypt
+from flask import Flask
+
+
+# bcrypt is a deliberate CPU burn (~250ms at the default cost). Running it on
+# the request thread lets a login burst starve every other endpoint on the
+# worker, so hashing runs in a small process pool with a bounded backlog;
+# past that, callers get PasswordHasherBusy and the API answers 429.
+def _env_settings() -> Tuple[int, int, int, float]:
+    """(workers, max_pending, rounds, timeout) from PASSWORD_HASH_* and BCRYPT_ROUNDS."""
+    return (
+        int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+        int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16")),
+        int(os.getenv("BCRYPT_ROUNDS", "12")),
+        float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10")),
+    )
+
+# Pool processes are never forked from the (multi-threaded) worker: a fork
+# can copy a lock some other thread holds and deadlock the child.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes queued (or one timed out); retry later."""
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, rounds: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._pending = 0
+        self._stats = {
+            "completed": 0, "rejected": 0, "timed_out": 0, "restarts": 0, "seconds_total": 0.0, "seconds_max": 0.0,
+        }
+
+    def configure(self, workers: int, max_pending: int, rounds: int, timeout: float) -> None:
+        stale = None
+        with self._lock:
+            if workers != self.workers:
+                stale, self._executor = self._executor, None
+            self.workers = workers
+            self.max_pending = max_pending
+            self.rounds = rounds
+            self.timeout = timeout
+        if stale is not None:
+            stale.shutdown(wait=False)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        # Caller holds _lock.
+        if self.workers <= 0:
+            return None
+        # A pool inherited across fork is unusable; each process builds its own.
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_MP_CONTEXT)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _replace_broken(self, executor: ProcessPoolExecutor) -> None:
+        # A pool process died (OOM killer, kill -9): the whole pool is broken
+        # for good, so drop it and let the next call build a fresh one.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._stats["restarts"] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn, *args):
+        # The caller holds a queue slot; the job gives it back when it really
+        # finishes, even if the caller stopped waiting for it. A broken pool
+        # fails every job in it, so the call is retried once on a fresh pool
+        # (hashing has no side effects).
+        for attempt in (1, 2):
+            with self._lock:
+                if attempt == 2:
+                    self._pending += 1
+                executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except (BrokenProcessPool, RuntimeError):  # RuntimeError: shut down by another thread
+                self._release()
+                self._replace_broken(executor)
+                continue
+            future.add_done_callback(self._release)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                with self._lock:
+                    self._stats["timed_out"] += 1
+                raise PasswordHasherBusy()
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+        raise PasswordHasherBusy()
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+            inline = self.workers <= 0
+        started = time.perf_counter()
+        if inline:
+            try:
+                result = fn(*args)
+            finally:
+                self._release()
+        else:
+            result = self._submit(fn, *args)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["seconds_total"] += elapsed
+            self._stats["seconds_max"] = max(self._stats["seconds_max"], elapsed)
+        return result
+
+    def hash_password(self, password: str) -> str:
+        return self._run(_hash, password.encode("utf-8"), self.rounds).decode("utf-8")
+
+    def check_password(self, password: str, password_hash: str) -> bool:
+        return self._run(_check, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "queueDepth": self._pending,
+                "maxPending": self.max_pending,
+                "completed": completed,
+                "rejected": self._stats["rejected"],
+                "timedOut": self._stats["timed_out"],
+                "poolRestarts": self._stats["restarts"],
+                "avgSeconds": self._stats["seconds_total"] / completed if completed else 0.0,
+                "maxSeconds": self._stats["seconds_max"],
+            }
+
+
+password_hasher = PasswordHasher(*_env_settings())
+
+
+def init_app(app: Flask) -> None:
+    # Read again here: create_app imports this module before it loads backend/.env.
+    password_hasher.configure(*_env_settings())
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Callable
+
+from flask import Flask, request
+
+
+# Conditional GET for every JSON read: responses get an ETag (a hash of the
+# body) and a Cache-Control header, and a request whose If-None-Match still
+# matches gets an empty 304. The handler still runs; what is saved is the
+# transfer and the client's parse. Views that know their version up front
+# (the menu) set their own ETag via utils.etag_response and are left alone.
+DEFAULT_CACHE_POLICY = "no-cache"
+
+
+def cache_policy(value: str) -> Callable:
+    """Cache-Control for a GET view, e.g. "private, no-cache" or "no-store"."""
+
+    def decorate(view):
+        view.cache_policy = value
+        return view
+
+    return decorate
+
+
+def init_app(app: Flask) -> None:
+    @app.after_request
+    def _conditional_get(response):
+        if request.method not in ("GET", "HEAD") or response.status_code != 200:
+            return response
+        if response.is_streamed or response.mimetype != "application/json":
+            return response
+
+        view = app.view_functions.get(request.endpoint)
+        policy = getattr(view, "cache_policy", DEFAULT_CACHE_POLICY)
+        if "Cache-Control" not in response.headers:
+            response.headers["Cache-Control"] = policy
+        if "no-store" in policy or "ETag" in response.headers:
+            return response
+
+        response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+        return response.make_conditional(request)
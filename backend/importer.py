@@ -0,0 +1,321 @@
+"""Bulk, idempotent import of JSON Lines or CSV files.
+
+    python -m backend.importer orders orders.jsonl [--batch-size 5000]
+    python -m backend.importer menu_items menu.csv.gz --restart
+
+Records are streamed from the file and written in batches: an unordered
+bulk_write of upserts for Mongo collections, and one INSERT ... ON CONFLICT
+executemany per batch for SQLite (tables, offers, notifications and
+reservations go through backend/repositories, so DATA_STORE decides where
+they land). Re-importing a file updates the same documents, never
+duplicates them.
+
+Records use the API field names (see docs/db). In CSV files, numeric,
+boolean and list/object fields are converted from their text form (lists
+and objects as JSON). Progress is saved next to the file after every batch
+(<file>.progress.json); an interrupted import continues from there when run
+again, unless --restart is given.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from pymongo import UpdateOne
+
+try:
+    from .menu_cache import bump_menu_version
+    from .mongo import (
+        get_feedback_collection, get_menu_collection, get_orders_collection, get_queue_collection,
+        get_users_collection, get_waiting_queue_collection,
+    )
+    from .repositories import get_repositories
+except ImportError:  # pragma: no cover
+    from backend.menu_cache import bump_menu_version
+    from backend.mongo import (
+        get_feedback_collection, get_menu_collection, get_orders_collection, get_queue_collection,
+        get_users_collection, get_waiting_queue_collection,
+    )
+    from backend.repositories import get_repositories
+
+
+DEFAULT_BATCH_SIZE = 5000
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+class ImportRecordError(ValueError):
+    """A record that cannot be imported; the message names its position."""
+
+
+# ─── Field conversion ─────────────────────────────────────────────────────
+
+def _bool(raw: str) -> bool:
+    return raw.strip().lower() in ("1", "true", "yes", "y")
+
+
+def _datetime(raw: str) -> datetime:
+    parsed = datetime.fromisoformat(raw.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "int": int,
+    "float": float,
+    "bool": _bool,
+    "json": json.loads,
+    "datetime": _datetime,
+}
+
+
+class Kind:
+    """What one import target looks like: its key field, typed fields and writer."""
+
+    def __init__(
+        self,
+        key: str,
+        write: Callable[[List[dict]], None],
+        types: Optional[Dict[str, str]] = None,
+        after: Optional[Callable[[], Any]] = None,
+    ):
+        self.key = key
+        self.write = write
+        self.types = types or {}
+        self.after = after
+
+    def convert(self, record: dict, position: int) -> dict:
+        if record.get(self.key) in (None, ""):
+            raise ImportRecordError(f"record {position}: missing {self.key}")
+        doc = dict(record)
+        for field, type_name in self.types.items():
+            value = doc.get(field)
+            # JSON Lines values already have their types; CSV cells are text.
+            # datetimes are always text, in either format.
+            if not isinstance(value, str):
+                continue
+            if value == "":
+                doc[field] = None
+                continue
+            try:
+                doc[field] = _CONVERTERS[type_name](value)
+            except ValueError:
+                raise ImportRecordError(f"record {position}: {field} is not a valid {type_name}")
+        return doc
+
+
+def _mongo_upsert(get_collection: Callable, key: str) -> Callable[[List[dict]], None]:
+    def write(docs: List[dict]) -> None:
+        get_collection().bulk_write([UpdateOne({key: d[key]}, {"$set": d}, upsert=True) for d in docs], ordered=False)
+    return write
+
+
+def _repository_upsert(name: str) -> Callable[[List[dict]], None]:
+    def write(docs: List[dict]) -> None:
+        getattr(get_repositories(), name).upsert(docs)
+    return write
+
+
+KINDS: Dict[str, Kind] = {
+    "users": Kind("email", _mongo_upsert(get_users_collection, "email"), {
+        "loyaltyPoints": "int", "favorites": "json", "membership": "json",
+    }),
+    "menu_items": Kind("id", _mongo_upsert(get_menu_collection, "id"), {
+        "price": "int", "isVeg": "bool", "available": "bool", "popular": "bool",
+        "todaysSpecial": "bool", "calories": "int",
+    }, after=bump_menu_version),
+    "orders": Kind("id", _mongo_upsert(get_orders_collection, "id"), {
+        "items": "json", "subtotal": "float", "tax": "float", "loyaltyDiscount": "float",
+        "loyaltyPointsRedeemed": "int", "total": "float",
+    }),
+    "feedback": Kind("id", _mongo_upsert(get_feedback_collection, "id"), {
+        "foodRatings": "json", "likedAspects": "json",
+    }),
+    "queue_entries": Kind("id", _mongo_upsert(get_queue_collection, "id"), {
+        "guests": "int", "position": "int", "estimatedWaitMinutes": "float", "notifiedAt15Min": "bool",
+        "tableAvailable": "bool", "fromReservationCancellation": "bool",
+    }),
+    "reservation_waiting_queue": Kind("queueId", _mongo_upsert(get_waiting_queue_collection, "queueId"), {
+        "guests": "int", "position": "int",
+    }),
+    "reservations": Kind("reservationId", _repository_upsert("reservations"), {
+        "tableNumber": "int", "guests": "int",
+    }),
+    "tables": Kind("tableId", _repository_upsert("tables"), {"capacity": "int"}),
+    "offers": Kind("id", _repository_upsert("offers"), {
+        "value": "int", "minOrderValue": "int", "requiresLoyalty": "bool",
+    }),
+    "notifications": Kind("id", _repository_upsert("notifications"), {
+        "isRead": "bool", "createdAt": "datetime",
+    }),
+}
+
+
+# ─── Reading ──────────────────────────────────────────────────────────────
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _file_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(path: str, fmt: Optional[str] = None, skip: int = 0) -> Iterator[dict]:
+    """Records of a JSON Lines or CSV file (optionally gzipped), one at a time, after the first `skip`."""
+    fmt = fmt or _file_format(path)
+    with _open_text(path) as fh:
+        if fmt == "csv":
+            yield from islice(csv.DictReader(fh), skip, None)
+            return
+        lines = (line for line in fh if line.strip())
+        # Skipped lines are only counted, not parsed.
+        for line in islice(lines, skip, None):
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ImportRecordError("every JSON line must be an object")
+            yield record
+
+
+def _batches(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    it = iter(records)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ─── Importing ────────────────────────────────────────────────────────────
+
+def import_records(
+    kind: str,
+    records: Iterable[dict],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Optional[Callable[[int], None]] = None,
+    start: int = 0,
+) -> int:
+    """
+    Upsert `records` into `kind` in batches; returns how many were written.
+    `on_batch(done)` runs after each batch with the running total, counting
+    from `start` (records already imported by an earlier run). SQL targets
+    need an app context.
+    """
+    spec = KINDS[kind]
+    done = start
+    for batch in _batches(records, batch_size):
+        spec.write([spec.convert(r, done + i + 1) for i, r in enumerate(batch)])
+        done += len(batch)
+        if on_batch is not None:
+            on_batch(done)
+    if spec.after is not None and done > start:
+        spec.after()
+    return done - start
+
+
+class Checkpoint:
+    """How far the import of one file got, stored next to it."""
+
+    def __init__(self, kind: str, path: str):
+        self.path = path + ".progress.json"
+        stat = os.stat(path)
+        self.source = {"kind": kind, "size": stat.st_size, "mtimeNs": stat.st_mtime_ns}
+
+    def load(self) -> int:
+        """Records already imported, or 0 if there is no progress for this exact file."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                saved = json.load(fh)
+        except (OSError, ValueError):
+            return 0
+        if {k: saved.get(k) for k in self.source} != self.source:
+            return 0
+        return int(saved.get("done", 0))
+
+    def save(self, done: int) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({**self.source, "done": done}, fh)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def import_file(
+    kind: str,
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    fmt: Optional[str] = None,
+    restart: bool = False,
+    log: Callable[[str], None] = print,
+) -> int:
+    """Import one file, resuming from its checkpoint; returns the records written by this run."""
+    checkpoint = Checkpoint(kind, path)
+    start = 0 if restart else checkpoint.load()
+    if start:
+        log(f"{kind}: resuming after {start:,} records")
+
+    started = time.perf_counter()
+    last_log = started
+
+    def on_batch(done: int) -> None:
+        nonlocal last_log
+        checkpoint.save(done)
+        now = time.perf_counter()
+        if now - last_log >= PROGRESS_INTERVAL_SECONDS:
+            last_log = now
+            log(f"{kind}: {done:,} records ({(done - start) / (now - started):,.0f}/s)")
+
+    written = import_records(kind, read_records(path, fmt, skip=start), batch_size, on_batch, start)
+    checkpoint.clear()
+    elapsed = time.perf_counter() - started
+    log(f"{kind}: imported {written:,} records in {elapsed:.1f}s ({written / elapsed if elapsed else 0:,.0f}/s)")
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("files", nargs="+", help=".jsonl or .csv files, optionally .gz")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="default: from the file extension")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and start from the top")
+    args = parser.parse_args(argv)
+
+    try:
+        from .app import create_app
+    except ImportError:  # pragma: no cover
+        from backend.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        for path in args.files:
+            try:
+                import_file(args.kind, path, args.batch_size, args.format, args.restart)
+            except ValueError as exc:
+                print(f"{path}: {exc}")
+                return 1
+            except KeyError as exc:
+                print(f"{path}: a record is missing {exc}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+try:
+    from .mongo import INDEXES, diff_indexes, ensure_indexes
+except ImportError:  # pragma: no cover
+    from backend.mongo import INDEXES, diff_indexes, ensure_indexes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the MongoDB indexes declared in backend/mongo.py with the live ones.",
+    )
+    parser.add_argument("--apply", action="store_true", help="create missing indexes before reporting")
+    args = parser.parse_args(argv)
+
+    if args.apply and not ensure_indexes():
+        print("MongoDB is unreachable.")
+        return 2
+
+    report = diff_indexes()
+    drift = False
+    for name in INDEXES:
+        missing = report[name]["missing"]
+        extra = report[name]["extra"]
+        if not missing and not extra:
+            print(f"{name}: ok")
+            continue
+        for label in missing:
+            print(f"{name}: missing {label}")
+        for label in extra:
+            print(f"{name}: extra {label}")
+        drift = drift or bool(missing)
+
+    # Extra indexes are reported but only missing ones fail the check.
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
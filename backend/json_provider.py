@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask's default provider with orjson doing the encoding and decoding.
+
+    Output matches the stdlib provider: keys are sorted, and datetimes,
+    dataclasses and other non-native types go through the same `default`
+    hook. Anything orjson refuses (e.g. ints beyond 64 bits) falls back to
+    the stdlib encoder.
+    """
+
+    if orjson is not None:
+        _options = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _encode(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options)
+        except TypeError:
+            return super().dumps(obj).encode("utf-8")
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            # Pretty-printed like the default provider in debug mode.
+            return super().response(obj)
+        return self._app.response_class(self._encode(obj), mimetype=self.mimetype)
+
+
+def init_app(app: Flask) -> None:
+    # JSON_PROVIDER=auto uses orjson when it is installed, else the stdlib
+    # encoder; "orjson" / "stdlib" force one or the other.
+    choice = os.getenv("JSON_PROVIDER", "auto").strip().lower()
+    if choice == "stdlib":
+        return
+    if orjson is None:
+        if choice == "orjson":
+            logger.warning("JSON_PROVIDER=orjson but orjson is not installed; using the stdlib encoder.")
+        return
+    app.json = OrjsonProvider(app)
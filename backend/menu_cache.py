@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from .fields import FieldSet
+from .menu_search import MenuSearchIndex
+from .mongo import get_menu_collection, get_meta_collection
+from .utils import dumps_json
+
+
+logger = logging.getLogger(__name__)
+
+# The menu changes maybe once a day but is fetched several times per page
+# load, so list/detail reads are served from an in-process snapshot. Writers
+# bump a version number in the `meta` collection; each process checks it at
+# most every MENU_CACHE_TTL_SECONDS and rebuilds only when it moved. The
+# snapshot is also rebuilt after MENU_CACHE_MAX_AGE_SECONDS in case someone
+# edited menu_items without bumping the version.
+MENU_VERSION_ID = "menu"
+CHECK_INTERVAL_SECONDS = float(os.getenv("MENU_CACHE_TTL_SECONDS", "5"))
+MAX_AGE_SECONDS = float(os.getenv("MENU_CACHE_MAX_AGE_SECONDS", "300"))
+
+
+MENU_FIELDS = FieldSet(
+    "id", "name", "description", "price", "image", "isVeg", "category", "available",
+    "popular", "todaysSpecial", "calories", "prepTime", "offer",
+)
+
+
+def serialize_menu_item(doc: dict) -> dict:
+    return {
+        "id": doc.get("id"),
+        "name": doc.get("name"),
+        "description": doc.get("description"),
+        "price": doc.get("price"),
+        "image": doc.get("image"),
+        "isVeg": bool(doc.get("isVeg")),
+        "category": doc.get("category"),
+        "available": bool(doc.get("available")),
+        "popular": bool(doc.get("popular")),
+        "todaysSpecial": bool(doc.get("todaysSpecial")),
+        "calories": doc.get("calories"),
+        "prepTime": doc.get("prepTime"),
+        "offer": doc.get("offer"),
+    }
+
+
+class MenuSnapshot:
+    """
+    Serialized menu items in (category, name) order plus lookup indexes.
+    This is the one read model of the menu: the menu and chat endpoints both
+    read it, and menu_items in Mongo is its only source.
+    """
+
+    def __init__(self, version: int, docs: List[dict], search: MenuSearchIndex):
+        self.version = version
+        self.search = search
+        self.items = [serialize_menu_item(d) for d in docs]
+        self.items.sort(key=lambda i: (i["category"] or "", i["name"] or ""))
+
+        self.by_id: Dict[str, dict] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.position: Dict[str, int] = {}
+        self.veg: Set[int] = set()
+        for pos, item in enumerate(self.items):
+            self.by_id[item["id"]] = item
+            self.position[item["id"]] = pos
+            if item["category"]:
+                self.by_category.setdefault(item["category"], []).append(pos)
+            if item["isVeg"]:
+                self.veg.add(pos)
+
+        self.categories = sorted(self.by_category)
+        self.popular = [i for i in self.items if i["popular"]]
+        self.todays_special = [i for i in self.items if i["todaysSpecial"]]
+        self.etag = hashlib.sha1(dumps_json(self.items).encode("utf-8")).hexdigest()
+        self.loaded_at = time.monotonic()
+        self.checked_at = self.loaded_at
+
+    def filter(self, category: Optional[str] = None, veg: Optional[bool] = None, q: Optional[str] = None) -> List[dict]:
+        """Matching items: in menu order, or by relevance when searching."""
+        if q:
+            scores = self.search.search(q)
+            # The shared index may already hold a newer menu; skip unknown ids.
+            positions = sorted(
+                (self.position[i] for i in scores if i in self.position),
+                key=lambda p: (-scores[self.items[p]["id"]], p),
+            )
+            if category:
+                positions = [p for p in positions if self.items[p]["category"] == category]
+        elif category:
+            positions = self.by_category.get(category, [])
+        else:
+            positions = range(len(self.items))
+        if veg is not None:
+            positions = [p for p in positions if (p in self.veg) == veg]
+        return [self.items[p] for p in positions]
+
+
+_snapshot: Optional[MenuSnapshot] = None
+_lock = threading.Lock()
+
+# The search index outlives snapshots: each rebuild only re-indexes the items
+# that changed since the last one.
+_search = MenuSearchIndex()
+_indexed: Dict[str, dict] = {}
+
+
+def _current_version() -> int:
+    doc = get_meta_collection().find_one({"_id": MENU_VERSION_ID}, {"version": 1})
+    return int(doc.get("version", 0)) if doc else 0
+
+
+def get_menu_snapshot() -> MenuSnapshot:
+    snap = _snapshot
+    now = time.monotonic()
+    if snap is not None and now - snap.checked_at < CHECK_INTERVAL_SECONDS:
+        return snap
+
+    with _lock:
+        snap = _snapshot
+        if snap is not None and time.monotonic() - snap.checked_at < CHECK_INTERVAL_SECONDS:
+            return snap
+        return _refresh(snap)
+
+
+def _refresh(snap: Optional[MenuSnapshot]) -> MenuSnapshot:
+    global _snapshot
+    version = _current_version()
+    now = time.monotonic()
+    if snap is not None and snap.version == version and now - snap.loaded_at < MAX_AGE_SECONDS:
+        snap.checked_at = now
+        return snap
+    _snapshot = MenuSnapshot(version, list(get_menu_collection().find({}, MENU_FIELDS.projection)), _search)
+    _sync_search(_snapshot)
+    return _snapshot
+
+
+def _sync_search(snap: MenuSnapshot) -> None:
+    for item_id in [i for i in _indexed if i not in snap.by_id]:
+        _search.remove(item_id)
+        del _indexed[item_id]
+    for item_id, item in snap.by_id.items():
+        if _indexed.get(item_id) != item:
+            _search.upsert(item)
+            _indexed[item_id] = item
+
+
+def warm_menu_cache() -> None:
+    """Build the snapshot and search index up front (called from create_app)."""
+    try:
+        get_menu_snapshot()
+    except PyMongoError as exc:
+        logger.warning("Could not load the menu snapshot: %s", exc)
+
+
+def bump_menu_version() -> int:
+    """Record that menu_items changed. Call after every menu write."""
+    doc = get_meta_collection().find_one_and_update(
+        {"_id": MENU_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    invalidate_menu_cache()
+    return int(doc["version"])
+
+
+def invalidate_menu_cache() -> None:
+    """Drop this process's snapshot; the next read rebuilds it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
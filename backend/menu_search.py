@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Score for a query term by how it matched an indexed token, times the field
+# weight of where that token appeared.
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.7
+TYPO_SCORE = 0.4
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.0}
+
+# Terms shorter than this are matched exactly or by prefix only; one-letter
+# typos in short words produce more noise than hits.
+MIN_TYPO_LENGTH = 4
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _deletes(token: str) -> Set[str]:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class MenuSearchIndex:
+    """
+    Inverted index over menu item names and descriptions.
+
+    Each query term matches indexed tokens exactly, by prefix (for
+    search-as-you-type) or within one edit (typos, via a precomputed
+    deletion neighbourhood). Items must match every term; results are ranked
+    by summed score. Items are added and removed one at a time so the index
+    can follow menu changes without a rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+        self._deletions: Dict[str, Set[str]] = {}
+        self._item_tokens: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._item_tokens)
+
+    def upsert(self, item: dict) -> None:
+        weights: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(item.get(field) or ""):
+                weights[token] = max(weights.get(token, 0.0), weight)
+        with self._lock:
+            self._remove(item["id"])
+            self._item_tokens[item["id"]] = weights
+            for token, weight in weights.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    insort(self._vocabulary, token)
+                    if len(token) >= MIN_TYPO_LENGTH:
+                        for variant in _deletes(token):
+                            self._deletions.setdefault(variant, set()).add(token)
+                posting[item["id"]] = weight
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id: str) -> None:
+        for token in self._item_tokens.pop(item_id, {}):
+            posting = self._postings[token]
+            posting.pop(item_id, None)
+            if posting:
+                continue
+            del self._postings[token]
+            del self._vocabulary[bisect_left(self._vocabulary, token)]
+            if len(token) >= MIN_TYPO_LENGTH:
+                for variant in _deletes(token):
+                    variants = self._deletions.get(variant)
+                    if variants is not None:
+                        variants.discard(token)
+                        if not variants:
+                            del self._deletions[variant]
+
+    def _candidates(self, term: str) -> Iterable[Tuple[str, float]]:
+        seen: Set[str] = set()
+        if term in self._postings:
+            seen.add(term)
+            yield term, EXACT_SCORE
+
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            token = self._vocabulary[i]
+            if token not in seen:
+                seen.add(token)
+                yield token, PREFIX_SCORE
+            i += 1
+
+        if len(term) >= MIN_TYPO_LENGTH:
+            # Edit distance 1: a token equal to one of our deletions, a token
+            # one of whose deletions is us, or sharing a deletion with us.
+            typos = set(self._deletions.get(term, ()))
+            for variant in _deletes(term):
+                if variant in self._postings:
+                    typos.add(variant)
+                typos.update(self._deletions.get(variant, ()))
+            for token in typos - seen:
+                yield token, TYPO_SCORE
+
+    def search(self, query: str) -> Dict[str, float]:
+        """Relevance scores of the items matching every term of `query`."""
+        terms = tokenize(query)
+        if not terms:
+            return {}
+
+        with self._lock:
+            scores: Dict[str, float] = {}
+            for n, term in enumerate(dict.fromkeys(terms)):
+                term_scores: Dict[str, float] = {}
+                for token, score in self._candidates(term):
+                    for item_id, weight in self._postings[token].items():
+                        value = score * weight
+                        if value > term_scores.get(item_id, 0.0):
+                            term_scores[item_id] = value
+                if n == 0:
+                    scores = term_scores
+                else:
+                    scores = {i: s + term_scores[i] for i, s in scores.items() if i in term_scores}
+                if not scores:
+                    return {}
+
+        return scores
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, g, request
+from pymongo import monitoring
+from sqlalchemy import event
+
+from .db import db
+from .hashing import password_hasher
+from .mongo_pool import pool_stats
+from .order_journal import write_behind_stats
+
+
+# Per-process request metrics: a latency histogram per route, plus how many
+# MongoDB commands and SQL statements each request issued and how long they
+# took. Every response carries a Server-Timing header with the same numbers
+# (visible in the browser's network panel); /api/metrics serves the totals in
+# Prometheus text format. Under gunicorn each worker keeps its own counters,
+# so scrape every worker or aggregate by `pid`.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip() != "0"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+class _RequestTally:
+    """DB work done on the current request thread."""
+
+    __slots__ = ("mongo_count", "mongo_seconds", "sql_count", "sql_seconds")
+
+    def __init__(self):
+        self.mongo_count = 0
+        self.mongo_seconds = 0.0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.mongo_per_route: Dict[Tuple[str, str], List[float]] = {}
+        self.sql_per_route: Dict[Tuple[str, str], List[float]] = {}
+        self.mongo_commands: Dict[str, int] = {}
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, tally: _RequestTally) -> None:
+        key = (method, route)
+        with self._lock:
+            hist = self.latency.get(key)
+            if hist is None:
+                hist = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            status_key = (method, route, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            mongo = self.mongo_per_route.setdefault(key, [0, 0.0])
+            mongo[0] += tally.mongo_count
+            mongo[1] += tally.mongo_seconds
+            sql = self.sql_per_route.setdefault(key, [0, 0.0])
+            sql[0] += tally.sql_count
+            sql[1] += tally.sql_seconds
+
+    def record_mongo_command(self, name: str) -> None:
+        with self._lock:
+            self.mongo_commands[name] = self.mongo_commands.get(name, 0) + 1
+
+
+registry = Registry()
+_local = threading.local()
+
+
+def _tally() -> Optional[_RequestTally]:
+    return getattr(_local, "tally", None)
+
+
+class _MongoCommandMetrics(monitoring.CommandListener):
+    # pymongo is synchronous, so events fire on the thread that issued the
+    # command, i.e. the request thread.
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._finished(event)
+
+    def failed(self, event) -> None:
+        self._finished(event)
+
+    def _finished(self, event) -> None:
+        registry.record_mongo_command(event.command_name)
+        tally = _tally()
+        if tally is not None:
+            tally.mongo_count += 1
+            tally.mongo_seconds += event.duration_micros / 1_000_000
+
+
+# The start time rides on the statement's execution context, not the pooled
+# connection: a statement that raises never reaches the after hook, and its
+# context is simply dropped.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_metrics_started", None)
+    tally = _tally()
+    if tally is not None and started is not None:
+        tally.sql_count += 1
+        tally.sql_seconds += time.perf_counter() - started
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_label(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    pid = os.getpid()
+    lines: List[str] = []
+    with registry._lock:
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), hist in sorted(registry.latency.items()):
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f"http_request_duration_seconds_bucket{_labels(pid=pid, method=method, route=route, le=bound)} {count}")
+            lines.append(f"http_request_duration_seconds_bucket{_labels(pid=pid, method=method, route=route, le='+Inf')} {hist.count}")
+            lines.append(f"http_request_duration_seconds_sum{_labels(pid=pid, method=method, route=route)} {hist.sum}")
+            lines.append(f"http_request_duration_seconds_count{_labels(pid=pid, method=method, route=route)} {hist.count}")
+
+        lines += ["# HELP http_requests_total Requests by route and status.", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(registry.requests.items()):
+            lines.append(f"http_requests_total{_labels(pid=pid, method=method, route=route, status=status)} {count}")
+
+        for name, per_route, what in (
+            ("mongo_commands", registry.mongo_per_route, "MongoDB commands"),
+            ("sql_statements", registry.sql_per_route, "SQL statements"),
+        ):
+            lines += [f"# HELP http_request_{name}_total {what} issued while serving requests.", f"# TYPE http_request_{name}_total counter"]
+            for (method, route), (count, _) in sorted(per_route.items()):
+                lines.append(f"http_request_{name}_total{_labels(pid=pid, method=method, route=route)} {count}")
+            lines += [f"# HELP http_request_{name}_seconds_total Time spent in {what} while serving requests.", f"# TYPE http_request_{name}_seconds_total counter"]
+            for (method, route), (_, seconds) in sorted(per_route.items()):
+                lines.append(f"http_request_{name}_seconds_total{_labels(pid=pid, method=method, route=route)} {seconds}")
+
+        lines += ["# HELP mongo_commands_total MongoDB commands by name.", "# TYPE mongo_commands_total counter"]
+        for name, count in sorted(registry.mongo_commands.items()):
+            lines.append(f"mongo_commands_total{_labels(pid=pid, command=name)} {count}")
+
+    pool = pool_stats.stats()
+    lines += [
+        "# TYPE mongo_pool_connections_open gauge",
+        f"mongo_pool_connections_open{_labels(pid=pid)} {pool['open']}",
+        "# TYPE mongo_pool_connections_checked_out gauge",
+        f"mongo_pool_connections_checked_out{_labels(pid=pid)} {pool['checkedOut']}",
+        "# TYPE mongo_pool_checkout_wait_max_seconds gauge",
+        f"mongo_pool_checkout_wait_max_seconds{_labels(pid=pid)} {pool['waitMaxMs'] / 1000}",
+    ]
+
+    hasher = password_hasher.stats()
+    lines += [
+        "# TYPE password_hash_queue_depth gauge",
+        f"password_hash_queue_depth{_labels(pid=pid)} {hasher['queueDepth']}",
+        "# TYPE password_hash_completed_total counter",
+        f"password_hash_completed_total{_labels(pid=pid)} {hasher['completed']}",
+        "# TYPE password_hash_rejected_total counter",
+        f"password_hash_rejected_total{_labels(pid=pid)} {hasher['rejected']}",
+        "# TYPE password_hash_timed_out_total counter",
+        f"password_hash_timed_out_total{_labels(pid=pid)} {hasher['timedOut']}",
+        "# TYPE password_hash_seconds_max gauge",
+        f"password_hash_seconds_max{_labels(pid=pid)} {hasher['maxSeconds']}",
+    ]
+
+    write_behind = write_behind_stats()
+    if write_behind is not None:
+        lines += [
+            "# TYPE orders_write_behind_pending gauge",
+            f"orders_write_behind_pending{_labels(pid=pid)} {write_behind['pending']}",
+            "# TYPE orders_write_behind_flushed_total counter",
+            f"orders_write_behind_flushed_total{_labels(pid=pid)} {write_behind['flushed']}",
+            "# TYPE orders_write_behind_failures_total counter",
+            f"orders_write_behind_failures_total{_labels(pid=pid)} {write_behind['failures']}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+_mongo_listener_registered = False
+
+
+def init_app(app: Flask) -> None:
+    """Install the timing hooks. Call after db.init_app and before any Mongo use."""
+    global _mongo_listener_registered
+    if not METRICS_ENABLED:
+        return
+
+    # Global registration applies to every MongoClient created afterwards,
+    # including the ones rebuilt in forked workers.
+    if not _mongo_listener_registered:
+        monitoring.register(_MongoCommandMetrics())
+        _mongo_listener_registered = True
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def _start_timer():
+        _local.tally = _RequestTally()
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        started = g.pop("metrics_started", None)
+        tally = _tally()
+        if started is None or tally is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        registry.record_request(request.method, route, response.status_code, elapsed, tally)
+        # For streamed responses this covers the time to the first byte.
+        response.headers.add(
+            "Server-Timing",
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'mongo;dur={tally.mongo_seconds * 1000:.1f};desc="{tally.mongo_count} commands", '
+            f'sql;dur={tally.sql_seconds * 1000:.1f};desc="{tally.sql_count} statements"',
+        )
+        return response
+
+    @app.teardown_request
+    def _clear(exc):
+        _local.tally = None
@@ -5,24 +5,6 @@ from datetime import datetime
 from .db import db
 
 
-class MenuItem(db.Model):
-    __tablename__ = "menu_items"
-
-    id = db.Column(db.String(32), primary_key=True)
-    name = db.Column(db.String(120), nullable=False)
-    description = db.Column(db.Text, nullable=False)
-    price = db.Column(db.Integer, nullable=False)
-    image = db.Column(db.Text, nullable=False)
-    is_veg = db.Column(db.Boolean, nullable=False, default=True)
-    category = db.Column(db.String(64), nullable=False)
-    available = db.Column(db.Boolean, nullable=False, default=True)
-    popular = db.Column(db.Boolean, nullable=False, default=False)
-    todays_special = db.Column(db.Boolean, nullable=False, default=False)
-    calories = db.Column(db.Integer, nullable=False, default=0)
-    prep_time = db.Column(db.String(32), nullable=False, default="")
-    offer = db.Column(db.String(64), nullable=True)
-
-
 class Offer(db.Model):
     __tablename__ = "offers"
 
@@ -66,6 +48,12 @@ class Table(db.Model):
 
 class TableReservation(db.Model):
     __tablename__ = "table_reservations"
+    __table_args__ = (
+        # Availability: reserved tables per (date, slot), covered by the index
+        db.Index("ix_table_reservations_date_slot_table", "date", "time_slot", "table_number"),
+        # GET /reservations?userId=... by date
+        db.Index("ix_table_reservations_user_date", "user_id", "date"),
+    )
 
     reservation_id = db.Column(db.String(32), primary_key=True)
     user_id = db.Column(db.String(200), nullable=False)
@@ -111,6 +99,14 @@ class QueueEntry(db.Model):
 
 class Notification(db.Model):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Unread badge: WHERE user_id = ? AND is_read = 0
+        db.Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        # Feed: WHERE user_id = ? (or IS NULL) ORDER BY created_at DESC
+        db.Index("ix_notifications_user_created", "user_id", "created_at"),
+        # Feed without a user filter
+        db.Index("ix_notifications_created", "created_at"),
+    )
 
     id = db.Column(db.String(64), primary_key=True)
     user_id = db.Column(db.String(200), nullable=True)
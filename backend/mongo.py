@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.collection import Collection
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from .mongo_pool import client_options, pool_stats
 
 # Load .env locally from the backend directory
 env_path = Path(__file__).resolve().parent / ".env"
@@ -15,16 +20,130 @@ load_dotenv(dotenv_path=env_path)
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://127.0.0.1:27017/restaurant_db")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "").strip()
 
+logger = logging.getLogger(__name__)
+
+# Every index the API relies on, declared once. ``ensure_indexes`` builds them
+# at startup (see ``create_app``) and ``python -m backend.indexes`` reports
+# drift between this list and the live database.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel("email", unique=True),
+    ],
+    "menu_items": [
+        IndexModel("id", unique=True),
+        IndexModel("category"),
+        IndexModel("isVeg"),
+    ],
+    "feedback": [
+        IndexModel("id", unique=True),
+        IndexModel("userId"),
+        IndexModel("orderId"),
+        IndexModel("createdAt"),
+        # Keyset pagination for GET /feedback
+        IndexModel([("userId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "orders": [
+        IndexModel("id", unique=True),
+        IndexModel("userId"),
+        IndexModel("date"),
+        # Keyset pagination for GET /orders
+        IndexModel([("userId", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("date", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "reservations": [
+        IndexModel("reservationId", unique=True),
+        IndexModel("userId"),
+        IndexModel("date"),
+        IndexModel("timeSlot"),
+        # Reserved tables per (date, slot) for availability, covered by the index
+        IndexModel([("date", ASCENDING), ("timeSlot", ASCENDING), ("tableNumber", ASCENDING)]),
+        # Keyset pagination for GET /reservations
+        IndexModel([("userId", ASCENDING), ("date", DESCENDING), ("timeSlot", ASCENDING), ("_id", DESCENDING)]),
+    ],
+    "reservation_waiting_queue": [
+        IndexModel("queueId", unique=True),
+        IndexModel("userId"),
+        IndexModel("date"),
+        IndexModel("timeSlot"),
+        # Keyset pagination for GET /reservation-waiting-queue
+        IndexModel([
+            ("userId", ASCENDING), ("date", DESCENDING), ("timeSlot", ASCENDING),
+            ("position", ASCENDING), ("_id", DESCENDING),
+        ]),
+    ],
+    # Tables, offers and notifications live here with DATA_STORE=mongo (see
+    # backend/repositories); tableNumber mirrors reservations.tableNumber.
+    "tables": [
+        IndexModel("tableId", unique=True),
+        IndexModel("tableNumber"),
+    ],
+    "offers": [
+        IndexModel("id", unique=True),
+    ],
+    "notifications": [
+        IndexModel("id", unique=True),
+        IndexModel([("userId", ASCENDING), ("createdAt", DESCENDING)]),
+        IndexModel([("createdAt", DESCENDING)]),
+    ],
+    "queue_entries": [
+        IndexModel("id", unique=True),
+        IndexModel("userId"),
+        IndexModel("queueDate"),
+        IndexModel("timeSlot"),
+        # Compound index for position calculation
+        IndexModel([("queueDate", ASCENDING), ("guests", ASCENDING), ("hall", ASCENDING), ("segment", ASCENDING)]),
+        # Keyset pagination for GET /queue?queueDate=...
+        IndexModel([("queueDate", DESCENDING), ("timeSlot", ASCENDING), ("position", ASCENDING), ("_id", DESCENDING)]),
+        # Queue group in joinedAt order, for resequencing
+        IndexModel([
+            ("queueDate", ASCENDING), ("timeSlot", ASCENDING), ("guests", ASCENDING),
+            ("hall", ASCENDING), ("segment", ASCENDING), ("joinedAt", ASCENDING),
+        ]),
+    ],
+}
+
 _client: Optional[MongoClient] = None
+_collections: Dict[str, Collection] = {}
 
 
 def _get_client() -> MongoClient:
     global _client
     if _client is None:
-        _client = MongoClient(MONGO_URI)
+        _client = MongoClient(MONGO_URI, event_listeners=[pool_stats], **client_options())
     return _client
 
 
+def reset_client() -> None:
+    """Forget the client and cached collections; the next call reconnects.
+
+    A forked child must not use sockets (or monitor threads) inherited from
+    its parent. This runs automatically in every forked child.
+    """
+    global _client
+    _client = None
+    _collections.clear()
+    pool_stats.reset()
+
+
+def mongo_pool_stats() -> dict:
+    """Pool counters for this process plus the effective pool options."""
+    stats = pool_stats.stats()
+    stats["connected"] = _client is not None
+    if _client is not None:
+        opts = _client.options.pool_options
+        stats["maxPoolSize"] = opts.max_pool_size
+        stats["minPoolSize"] = opts.min_pool_size
+        stats["waitQueueTimeoutMS"] = int(opts.wait_queue_timeout * 1000) if opts.wait_queue_timeout else None
+        stats["compressors"] = client_options().get("compressors")
+        stats["readPreference"] = _client.read_preference.mongos_mode
+    return stats
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_client)
+
+
 def get_db():
     client = _get_client()
     if MONGO_DB_NAME:
@@ -32,92 +151,109 @@ def get_db():
     return client.get_database()
 
 
-def get_users_collection():
+def _collection(name: str) -> Collection:
+    col = _collections.get(name)
+    if col is None:
+        col = _collections[name] = get_db().get_collection(name)
+    return col
+
+
+def _index_signature(keys, unique: bool) -> tuple:
+    return tuple((str(field), direction) for field, direction in keys), bool(unique)
+
+
+def _index_label(keys) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def ensure_indexes() -> bool:
+    """Create every declared index. Returns False if Mongo was unreachable."""
     db = get_db()
-    users = db.get_collection("users")
-    try:
-        users.create_index("email", unique=True)
-    except Exception:
-        # Index creation can race on startup; ignore if it already exists.
-        pass
-    return users
+    for name, models in INDEXES.items():
+        try:
+            db.get_collection(name).create_indexes(models)
+        except ConnectionFailure as exc:
+            logger.warning("MongoDB unreachable, skipping index build: %s", exc)
+            return False
+        except OperationFailure as exc:
+            # An existing index with the same name but different options;
+            # leave it alone and let `python -m backend.indexes` report it.
+            logger.warning("Could not build indexes for %s: %s", name, exc)
+    return True
 
 
-def get_menu_collection():
+def diff_indexes() -> Dict[str, Dict[str, List[str]]]:
+    """Compare declared indexes with the live ones, per collection."""
     db = get_db()
-    menu = db.get_collection("menu_items")
-    try:
-        menu.create_index("id", unique=True)
-        menu.create_index("category")
-        menu.create_index("isVeg")
-    except Exception:
-        pass
-    return menu
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for name, models in INDEXES.items():
+        declared = {}
+        for model in models:
+            doc = model.document
+            keys = list(doc["key"].items())
+            declared[_index_signature(keys, doc.get("unique", False))] = _index_label(keys)
+
+        live = {}
+        for index_name, info in db.get_collection(name).index_information().items():
+            if index_name == "_id_":
+                continue
+            live[_index_signature(info["key"], info.get("unique", False))] = index_name
+
+        report[name] = {
+            "missing": sorted(label for sig, label in declared.items() if sig not in live),
+            "extra": sorted(label for sig, label in live.items() if sig not in declared),
+        }
+    return report
+
+
+def get_users_collection():
+    return _collection("users")
+
+
+def get_menu_collection():
+    return _collection("menu_items")
 
 
 def get_feedback_collection():
-    db = get_db()
-    feedback = db.get_collection("feedback")
-    try:
-        feedback.create_index("id", unique=True)
-        feedback.create_index("userId")
-        feedback.create_index("orderId")
-        feedback.create_index("createdAt")
-    except Exception:
-        pass
-    return feedback
+    return _collection("feedback")
 
 
 def get_orders_collection():
-    db = get_db()
-    orders = db.get_collection("orders")
-    try:
-        orders.create_index("id", unique=True)
-        orders.create_index("userId")
-        orders.create_index("date")
-    except Exception:
-        pass
-    return orders
+    return _collection("orders")
 
 
 def get_reservations_collection():
-    db = get_db()
-    reservations = db.get_collection("reservations")
-    try:
-        reservations.create_index("reservationId", unique=True)
-        reservations.create_index("userId")
-        reservations.create_index("date")
-        reservations.create_index("timeSlot")
-    except Exception:
-        pass
-    return reservations
+    return _collection("reservations")
 
 
 def get_waiting_queue_collection():
-    db = get_db()
-    waiting = db.get_collection("reservation_waiting_queue")
-    try:
-        waiting.create_index("queueId", unique=True)
-        waiting.create_index("userId")
-        waiting.create_index("date")
-        waiting.create_index("timeSlot")
-    except Exception:
-        pass
-    return waiting
+    return _collection("reservation_waiting_queue")
+
 
 def get_queue_collection():
-    db = get_db()
-    queue = db.get_collection("queue_entries")
-    try:
-        queue.create_index("id", unique=True)
-        queue.create_index("userId")
-        queue.create_index("queueDate")
-        queue.create_index("timeSlot")
-        queue.create_index([("queueDate", 1), ("guests", 1), ("hall", 1), ("segment", 1)])  # Compound index for position calculation
-    except Exception:
-        pass
-    return queue
+    return _collection("queue_entries")
+
+
+def get_tables_collection():
+    return _collection("tables")
+
+
+def get_offers_collection():
+    return _collection("offers")
+
+
+def get_notifications_collection():
+    return _collection("notifications")
+
+
+def get_counters_collection():
+    return _collection("counters")
+
+
+def get_meta_collection():
+    return _collection("meta")
 
 
 def utc_now() -> str:
-    return datetime.utcnow().isoformat() + "Z"
+    # Always with microseconds, so these strings sort in time order.
+    return datetime.utcnow().isoformat(timespec="microseconds") + "Z"
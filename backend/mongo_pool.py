@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+
+# MongoClient pool settings. Unset variables keep the driver defaults (or
+# whatever the MONGO_URI query string says); set ones take precedence.
+_INT_OPTIONS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+}
+_STR_OPTIONS = {
+    # e.g. "zstd,snappy,zlib"; the server picks the first one both sides support.
+    "compressors": "MONGO_COMPRESSORS",
+    # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    "readPreference": "MONGO_READ_PREFERENCE",
+}
+
+
+def client_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    for option, env in _INT_OPTIONS.items():
+        raw = os.getenv(env, "").strip()
+        if raw:
+            options[option] = int(raw)
+    for option, env in _STR_OPTIONS.items():
+        raw = os.getenv(env, "").strip()
+        if raw:
+            options[option] = raw
+    return options
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters for this process: connections open and checked
+    out, and how long request threads waited to check one out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._open = 0
+            self._checked_out = 0
+            self._checkouts = 0
+            self._failures: Dict[str, int] = {}
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+            self._cleared = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "open": self._open,
+                "checkedOut": self._checked_out,
+                "checkouts": self._checkouts,
+                "checkoutFailures": dict(self._failures),
+                "waitAvgMs": self._wait_total * 1000 / self._checkouts if self._checkouts else 0.0,
+                "waitMaxMs": self._wait_max * 1000,
+                "poolCleared": self._cleared,
+            }
+
+    def _waited(self) -> float:
+        started = getattr(self._waits, "started", None)
+        self._waits.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    # Checkout started/succeeded/failed fire on the requesting thread.
+    def connection_check_out_started(self, event) -> None:
+        self._waits.started = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        waited = self._waited()
+        with self._lock:
+            self._checked_out += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._waited()
+        with self._lock:
+            self._failures[event.reason] = self._failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self._checked_out -= 1
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self._open += 1
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self._open -= 1
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self._cleared += 1
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+
+pool_stats = PoolStats()
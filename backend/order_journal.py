@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from .mongo import get_orders_collection
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # everywhere else
+    msvcrt = None
+
+
+logger = logging.getLogger(__name__)
+
+# Write-behind for orders (off by default). With ORDERS_WRITE_BEHIND=1
+# POST/PATCH /orders answer once the order is fsynced to a local append-only
+# journal; a background thread upserts pending orders into Mongo with one
+# bulk_write per batch, and empties the journal whenever everything in it has
+# been flushed. Each process journals to its own file in ORDERS_JOURNAL_DIR
+# and holds a lock on it; a journal whose lock is free was left by a process
+# that died, and is replayed into Mongo at startup (and every
+# ORDERS_JOURNAL_SWEEP_SECONDS by the surviving processes). Upserts only
+# replace an order whose stored updatedAt is not newer, so replaying an old
+# version never undoes a later change made elsewhere. That guard relies on
+# the unique index on orders.id, so write-behind only starts once the index
+# is confirmed; until then orders are written synchronously.
+ORDERS_WRITE_BEHIND = os.getenv("ORDERS_WRITE_BEHIND", "0").strip() == "1"
+JOURNAL_DIR = os.getenv("ORDERS_JOURNAL_DIR", str(Path(__file__).resolve().parent / "journal"))
+FLUSH_INTERVAL_SECONDS = int(os.getenv("ORDERS_FLUSH_INTERVAL_MS", "50")) / 1000
+FLUSH_BATCH = int(os.getenv("ORDERS_FLUSH_BATCH", "500"))
+# Past this many unflushed orders (Mongo down or far behind), orders are
+# written synchronously again so memory and the journal stay bounded.
+MAX_PENDING = int(os.getenv("ORDERS_MAX_PENDING", "50000"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("ORDERS_JOURNAL_SWEEP_SECONDS", "30"))
+RETRY_SECONDS = 1.0
+INDEX_RECHECK_SECONDS = 30.0
+DUPLICATE_KEY = 11000
+
+_PREFIX = "orders-"
+_SUFFIX = ".jsonl"
+
+
+def _try_lock(fd: int) -> bool:
+    """Take a non-blocking exclusive lock, held for as long as `fd` stays open."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _encode(doc: dict) -> bytes:
+    return json.dumps(doc, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _open_journal(path: str) -> int:
+    # Unbuffered, so a forked child can drop its copy of the descriptor
+    # without flushing anything (see _forget_writer).
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+    return os.open(path, flags, 0o644)
+
+
+def _upsert_orders(docs: List[dict]) -> None:
+    """Upsert full orders by id, leaving alone any whose stored updatedAt is newer."""
+    ops = []
+    for d in docs:
+        query = {"id": d["id"]}
+        if d.get("updatedAt"):
+            query["updatedAt"] = {"$not": {"$gt": d["updatedAt"]}}
+        ops.append(UpdateOne(query, {"$set": d}, upsert=True))
+    try:
+        get_orders_collection().bulk_write(ops, ordered=False)
+    except BulkWriteError as exc:
+        # A newer stored version makes the filter miss and the upsert collide
+        # with the unique id: that order is already up to date.
+        details = exc.details or {}
+        if details.get("writeConcernErrors") or any(
+            e.get("code") != DUPLICATE_KEY for e in details.get("writeErrors", [])
+        ):
+            raise
+
+
+def orders_id_is_unique() -> bool:
+    """Whether orders has its unique index on id, without which the guarded upserts can insert duplicates."""
+    try:
+        info = get_orders_collection().index_information()
+    except PyMongoError as exc:
+        logger.warning("Could not read the orders indexes: %s", exc)
+        return False
+    return any(ix.get("unique") and list(ix.get("key", [])) == [("id", 1)] for ix in info.values())
+
+
+def _journals(directory: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"{_PREFIX}*{_SUFFIX}")))
+
+
+def _read_journal(fh) -> Dict[str, dict]:
+    """Latest journaled version of each order; a torn last line (crash mid-write) is skipped."""
+    docs: Dict[str, dict] = {}
+    for line in fh:
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            continue
+        docs[doc["id"]] = doc
+    return docs
+
+
+def replay_journals(directory: str = JOURNAL_DIR, own: Optional[str] = None) -> int:
+    """Upsert the orders of journals left by dead processes, then delete them. Returns orders replayed."""
+    replayed = 0
+    for path in _journals(directory):
+        if path == own:
+            continue
+        try:
+            fh = open(path, "rb")
+        except FileNotFoundError:
+            continue
+        with fh:
+            if not _try_lock(fh.fileno()):
+                continue  # its process is alive
+            try:
+                if fcntl is not None and os.fstat(fh.fileno()).st_ino != os.stat(path).st_ino:
+                    continue
+            except FileNotFoundError:
+                continue  # replayed and deleted by another process meanwhile
+            fh.seek(0)
+            docs = list(_read_journal(fh).values())
+            for i in range(0, len(docs), FLUSH_BATCH):
+                _upsert_orders(docs[i:i + FLUSH_BATCH])
+            replayed += len(docs)
+            if fcntl is not None:
+                os.remove(path)  # still under the lock, so nobody replays it twice
+        if fcntl is None:
+            os.remove(path)  # Windows cannot delete an open file
+    return replayed
+
+
+def find_in_journals(order_id: str, directory: str = JOURNAL_DIR, own: Optional[str] = None) -> Optional[dict]:
+    """
+    The newest version of an order in the journals of other processes, for
+    an order taken by another worker that has not reached Mongo yet.
+    """
+    needle = json.dumps(order_id).encode("utf-8")
+    found: Optional[dict] = None
+    for path in _journals(directory):
+        if path == own:
+            continue
+        try:
+            with open(path, "rb") as fh:
+                for line in fh:
+                    if needle not in line:
+                        continue
+                    try:
+                        doc = json.loads(line)
+                    except ValueError:
+                        continue
+                    if doc.get("id") == order_id and (
+                        found is None or doc.get("updatedAt", "") >= found.get("updatedAt", "")
+                    ):
+                        found = doc
+        except FileNotFoundError:
+            continue
+    return found
+
+
+def journal_orders(directory: str = JOURNAL_DIR, own: Optional[str] = None, user_id: Optional[str] = None) -> List[dict]:
+    """The newest version of each order in the journals of other processes, optionally only `user_id`'s."""
+    needle = json.dumps(user_id).encode("utf-8") if user_id is not None else None
+    found: Dict[str, dict] = {}
+    for path in _journals(directory):
+        if path == own:
+            continue
+        try:
+            with open(path, "rb") as fh:
+                for line in fh:
+                    if needle is not None and needle not in line:
+                        continue
+                    try:
+                        doc = json.loads(line)
+                    except ValueError:
+                        continue
+                    if user_id is not None and doc.get("userId") != user_id:
+                        continue
+                    seen = found.get(doc["id"])
+                    if seen is None or doc.get("updatedAt", "") >= seen.get("updatedAt", ""):
+                        found[doc["id"]] = doc
+        except FileNotFoundError:
+            continue
+    return list(found.values())
+
+
+def replay_at_startup() -> None:
+    """Called from create_app when write-behind is on."""
+    if not orders_id_is_unique():
+        logger.warning("Not replaying order journals: orders has no unique index on id yet.")
+        return
+    try:
+        replayed = replay_journals()
+    except PyMongoError as exc:
+        logger.warning("Could not replay order journals, will retry: %s", exc)
+        return
+    if replayed:
+        logger.info("Replayed %d orders from order journals", replayed)
+
+
+class OrderWriteBehind:
+    """One process's order journal plus the thread that flushes it to Mongo."""
+
+    def __init__(self, directory: str = JOURNAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pid = os.getpid()
+        self.path = os.path.join(directory, f"{_PREFIX}{self.pid}-{uuid.uuid4().hex[:8]}{_SUFFIX}")
+        if fcntl is not None:
+            # Lock first, then take the journal name, so a sweep never sees
+            # this file unlocked.
+            self._fd = _open_journal(self.path + ".new")
+            _try_lock(self._fd)
+            os.replace(self.path + ".new", self.path)
+        else:
+            self._fd = _open_journal(self.path)
+            _try_lock(self._fd)
+        self._closed = False
+
+        self._lock = threading.Lock()  # journal appends and `pending`
+        self._sync_lock = threading.Lock()  # one fsync at a time
+        self._flush_lock = threading.Lock()
+        self._written = 0  # appends so far
+        self._synced = 0  # appends covered by an fsync
+        self.pending: Dict[str, dict] = {}
+        self.flushed = 0
+        self.failures = 0
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._last_sweep = 0.0
+        self._thread = threading.Thread(target=self._run, name="orders-write-behind", daemon=True)
+        self._thread.start()
+
+    def get(self, order_id: str) -> Optional[dict]:
+        """The not-yet-flushed version of an order written by this process."""
+        with self._lock:
+            return self.pending.get(order_id)
+
+    def find(self, order_id: str) -> Optional[dict]:
+        """Like get(), falling back to the journals of the other processes."""
+        return self.get(order_id) or find_in_journals(order_id, self.directory, own=self.path)
+
+    def pending_orders(self, user_id: Optional[str] = None) -> List[dict]:
+        """Orders not flushed yet, this process's and those journaled by the others."""
+        with self._lock:
+            mine = [d for d in self.pending.values() if user_id is None or d.get("userId") == user_id]
+        theirs = journal_orders(self.directory, own=self.path, user_id=user_id)
+        return mine + [d for d in theirs if all(m["id"] != d["id"] for m in mine)]
+
+    def write(self, doc: dict) -> bool:
+        """
+        Journal `doc` (a full order, upserted by id) and queue it for Mongo.
+        Returns once it is fsynced, or False without journaling it when too
+        many orders are pending; write it to Mongo directly then.
+        """
+        line = _encode(doc)
+        with self._lock:
+            if len(self.pending) >= MAX_PENDING and doc["id"] not in self.pending:
+                return False
+            view = memoryview(line)
+            while view:
+                view = view[os.write(self._fd, view):]
+            self._written += 1
+            seq = self._written
+            self.pending[doc["id"]] = doc
+            backlog = len(self.pending)
+        self._sync(seq)
+        if backlog >= FLUSH_BATCH:
+            self._wake.set()
+        return True
+
+    def save(self, doc: dict) -> None:
+        """write(), or a direct (still version-guarded) upsert when too many orders are pending."""
+        if not self.write(doc):
+            _upsert_orders([doc])
+
+    def _sync(self, seq: int) -> None:
+        # Group commit: one fsync covers every append made before it started,
+        # so concurrent requests share it instead of queueing for their own.
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target = self._written
+            os.fsync(self._fd)
+            self._synced = target
+
+    def flush(self) -> bool:
+        """Upsert pending orders into Mongo in batches. False if Mongo failed; they stay pending."""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = list(islice(self.pending.values(), FLUSH_BATCH))
+                if not batch:
+                    return True
+                try:
+                    _upsert_orders(batch)
+                except PyMongoError as exc:
+                    self.failures += 1
+                    logger.warning("Order write-behind flush failed, %d pending: %s", len(self.pending), exc)
+                    return False
+                with self._lock:
+                    for doc in batch:
+                        # A newer version written meanwhile stays pending.
+                        if self.pending.get(doc["id"]) is doc:
+                            del self.pending[doc["id"]]
+                    self.flushed += len(batch)
+                    if not self.pending:
+                        # Everything journaled is in Mongo now. No fsync: if
+                        # the truncation is lost, replay is merely redundant.
+                        os.ftruncate(self._fd, 0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            if not self.flush():
+                self._stop.wait(RETRY_SECONDS)
+            if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+                self._last_sweep = time.monotonic()
+                try:
+                    replay_journals(self.directory, own=self.path)
+                except PyMongoError as exc:
+                    logger.warning("Could not replay order journals: %s", exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self.pending), "flushed": self.flushed, "failures": self.failures}
+
+    def close(self) -> None:
+        """Stop the flusher and flush what is left; the journal is deleted if nothing remains."""
+        if os.getpid() != self.pid or self._closed:
+            return  # a forked child's copy (the journal belongs to the parent), or closed already
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=10)
+        done = self.flush()
+        os.close(self._fd)
+        if done:
+            os.remove(self.path)
+
+    def _detach(self) -> None:
+        # In a forked child: flock belongs to the open file, which the child
+        # shares, so keeping the descriptor would keep the parent's journal
+        # looking alive after the parent dies.
+        self._closed = True
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+_writer: Optional[OrderWriteBehind] = None
+_writer_lock = threading.Lock()
+_index_missing_at: Optional[float] = None
+
+
+def _index_ready() -> bool:
+    # Caller holds _writer_lock. While the index is missing (MONGO_ENSURE_INDEXES=0,
+    # or Mongo was down at startup) it is looked for again every INDEX_RECHECK_SECONDS.
+    global _index_missing_at
+    now = time.monotonic()
+    if _index_missing_at is not None and now - _index_missing_at < INDEX_RECHECK_SECONDS:
+        return False
+    if orders_id_is_unique():
+        return True
+    _index_missing_at = now
+    logger.warning("ORDERS_WRITE_BEHIND=1 but orders has no unique index on id; writing orders synchronously.")
+    return False
+
+
+def get_order_writer() -> Optional[OrderWriteBehind]:
+    """
+    This process's writer, started on first use; None unless ORDERS_WRITE_BEHIND=1
+    and the unique index on orders.id exists.
+    """
+    global _writer
+    if not ORDERS_WRITE_BEHIND:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                if not _index_ready():
+                    return None
+                _writer = OrderWriteBehind()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def write_behind_stats() -> Optional[dict]:
+    """Pending/flushed counts of this process's writer, or None if it has not started."""
+    writer = _writer
+    return writer.stats() if writer is not None else None
+
+
+def _forget_writer() -> None:
+    # The parent's flusher thread does not exist in a forked child.
+    global _writer
+    if _writer is not None:
+        _writer._detach()
+    _writer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_writer)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from functools import cmp_to_key
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId, json_util
+from flask import Request
+from pymongo import ASCENDING, DESCENDING
+from sqlalchemy import and_, or_
+
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+# Cursor values are compared against, never used as, query operators.
+_CURSOR_SCALARS = (type(None), bool, int, float, str, datetime, ObjectId)
+
+
+class PageParamsError(ValueError):
+    """Bad `limit` or `cursor` query parameter; the message is the API error code."""
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque `cursor` parameter carrying `values`; page_params decodes it."""
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> List[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    if not isinstance(values, list):
+        raise ValueError("cursor must be a list")
+    if not all(isinstance(v, _CURSOR_SCALARS) for v in values):
+        raise ValueError("cursor values must be scalars")
+    return values
+
+
+def page_params(request: Request) -> Tuple[int, Optional[List[Any]]]:
+    """
+    Read `limit` / `cursor` from the query string. `limit` defaults to
+    DEFAULT_PAGE_LIMIT, so every list response is bounded; callers that want
+    everything follow `nextCursor`.
+    """
+    raw_limit = request.args.get("limit")
+    raw_cursor = request.args.get("cursor")
+
+    limit = DEFAULT_PAGE_LIMIT
+    if raw_limit is not None:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise PageParamsError("invalid_limit")
+        if limit <= 0:
+            raise PageParamsError("invalid_limit")
+        limit = min(limit, MAX_PAGE_LIMIT)
+
+    values = None
+    if raw_cursor:
+        try:
+            values = _decode_cursor(raw_cursor)
+        except Exception:
+            raise PageParamsError("invalid_cursor")
+    return limit, values
+
+
+def _after(sort: Sequence[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """Filter for rows strictly after `values` in `sort` order (keyset seek)."""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        value = values[i]
+        prefix = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        if value is None:
+            # null sorts lowest: nothing is below it, everything non-null is above it.
+            if direction == DESCENDING:
+                continue
+            branches.append({**prefix, field: {"$ne": None}})
+        elif direction == DESCENDING:
+            branches.append({**prefix, "$or": [{field: {"$lt": value}}, {field: None}]})
+        else:
+            branches.append({**prefix, field: {"$gt": value}})
+    return {"$or": branches} if branches else {"_id": {"$exists": False}}
+
+
+def find_page(
+    col,
+    query: Dict[str, Any],
+    sort: Sequence[Tuple[str, int]],
+    limit: Optional[int],
+    cursor: Optional[List[Any]],
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Keyset pagination over `col.find(query)` ordered by `sort`, with `_id` as
+    the final tie-breaker. Each page is a bounded index seek, so its cost does
+    not grow with how deep the client has paged. Returns (rows, nextCursor);
+    nextCursor is None on the last page or when `limit` is None.
+    """
+    sort = [*sort, ("_id", sort[0][1] if sort else ASCENDING)]
+    if cursor is not None:
+        if len(cursor) != len(sort):
+            raise PageParamsError("invalid_cursor")
+        query = {"$and": [query, _after(sort, cursor)]} if query else _after(sort, cursor)
+
+    if projection is not None:
+        projection = {**projection, **{field: 1 for field, _ in sort}}
+
+    docs = col.find(query, projection).sort(sort)
+    if limit is None:
+        return list(docs), None
+
+    rows = list(docs.limit(limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([_get_path(last, field) for field, _ in sort])
+
+
+def _get_path(doc: Dict[str, Any], field: str) -> Any:
+    value: Any = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+# The same keyset paging for the non-Mongo repositories (see
+# backend/repositories). There the caller puts a unique column last in
+# `sort`, in place of Mongo's _id.
+
+def sql_page(
+    session,
+    stmt,
+    sort: Sequence[Tuple[Any, int]],
+    limit: Optional[int],
+    cursor: Optional[List[Any]],
+) -> Tuple[List[Any], Optional[str]]:
+    """`find_page` for a SQLAlchemy select of one entity; `sort` holds (column, direction) pairs of non-null columns."""
+    if cursor is not None:
+        if len(cursor) != len(sort):
+            raise PageParamsError("invalid_cursor")
+        branches = []
+        for i, (column, direction) in enumerate(sort):
+            prefix = [c == v for (c, _), v in zip(sort[:i], cursor[:i])]
+            beyond = column < cursor[i] if direction == DESCENDING else column > cursor[i]
+            branches.append(and_(*prefix, beyond))
+        stmt = stmt.where(or_(*branches))
+    stmt = stmt.order_by(*[c.desc() if d == DESCENDING else c.asc() for c, d in sort])
+    if limit is None:
+        return list(session.scalars(stmt)), None
+
+    rows = list(session.scalars(stmt.limit(limit + 1)))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], c.key) for c, _ in sort])
+
+
+def _compare_values(a: List[Any], b: List[Any], sort: Sequence[Tuple[str, int]]) -> int:
+    for (_, direction), x, y in zip(sort, a, b):
+        if x == y:
+            continue
+        # null sorts lowest, as in Mongo.
+        below = x is None or (y is not None and x < y)
+        return (-1 if below else 1) * (1 if direction == ASCENDING else -1)
+    return 0
+
+
+def list_page(
+    docs: List[Dict[str, Any]],
+    sort: Sequence[Tuple[str, int]],
+    limit: Optional[int],
+    cursor: Optional[List[Any]],
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """`find_page` over an in-memory list of documents."""
+    def values(doc):
+        return [_get_path(doc, field) for field, _ in sort]
+
+    ordered = sorted(docs, key=cmp_to_key(lambda a, b: _compare_values(values(a), values(b), sort)))
+    if cursor is not None:
+        if len(cursor) != len(sort):
+            raise PageParamsError("invalid_cursor")
+        ordered = [d for d in ordered if _compare_values(values(d), cursor, sort) > 0]
+    if limit is None or len(ordered) <= limit:
+        return ordered, None
+    rows = ordered[:limit]
+    return rows, encode_cursor(values(rows[-1]))
+
+
+def overlay_page(
+    rows: List[Dict[str, Any]],
+    extra: List[Dict[str, Any]],
+    sort: Sequence[Tuple[str, int]],
+    cursor: Optional[List[Any]],
+    full: bool,
+) -> List[Dict[str, Any]]:
+    """
+    A `find_page` page with `extra` documents (not stored yet, e.g. orders
+    still in the write-behind journal) merged in by `id`. An extra document
+    replaces the row with its id unless that row's updatedAt is newer, and
+    joins the page if its `sort` values fall within the page's range; `full`
+    says whether the page had a nextCursor. Pages can run a few over `limit`.
+    """
+    if not extra:
+        return rows
+    lower = [_get_path(rows[-1], field) for field, _ in sort] if full and rows else None
+    upper = cursor[:len(sort)] if cursor is not None else None
+
+    def values(doc):
+        return [_get_path(doc, field) for field, _ in sort]
+
+    by_id = {row.get("id"): i for i, row in enumerate(rows)}
+    merged = list(rows)
+    for doc in extra:
+        i = by_id.get(doc.get("id"))
+        if i is not None:
+            if str(doc.get("updatedAt") or "") >= str(merged[i].get("updatedAt") or ""):
+                merged[i] = doc
+            continue
+        # Ties with a boundary row belong to the earlier page, as in find_page.
+        if upper is not None and _compare_values(values(doc), upper, sort) <= 0:
+            continue
+        if lower is not None and _compare_values(values(doc), lower, sort) > 0:
+            continue
+        merged.append(doc)
+    return sorted(merged, key=cmp_to_key(lambda a, b: _compare_values(values(a), values(b), sort)))
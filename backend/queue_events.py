@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+
+from pymongo.errors import PyMongoError
+
+from .mongo import get_queue_collection
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Wake-up handle for one streaming client.
+
+    Publishes are coalesced: however many changes land between two waits,
+    the subscriber wakes once and re-reads the current state.
+    """
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self._event = threading.Event()
+
+    def notify(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        changed = self._event.wait(timeout)
+        self._event.clear()
+        return changed
+
+
+class InMemoryQueueEvents:
+    """In-process pub/sub keyed by queue userId.
+
+    Only reaches subscribers in the same process; use the Mongo change-stream
+    variant when running several workers.
+    """
+
+    # Whether writes made by other processes reach this broker's subscribers.
+    cross_process = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, user_id: Optional[str]) -> None:
+        if not user_id:
+            return
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for sub in targets:
+            sub.notify()
+
+    def publish_all(self) -> None:
+        with self._lock:
+            targets = [sub for subs in self._subscribers.values() for sub in subs]
+        for sub in targets:
+            sub.notify()
+
+    @contextmanager
+    def subscribe(self, user_id: str) -> Iterator[Subscription]:
+        sub = Subscription(user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(user_id)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+class MongoChangeStreamQueueEvents(InMemoryQueueEvents):
+    """Feeds the in-process subscribers from a change stream on queue_entries.
+
+    Picks up writes made by other workers or processes. Needs a replica set
+    (change streams are not available on a standalone mongod).
+    """
+
+    cross_process = True
+
+    def __init__(self):
+        super().__init__()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, user_id: str) -> Iterator[Subscription]:
+        self._ensure_watcher()
+        with super().subscribe(user_id) as sub:
+            yield sub
+
+    def _ensure_watcher(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._watch, name="queue-change-stream", daemon=True)
+            self._thread.start()
+
+    def _watch(self) -> None:
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        try:
+            with get_queue_collection().watch(pipeline, full_document="updateLookup") as stream:
+                for change in stream:
+                    doc = change.get("fullDocument") or {}
+                    if doc.get("userId"):
+                        self.publish(doc["userId"])
+                    else:
+                        # Deletes carry only the _id; let every subscriber re-check.
+                        self.publish_all()
+        except PyMongoError as exc:
+            logger.warning("Queue change stream stopped: %s", exc)
+
+
+QUEUE_EVENTS = os.getenv("QUEUE_EVENTS", "memory").strip().lower()
+
+_events: Optional[InMemoryQueueEvents] = None
+
+
+def get_queue_events() -> InMemoryQueueEvents:
+    global _events
+    if _events is None:
+        _events = MongoChangeStreamQueueEvents() if QUEUE_EVENTS == "mongo" else InMemoryQueueEvents()
+    return _events
+
+
+def set_queue_events(events: Optional[InMemoryQueueEvents]) -> None:
+    """Swap the broker, e.g. for a fresh in-memory one in tests."""
+    global _events
+    _events = events
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional
+
+from .base import (
+    NotificationRepository, OfferRepository, Repositories, ReservationRepository, TableRepository,
+    table_id, table_number,
+)
+
+# Where tables, offers, notifications and reservations live:
+#   split  - tables, offers, notifications in SQLite; reservations in Mongo (default)
+#   sql    - all four in SQLite, so availability joins reservations to tables
+#   mongo  - all four in Mongo, joined with $lookup
+#   memory - in-process dicts (development and benchmarks)
+# Only these four. Users, menu, orders, waiting queue, queue and feedback
+# stay in MongoDB whatever the mode, so every mode still needs a mongod.
+DATA_STORE = os.getenv("DATA_STORE", "split").strip().lower()
+DATA_STORES = ("split", "sql", "mongo", "memory")
+
+_lock = threading.Lock()
+_repositories: Optional[Repositories] = None
+
+
+def build_repositories(mode: str) -> Repositories:
+    if mode == "memory":
+        from .memory import (
+            MemoryNotificationRepository, MemoryOfferRepository, MemoryReservationRepository, MemoryTableRepository,
+        )
+
+        tables = MemoryTableRepository()
+        return Repositories(
+            mode, tables, MemoryOfferRepository(), MemoryNotificationRepository(), MemoryReservationRepository(tables),
+        )
+
+    if mode == "mongo":
+        from .mongo import (
+            MongoNotificationRepository, MongoOfferRepository, MongoReservationRepository, MongoTableRepository,
+        )
+
+        return Repositories(
+            mode, MongoTableRepository(), MongoOfferRepository(), MongoNotificationRepository(),
+            MongoReservationRepository(with_tables=True),
+        )
+
+    if mode in ("split", "sql"):
+        from .sql import SqlNotificationRepository, SqlOfferRepository, SqlReservationRepository, SqlTableRepository
+
+        if mode == "sql":
+            reservations: ReservationRepository = SqlReservationRepository()
+        else:
+            from .mongo import MongoReservationRepository
+
+            reservations = MongoReservationRepository(with_tables=False)
+        return Repositories(
+            mode, SqlTableRepository(), SqlOfferRepository(), SqlNotificationRepository(), reservations,
+        )
+
+    raise ValueError(f"DATA_STORE must be one of {', '.join(DATA_STORES)}, not {mode!r}")
+
+
+def get_repositories() -> Repositories:
+    """The repositories for DATA_STORE, built on first use."""
+    global _repositories
+    if _repositories is None:
+        with _lock:
+            if _repositories is None:
+                _repositories = build_repositories(DATA_STORE)
+    return _repositories
+
+
+def set_repositories(repositories: Optional[Repositories]) -> None:
+    """Replace the process-wide repositories (None rebuilds from DATA_STORE)."""
+    global _repositories
+    with _lock:
+        _repositories = repositories
+
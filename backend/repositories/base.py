@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+# Repositories take and return plain dicts shaped like the API payloads
+# (camelCase keys), whatever the backing store.
+
+
+def table_id(table_number) -> Optional[str]:
+    """Reservations point at tables by number: 3 -> "T003"."""
+    return f"T{str(table_number).zfill(3)}" if table_number else None
+
+
+def table_number(table_id: str) -> Optional[int]:
+    digits = table_id[1:] if table_id else ""
+    return int(digits) if digits.isdigit() else None
+
+
+class TableRepository(ABC):
+    @abstractmethod
+    def all(self) -> List[dict]:
+        """Every table ({tableId, tableName, location, segment, capacity}), by tableId."""
+
+    @abstractmethod
+    def upsert(self, tables: Iterable[dict]) -> None:
+        """Insert or replace tables by tableId."""
+
+
+class OfferRepository(ABC):
+    @abstractmethod
+    def all(self) -> List[dict]:
+        """Every offer ({id, title, type, value, minOrderValue, requiresLoyalty}), by id."""
+
+    @abstractmethod
+    def upsert(self, offers: Iterable[dict]) -> None:
+        """Insert or replace offers by id."""
+
+
+class NotificationRepository(ABC):
+    @abstractmethod
+    def list(
+        self,
+        user_id: Optional[str],
+        before: Optional[datetime],
+        since: Optional[datetime],
+        limit: Optional[int],
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[dict]:
+        """
+        Newest first (createdAt, then id): the user's notifications plus the
+        broadcast ones (no userId), or all of them without a user. `before` /
+        `since` are exclusive bounds on createdAt; `after` is the (createdAt,
+        id) of the last row of the previous page. Items carry createdAt as
+        ISO text.
+        """
+
+    @abstractmethod
+    def unread_count(self, user_id: Optional[str]) -> int:
+        ...
+
+    @abstractmethod
+    def mark_read(self, notification_id: str) -> bool:
+        """False if there is no such notification."""
+
+    @abstractmethod
+    def mark_all_read(self, user_id: Optional[str]) -> int:
+        """Number of notifications changed."""
+
+    @abstractmethod
+    def upsert(self, notifications: Iterable[dict]) -> None:
+        """Insert or replace notifications by id; createdAt is a datetime."""
+
+
+class ReservationRepository(ABC):
+    @abstractmethod
+    def page(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[list],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Reservations by date (newest first) then timeSlot, keyset-paged like pagination.find_page."""
+
+    @abstractmethod
+    def save(self, reservation: dict) -> None:
+        """Insert or replace a reservation by reservationId."""
+
+    @abstractmethod
+    def upsert(self, reservations: Iterable[dict]) -> None:
+        """`save` for a batch, in as few round trips as the store allows."""
+
+    @abstractmethod
+    def delete(self, reservation_id: str, user_id: Optional[str] = None) -> bool:
+        """False if there was no such reservation (belonging to `user_id`, when given)."""
+
+    @abstractmethod
+    def exists(self, date: str, time_slot: str, location: Optional[str], segment: Optional[str]) -> bool:
+        """
+        Whether any reservation matches: `location` as a case-insensitive
+        substring of its location, `segment` as a case-insensitive prefix of
+        its segment (None matches anything).
+        """
+
+    @abstractmethod
+    def reserved_table_numbers(self, date: str, time_slot: str) -> Set[int]:
+        ...
+
+    @abstractmethod
+    def reserved_table_ids(self, date: str, time_slots: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        """
+        Reserved table ids per time slot for a date (all slots when
+        `time_slots` is None). When tables live in the same store this is a
+        single join, and reservations for unknown tables are left out.
+        """
+
+
+class Repositories:
+    """The repositories of one data-store mode."""
+
+    def __init__(
+        self,
+        mode: str,
+        tables: TableRepository,
+        offers: OfferRepository,
+        notifications: NotificationRepository,
+        reservations: ReservationRepository,
+    ):
+        self.mode = mode
+        self.tables = tables
+        self.offers = offers
+        self.notifications = notifications
+        self.reservations = reservations
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+from ..pagination import list_page
+from .base import (
+    NotificationRepository, OfferRepository, ReservationRepository, TableRepository, table_id,
+)
+
+# In-process dicts, for local development and benchmarks without SQLite or
+# Mongo. Nothing is persisted and each worker process has its own copy.
+
+
+class MemoryTableRepository(TableRepository):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: Dict[str, dict] = {}
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return [dict(self._tables[k]) for k in sorted(self._tables)]
+
+    def upsert(self, tables: Iterable[dict]) -> None:
+        with self._lock:
+            for t in tables:
+                self._tables[t["tableId"]] = dict(t)
+
+
+class MemoryOfferRepository(OfferRepository):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._offers: Dict[str, dict] = {}
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return [dict(self._offers[k]) for k in sorted(self._offers)]
+
+    def upsert(self, offers: Iterable[dict]) -> None:
+        with self._lock:
+            for o in offers:
+                self._offers[o["id"]] = {
+                    **o, "minOrderValue": o.get("minOrderValue"), "requiresLoyalty": bool(o.get("requiresLoyalty")),
+                }
+
+
+class MemoryNotificationRepository(NotificationRepository):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._notifications: Dict[str, dict] = {}
+
+    def _visible(self, user_id: Optional[str]) -> List[dict]:
+        rows = self._notifications.values()
+        if user_id:
+            rows = [n for n in rows if n["userId"] in (user_id, None)]
+        return list(rows)
+
+    def list(
+        self,
+        user_id: Optional[str],
+        before: Optional[datetime],
+        since: Optional[datetime],
+        limit: Optional[int],
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[dict]:
+        with self._lock:
+            rows = [
+                n for n in self._visible(user_id)
+                if (before is None or n["createdAt"] < before) and (since is None or n["createdAt"] > since)
+                and (after is None or (n["createdAt"], n["id"]) < after)
+            ]
+        rows.sort(key=lambda n: (n["createdAt"], n["id"]), reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+        return [
+            {**{k: v for k, v in n.items() if k != "userId"}, "createdAt": n["createdAt"].isoformat()}
+            for n in rows
+        ]
+
+    def unread_count(self, user_id: Optional[str]) -> int:
+        with self._lock:
+            return sum(1 for n in self._visible(user_id) if not n["isRead"])
+
+    def mark_read(self, notification_id: str) -> bool:
+        with self._lock:
+            n = self._notifications.get(notification_id)
+            if n is None:
+                return False
+            n["isRead"] = True
+            return True
+
+    def mark_all_read(self, user_id: Optional[str]) -> int:
+        with self._lock:
+            unread = [n for n in self._visible(user_id) if not n["isRead"]]
+            for n in unread:
+                n["isRead"] = True
+            return len(unread)
+
+    def upsert(self, notifications: Iterable[dict]) -> None:
+        with self._lock:
+            for n in notifications:
+                stored = self._notifications.get(n["id"], {})
+                self._notifications[n["id"]] = {
+                    "id": n["id"], "userId": n.get("userId"), "type": n["type"], "title": n["title"],
+                    "message": n["message"], "referenceId": n.get("referenceId"),
+                    "createdAt": n.get("createdAt") or stored.get("createdAt") or datetime.utcnow(),
+                    "isRead": bool(n["isRead"]) if "isRead" in n else stored.get("isRead", False),
+                }
+
+
+_RESERVATION_SORT = [("date", DESCENDING), ("timeSlot", ASCENDING), ("reservationId", DESCENDING)]
+
+
+class MemoryReservationRepository(ReservationRepository):
+    def __init__(self, tables: MemoryTableRepository):
+        self._lock = threading.Lock()
+        self._reservations: Dict[str, dict] = {}
+        self._tables = tables
+
+    def page(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[list],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        with self._lock:
+            rows = [dict(r) for r in self._reservations.values() if not user_id or r["userId"] == user_id]
+        return list_page(rows, _RESERVATION_SORT, limit, cursor)
+
+    def save(self, reservation: dict) -> None:
+        self.upsert([reservation])
+
+    def upsert(self, reservations: Iterable[dict]) -> None:
+        with self._lock:
+            for r in reservations:
+                self._reservations[r["reservationId"]] = {"status": "Confirmed", **r}
+
+    def delete(self, reservation_id: str, user_id: Optional[str] = None) -> bool:
+        with self._lock:
+            stored = self._reservations.get(reservation_id)
+            if stored is None or (user_id is not None and stored.get("userId") != user_id):
+                return False
+            del self._reservations[reservation_id]
+            return True
+
+    def exists(self, date: str, time_slot: str, location: Optional[str], segment: Optional[str]) -> bool:
+        with self._lock:
+            return any(
+                r["date"] == date and r["timeSlot"] == time_slot
+                and (location is None or location.lower() in r["location"].lower())
+                and (segment is None or r["segment"].lower().startswith(segment.lower()))
+                for r in self._reservations.values()
+            )
+
+    def reserved_table_numbers(self, date: str, time_slot: str) -> Set[int]:
+        with self._lock:
+            return {
+                r["tableNumber"] for r in self._reservations.values()
+                if r["date"] == date and r["timeSlot"] == time_slot and r["tableNumber"]
+            }
+
+    def reserved_table_ids(self, date: str, time_slots: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        known = {t["tableId"] for t in self._tables.all()}
+        reserved: Dict[str, Set[str]] = {}
+        with self._lock:
+            for r in self._reservations.values():
+                if r["date"] != date or (time_slots is not None and r["timeSlot"] not in time_slots):
+                    continue
+                tid = table_id(r["tableNumber"])
+                if tid in known:
+                    reserved.setdefault(r["timeSlot"], set()).add(tid)
+        return reserved
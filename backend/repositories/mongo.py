@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pymongo import DESCENDING, ReplaceOne, UpdateOne
+
+from ..mongo import (
+    get_notifications_collection, get_offers_collection, get_reservations_collection,
+    get_tables_collection, utc_now,
+)
+from ..pagination import find_page
+from .base import (
+    NotificationRepository, OfferRepository, ReservationRepository, TableRepository, table_id, table_number,
+)
+
+# Passed to find() as copies: drivers may modify the projection they are given.
+_TABLE_PROJECTION = {"_id": 0, "tableId": 1, "tableName": 1, "location": 1, "segment": 1, "capacity": 1}
+_OFFER_PROJECTION = {"_id": 0, "id": 1, "title": 1, "type": 1, "value": 1, "minOrderValue": 1, "requiresLoyalty": 1}
+_NOTIFICATION_PROJECTION = {
+    "_id": 0, "id": 1, "type": 1, "title": 1, "message": 1, "referenceId": 1, "createdAt": 1, "isRead": 1,
+}
+_RESERVATION_FIELDS = (
+    "reservationId", "userId", "tableNumber", "date", "timeSlot", "guests",
+    "location", "segment", "userName", "userPhone", "status",
+)
+
+
+class MongoTableRepository(TableRepository):
+    def all(self) -> List[dict]:
+        return list(get_tables_collection().find({}, dict(_TABLE_PROJECTION)).sort("tableId", 1))
+
+    def upsert(self, tables: Iterable[dict]) -> None:
+        # tableNumber mirrors reservations.tableNumber for the $lookup join.
+        ops = [
+            ReplaceOne({"tableId": t["tableId"]}, {**t, "tableNumber": table_number(t["tableId"])}, upsert=True)
+            for t in tables
+        ]
+        if ops:
+            get_tables_collection().bulk_write(ops, ordered=False)
+
+
+class MongoOfferRepository(OfferRepository):
+    def all(self) -> List[dict]:
+        return [
+            {**o, "requiresLoyalty": bool(o.get("requiresLoyalty")), "minOrderValue": o.get("minOrderValue")}
+            for o in get_offers_collection().find({}, dict(_OFFER_PROJECTION)).sort("id", 1)
+        ]
+
+    def upsert(self, offers: Iterable[dict]) -> None:
+        ops = [ReplaceOne({"id": o["id"]}, dict(o), upsert=True) for o in offers]
+        if ops:
+            get_offers_collection().bulk_write(ops, ordered=False)
+
+
+class MongoNotificationRepository(NotificationRepository):
+    @staticmethod
+    def _for_user(user_id: Optional[str]) -> dict:
+        return {"$or": [{"userId": user_id}, {"userId": None}]} if user_id else {}
+
+    def list(
+        self,
+        user_id: Optional[str],
+        before: Optional[datetime],
+        since: Optional[datetime],
+        limit: Optional[int],
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[dict]:
+        query = self._for_user(user_id)
+        window = {}
+        if before is not None:
+            window["$lt"] = before
+        if since is not None:
+            window["$gt"] = since
+        if window:
+            query["createdAt"] = window
+        if after is not None:
+            created_at, last_id = after
+            seek = {"$or": [{"createdAt": {"$lt": created_at}}, {"createdAt": created_at, "id": {"$lt": last_id}}]}
+            query = {"$and": [query, seek]} if query else seek
+        docs = get_notifications_collection().find(query, dict(_NOTIFICATION_PROJECTION)).sort(
+            [("createdAt", DESCENDING), ("id", DESCENDING)]
+        )
+        if limit is not None:
+            docs = docs.limit(limit)
+        return [{**n, "createdAt": n["createdAt"].isoformat(), "isRead": bool(n.get("isRead"))} for n in docs]
+
+    def unread_count(self, user_id: Optional[str]) -> int:
+        return get_notifications_collection().count_documents({**self._for_user(user_id), "isRead": False})
+
+    def mark_read(self, notification_id: str) -> bool:
+        result = get_notifications_collection().update_one({"id": notification_id}, {"$set": {"isRead": True}})
+        return result.matched_count > 0
+
+    def mark_all_read(self, user_id: Optional[str]) -> int:
+        result = get_notifications_collection().update_many(
+            {**self._for_user(user_id), "isRead": False}, {"$set": {"isRead": True}},
+        )
+        return result.modified_count
+
+    def upsert(self, notifications: Iterable[dict]) -> None:
+        ops = []
+        for n in notifications:
+            # createdAt and isRead only default on insert, so re-seeding keeps them.
+            doc = {"userId": None, "referenceId": None, **n}
+            on_insert = {}
+            if not doc.get("createdAt"):
+                doc.pop("createdAt", None)
+                on_insert["createdAt"] = datetime.utcnow()
+            if "isRead" not in doc:
+                on_insert["isRead"] = False
+            update = {"$set": doc}
+            if on_insert:
+                update["$setOnInsert"] = on_insert
+            ops.append(UpdateOne({"id": n["id"]}, update, upsert=True))
+        if ops:
+            get_notifications_collection().bulk_write(ops, ordered=False)
+
+
+class MongoReservationRepository(ReservationRepository):
+    """Reservations in Mongo; `with_tables` when tables live in Mongo too."""
+
+    def __init__(self, with_tables: bool):
+        self.with_tables = with_tables
+
+    def page(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[list],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        query = {"userId": user_id} if user_id else {}
+        projection = {"_id": 0, **{f: 1 for f in (fields or _RESERVATION_FIELDS)}}
+        return find_page(get_reservations_collection(), query, [("date", -1), ("timeSlot", 1)], limit, cursor, projection)
+
+    def save(self, reservation: dict) -> None:
+        self.upsert([reservation])
+
+    def upsert(self, reservations: Iterable[dict]) -> None:
+        now = utc_now()
+        ops = []
+        for r in reservations:
+            update = {"$set": {"updatedAt": now, **r}}
+            if "createdAt" not in r:
+                update["$setOnInsert"] = {"createdAt": now}
+            ops.append(UpdateOne({"reservationId": r["reservationId"]}, update, upsert=True))
+        if ops:
+            get_reservations_collection().bulk_write(ops, ordered=False)
+
+    def delete(self, reservation_id: str, user_id: Optional[str] = None) -> bool:
+        query = {"reservationId": reservation_id}
+        if user_id is not None:
+            query["userId"] = user_id
+        return get_reservations_collection().delete_one(query).deleted_count > 0
+
+    def exists(self, date: str, time_slot: str, location: Optional[str], segment: Optional[str]) -> bool:
+        query: dict = {"date": date, "timeSlot": time_slot}
+        if location is not None:
+            query["location"] = {"$regex": re.escape(location), "$options": "i"}
+        if segment is not None:
+            query["segment"] = {"$regex": f"^{re.escape(segment)}", "$options": "i"}
+        return get_reservations_collection().find_one(query, {"_id": 1}) is not None
+
+    def reserved_table_numbers(self, date: str, time_slot: str) -> Set[int]:
+        rows = get_reservations_collection().find({"date": date, "timeSlot": time_slot}, {"_id": 0, "tableNumber": 1})
+        return {int(r["tableNumber"]) for r in rows if r.get("tableNumber")}
+
+    def reserved_table_ids(self, date: str, time_slots: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        match: dict = {"date": date}
+        if time_slots is not None:
+            match["timeSlot"] = time_slots[0] if len(time_slots) == 1 else {"$in": time_slots}
+
+        reserved: Dict[str, Set[str]] = {}
+        if self.with_tables:
+            rows = get_reservations_collection().aggregate([
+                {"$match": match},
+                {"$lookup": {"from": "tables", "localField": "tableNumber", "foreignField": "tableNumber", "as": "table"}},
+                {"$unwind": "$table"},
+                {"$project": {"_id": 0, "timeSlot": 1, "tableId": "$table.tableId"}},
+            ])
+            for r in rows:
+                reserved.setdefault(r["timeSlot"], set()).add(r["tableId"])
+            return reserved
+
+        # Covered by the (date, timeSlot, tableNumber) index.
+        for r in get_reservations_collection().find(match, {"_id": 0, "tableNumber": 1, "timeSlot": 1}):
+            tid = table_id(r.get("tableNumber"))
+            if tid:
+                reserved.setdefault(r.get("timeSlot"), set()).add(tid)
+        return reserved
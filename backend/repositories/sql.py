@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from sqlalchemy import and_, func, or_, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
+
+from ..db import db
+from ..models import Notification, Offer, Table, TableReservation
+from ..pagination import sql_page
+from .base import NotificationRepository, OfferRepository, ReservationRepository, TableRepository
+
+
+def _table_dict(t: Table) -> dict:
+    return {
+        "tableId": t.table_id,
+        "tableName": t.table_name,
+        "location": t.location,
+        "segment": t.segment,
+        "capacity": t.capacity,
+    }
+
+
+def _offer_dict(o: Offer) -> dict:
+    return {
+        "id": o.id,
+        "title": o.title,
+        "type": o.type,
+        "value": o.value,
+        "minOrderValue": o.min_order_value,
+        "requiresLoyalty": bool(o.requires_loyalty),
+    }
+
+
+def _notification_dict(n: Notification) -> dict:
+    return {
+        "id": n.id,
+        "type": n.type,
+        "title": n.title,
+        "message": n.message,
+        "referenceId": n.reference_id,
+        "createdAt": n.created_at.isoformat(),
+        "isRead": bool(n.is_read),
+    }
+
+
+def _reservation_dict(r: TableReservation) -> dict:
+    return {
+        "reservationId": r.reservation_id,
+        "userId": r.user_id,
+        "tableNumber": r.table_number,
+        "date": r.date,
+        "timeSlot": r.time_slot,
+        "guests": r.guests,
+        "location": r.location,
+        "segment": r.segment,
+        "userName": r.user_name,
+        "userPhone": r.user_phone,
+        "status": r.status,
+    }
+
+
+def _upsert(model, rows: List[dict]) -> None:
+    """
+    INSERT ... ON CONFLICT DO UPDATE of a batch, one executemany per set of
+    columns given, then commit. A column a row leaves out takes its default
+    on insert and keeps its stored value on conflict.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    key = [c.name for c in table.primary_key]
+    batches: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in rows:
+        batches.setdefault(tuple(sorted(row)), []).append(row)
+    for columns, batch in batches.items():
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key, set_={name: stmt.excluded[name] for name in columns if name not in key},
+        )
+        db.session.execute(stmt, batch)
+    db.session.commit()
+
+
+class SqlTableRepository(TableRepository):
+    def all(self) -> List[dict]:
+        return [_table_dict(t) for t in Table.query.order_by(Table.table_id.asc())]
+
+    def upsert(self, tables: Iterable[dict]) -> None:
+        _upsert(Table, [
+            {
+                "table_id": t["tableId"], "table_name": t["tableName"], "location": t["location"],
+                "segment": t["segment"], "capacity": t["capacity"],
+            }
+            for t in tables
+        ])
+
+
+class SqlOfferRepository(OfferRepository):
+    def all(self) -> List[dict]:
+        return [_offer_dict(o) for o in Offer.query.order_by(Offer.id.asc())]
+
+    def upsert(self, offers: Iterable[dict]) -> None:
+        _upsert(Offer, [
+            {
+                "id": o["id"], "title": o["title"], "type": o["type"], "value": o["value"],
+                "min_order_value": o.get("minOrderValue"), "requires_loyalty": bool(o.get("requiresLoyalty")),
+            }
+            for o in offers
+        ])
+
+
+# `is_read = 0` rather than `is_read IS false`: only an equality lets SQLite
+# seek ix_notifications_user_read_created on both user_id and is_read.
+_UNREAD = Notification.is_read == False  # noqa: E712
+
+
+class SqlNotificationRepository(NotificationRepository):
+    @staticmethod
+    def _for_user(user_id: Optional[str]):
+        if not user_id:
+            return []
+        return [(Notification.user_id == user_id) | (Notification.user_id.is_(None))]
+
+    def list(
+        self,
+        user_id: Optional[str],
+        before: Optional[datetime],
+        since: Optional[datetime],
+        limit: Optional[int],
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> List[dict]:
+        window = []
+        if before is not None:
+            window.append(Notification.created_at < before)
+        if since is not None:
+            window.append(Notification.created_at > since)
+        if after is not None:
+            created_at, last_id = after
+            window.append(or_(
+                Notification.created_at < created_at,
+                and_(Notification.created_at == created_at, Notification.id < last_id),
+            ))
+
+        newest_first = (Notification.created_at.desc(), Notification.id.desc())
+        if user_id:
+            # The user's rows and the broadcast rows as two index range
+            # scans, merged, rather than one scan for the OR.
+            branches = []
+            for owner in (Notification.user_id == user_id, Notification.user_id.is_(None)):
+                branch = select(Notification).where(owner, *window).order_by(*newest_first)
+                if limit is not None:
+                    branch = branch.limit(limit)
+                branches.append(select(branch.subquery()))
+            merged = union_all(*branches).subquery()
+            row = aliased(Notification, merged)
+            stmt = select(row).order_by(row.created_at.desc(), row.id.desc())
+        else:
+            stmt = select(Notification).where(*window).order_by(*newest_first)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return [_notification_dict(n) for n in db.session.scalars(stmt)]
+
+    def unread_count(self, user_id: Optional[str]) -> int:
+        return Notification.query.filter(_UNREAD, *self._for_user(user_id)).count()
+
+    def mark_read(self, notification_id: str) -> bool:
+        n = db.session.get(Notification, notification_id)
+        if not n:
+            return False
+        n.is_read = True
+        db.session.commit()
+        return True
+
+    def mark_all_read(self, user_id: Optional[str]) -> int:
+        q = Notification.query.filter(_UNREAD, *self._for_user(user_id))
+        # One UPDATE ... WHERE instead of loading and flushing every row.
+        updated = q.update({Notification.is_read: True}, synchronize_session=False)
+        db.session.commit()
+        return updated
+
+    def upsert(self, notifications: Iterable[dict]) -> None:
+        rows = []
+        for n in notifications:
+            row = {
+                "id": n["id"], "user_id": n.get("userId"), "type": n["type"], "title": n["title"],
+                "message": n["message"], "reference_id": n.get("referenceId"),
+            }
+            # Left out when not given, so re-seeding keeps the stored time and read state.
+            if n.get("createdAt"):
+                row["created_at"] = n["createdAt"]
+            if "isRead" in n:
+                row["is_read"] = bool(n["isRead"])
+            rows.append(row)
+        _upsert(Notification, rows)
+
+
+# Table ids are "T" + the zero-padded table number (SQLite printf).
+_reserved_table_id = func.printf("T%03d", TableReservation.table_number)
+
+
+class SqlReservationRepository(ReservationRepository):
+    def page(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[list],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        stmt = select(TableReservation)
+        if user_id:
+            stmt = stmt.where(TableReservation.user_id == user_id)
+        rows, next_cursor = sql_page(db.session, stmt, [
+            (TableReservation.date, DESCENDING),
+            (TableReservation.time_slot, ASCENDING),
+            (TableReservation.reservation_id, DESCENDING),
+        ], limit, cursor)
+        return [_reservation_dict(r) for r in rows], next_cursor
+
+    @staticmethod
+    def _row(r: dict) -> dict:
+        return {
+            "reservation_id": r["reservationId"], "user_id": r["userId"], "table_number": r["tableNumber"],
+            "date": r["date"], "time_slot": r["timeSlot"], "guests": r["guests"], "location": r["location"],
+            "segment": r["segment"], "user_name": r["userName"], "user_phone": r["userPhone"],
+            "status": r.get("status", "Confirmed"),
+        }
+
+    def save(self, reservation: dict) -> None:
+        self.upsert([reservation])
+
+    def upsert(self, reservations: Iterable[dict]) -> None:
+        _upsert(TableReservation, [self._row(r) for r in reservations])
+
+    def delete(self, reservation_id: str, user_id: Optional[str] = None) -> bool:
+        q = TableReservation.query.filter_by(reservation_id=reservation_id)
+        if user_id is not None:
+            q = q.filter_by(user_id=user_id)
+        deleted = q.delete(synchronize_session=False)
+        db.session.commit()
+        return deleted > 0
+
+    def exists(self, date: str, time_slot: str, location: Optional[str], segment: Optional[str]) -> bool:
+        q = TableReservation.query.filter_by(date=date, time_slot=time_slot)
+        if location is not None:
+            q = q.filter(func.lower(TableReservation.location).contains(location.lower(), autoescape=True))
+        if segment is not None:
+            q = q.filter(func.lower(TableReservation.segment).startswith(segment.lower(), autoescape=True))
+        return db.session.query(q.exists()).scalar()
+
+    def reserved_table_numbers(self, date: str, time_slot: str) -> Set[int]:
+        rows = db.session.execute(
+            select(TableReservation.table_number).where(
+                TableReservation.date == date, TableReservation.time_slot == time_slot,
+            )
+        )
+        return {n for (n,) in rows if n}
+
+    def reserved_table_ids(self, date: str, time_slots: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        stmt = (
+            select(TableReservation.time_slot, Table.table_id)
+            .join(Table, Table.table_id == _reserved_table_id)
+            .where(TableReservation.date == date)
+        )
+        if time_slots is not None:
+            stmt = stmt.where(TableReservation.time_slot.in_(time_slots))
+        reserved: Dict[str, Set[str]] = {}
+        for slot, tid in db.session.execute(stmt):
+            reserved.setdefault(slot, set()).add(tid)
+        return reserved
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from typing import Any
 
-import bcrypt
 from flask import Blueprint, request
 
+from ..fields import FieldSet
+from ..hashing import PasswordHasherBusy, password_hasher
+from ..http_cache import cache_policy
 from ..mongo import get_users_collection, utc_now
+from ..sessions import current_user_id, issue_token, require_session
 from ..utils import get_json, json_response
 
 
@@ -16,6 +19,10 @@ def _normalize_email(email: str) -> str:
     return email.strip().lower()
 
 
+# Everything _serialize_user reads; notably not passwordHash.
+USER_FIELDS = FieldSet("name", "email", "phone", "address", "loyaltyPoints", "favorites", "membership")
+
+
 def _serialize_user(doc: dict[str, Any]) -> dict[str, Any]:
     return {
         "name": doc.get("name", ""),
@@ -29,6 +36,15 @@ def _serialize_user(doc: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _session_payload(user_doc: dict[str, Any]) -> dict[str, Any]:
+    token, expires_at = issue_token(user_doc["email"])
+    return {"user": _serialize_user(user_doc), "token": token, "expiresAt": expires_at}
+
+
+def _hasher_busy():
+    return {"error": "too_many_requests"}, 429, {"Retry-After": "1"}
+
+
 def _default_membership() -> dict[str, Any]:
     return {
         "plan": "gold",
@@ -59,7 +75,10 @@ def register_user():
         return json_response({"error": "email_exists"}, 409)
 
     password = str(data["password"])
-    password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    try:
+        password_hash = password_hasher.hash_password(password)
+    except PasswordHasherBusy:
+        return _hasher_busy()
 
     user_doc = {
         "name": str(data["name"]).strip(),
@@ -75,7 +94,7 @@ def register_user():
     }
 
     users.insert_one(user_doc)
-    return json_response({"user": _serialize_user(user_doc)}, 201)
+    return json_response(_session_payload(user_doc), 201)
 
 
 @auth_bp.post("/auth/login")
@@ -93,17 +112,36 @@ def login_user():
         return json_response({"error": "invalid_credentials"}, 401)
 
     password_hash = str(user.get("passwordHash", ""))
-    if not password_hash or not bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8")):
+    if not password_hash:
         return json_response({"error": "invalid_credentials"}, 401)
+    try:
+        if not password_hasher.check_password(password, password_hash):
+            return json_response({"error": "invalid_credentials"}, 401)
+    except PasswordHasherBusy:
+        return _hasher_busy()
+
+    return json_response(_session_payload(user))
 
+
+@auth_bp.get("/auth/session")
+@cache_policy("private, no-cache")
+@require_session
+def session_user():
+    """Profile for the bearer token; lets clients re-authenticate without bcrypt."""
+    user = get_users_collection().find_one({"email": current_user_id()}, USER_FIELDS.projection)
+    if not user:
+        return json_response({"error": "unauthorized"}, 401)
     return json_response({"user": _serialize_user(user)})
 
 
 @auth_bp.patch("/users/<email>")
+@require_session
 def update_user(email: str):
     data = get_json(request)
     users = get_users_collection()
     current_email = _normalize_email(email)
+    if current_user_id() != current_email:
+        return json_response({"error": "forbidden"}, 403)
 
     user = users.find_one({"email": current_email})
     if not user:
@@ -124,7 +162,10 @@ def update_user(email: str):
 
     password = str(data.get("password", "")).strip()
     if password:
-        updates["passwordHash"] = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        try:
+            updates["passwordHash"] = password_hasher.hash_password(password)
+        except PasswordHasherBusy:
+            return _hasher_busy()
 
     if not updates:
         return json_response({"user": _serialize_user(user)})
@@ -132,4 +173,7 @@ def update_user(email: str):
     updates["updatedAt"] = utc_now()
     users.update_one({"email": current_email}, {"$set": updates})
     updated = users.find_one({"email": updates.get("email", current_email)})
+    if "email" in updates and updated:
+        # The old token names the old email; hand out one for the new address.
+        return json_response(_session_payload(updated))
     return json_response({"user": _serialize_user(updated or user)})
@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
-from ..models import MenuItem
+from ..menu_cache import get_menu_snapshot
 from ..utils import get_json, json_response
 
 
 chat_bp = Blueprint("chat", __name__)
 
+MAX_CHAT_ITEMS = 6
+
+
+def _chat_item(item: dict) -> dict:
+    return {key: item[key] for key in ("id", "name", "price", "image", "category", "isVeg")}
+
 
 @chat_bp.post("/chat")
 def chat():
@@ -25,41 +31,15 @@ def chat():
 
     # very small intent handling to keep behavior stable
     if "special" in message:
-        specials = MenuItem.query.filter(MenuItem.todays_special.is_(True)).limit(6).all()
-        return json_response(
-            {
-                "reply": "Here are today's specials.",
-                "items": [
-                    {
-                        "id": i.id,
-                        "name": i.name,
-                        "price": i.price,
-                        "image": i.image,
-                        "category": i.category,
-                        "isVeg": bool(i.is_veg),
-                    }
-                    for i in specials
-                ],
-            }
-        )
+        return json_response({
+            "reply": "Here are today's specials.",
+            "items": [_chat_item(i) for i in get_menu_snapshot().todays_special[:MAX_CHAT_ITEMS]],
+        })
 
     if "popular" in message:
-        popular = MenuItem.query.filter(MenuItem.popular.is_(True)).limit(6).all()
-        return json_response(
-            {
-                "reply": "Here are some popular items.",
-                "items": [
-                    {
-                        "id": i.id,
-                        "name": i.name,
-                        "price": i.price,
-                        "image": i.image,
-                        "category": i.category,
-                        "isVeg": bool(i.is_veg),
-                    }
-                    for i in popular
-                ],
-            }
-        )
+        return json_response({
+            "reply": "Here are some popular items.",
+            "items": [_chat_item(i) for i in get_menu_snapshot().popular[:MAX_CHAT_ITEMS]],
+        })
 
     return json_response({"reply": "I can help with menu, specials, and popular items. Try 'today specials'."})
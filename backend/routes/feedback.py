@@ -5,12 +5,18 @@ from typing import Any
 
 from flask import Blueprint, request
 
+from ..fields import FieldSet, FieldsError, sparse
+from ..http_cache import cache_policy
 from ..mongo import get_feedback_collection, utc_now
+from ..pagination import PageParamsError, find_page, page_params
+from ..sessions import session_owns
 from ..utils import get_json, json_response
 
 
 feedback_bp = Blueprint("feedback", __name__)
 
+FEEDBACK_FIELDS = FieldSet("id", "userId", "orderId", "foodRatings", "likedAspects", "comment", "createdAt")
+
 
 def _serialize_feedback(doc: dict[str, Any]) -> dict[str, Any]:
     return {
@@ -36,6 +42,8 @@ def create_feedback():
     order_id = str(data.get("orderId", "")).strip()
     if not user_id or not order_id:
         return json_response({"error": "invalid_user_or_order"}, 400)
+    if not session_owns(user_id):
+        return json_response({"error": "forbidden"}, 403)
 
     doc = {
         "id": data.get("id") or f"fb-{uuid.uuid4().hex}",
@@ -54,9 +62,15 @@ def create_feedback():
 
 
 @feedback_bp.get("/feedback")
+@cache_policy("private, no-cache")
 def list_feedback():
     user_id = request.args.get("userId")
+    try:
+        limit, cursor = page_params(request)
+        wanted = FEEDBACK_FIELDS.requested(request)
+    except (PageParamsError, FieldsError) as exc:
+        return json_response({"error": str(exc)}, 400)
     query = {"userId": user_id} if user_id else {}
     feedback = get_feedback_collection()
-    rows = list(feedback.find(query).sort([("createdAt", -1)]))
-    return json_response({"items": [_serialize_feedback(r) for r in rows]})
+    rows, next_cursor = find_page(feedback, query, [("createdAt", -1)], limit, cursor, FEEDBACK_FIELDS.projection_for(wanted))
+    return json_response({"items": [sparse(_serialize_feedback(r), wanted) for r in rows], "nextCursor": next_cursor})
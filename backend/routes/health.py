@@ -1,13 +1,42 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
 
-from flask import Blueprint
+from flask import Blueprint, Response
+
+from ..hashing import password_hasher
+from ..http_cache import cache_policy
+from ..metrics import render_prometheus
+from ..mongo import mongo_pool_stats
+from ..utils import json_response
 
 
 health_bp = Blueprint("health", __name__)
 
 
 @health_bp.get("/health")
+@cache_policy("no-store")
 def health():
     return {"ok": True, "time": datetime.utcnow().isoformat() + "Z"}
+
+
+@health_bp.get("/health/password-hashing")
+@cache_policy("no-store")
+def password_hashing_stats():
+    return {"passwordHashing": password_hasher.stats()}
+
+
+@health_bp.get("/health/mongo-pool")
+@cache_policy("no-store")
+def mongo_pool():
+    # Hosts and pool settings are for operators: only served with
+    # MONGO_POOL_STATS=1, e.g. on an instance not exposed publicly.
+    if os.getenv("MONGO_POOL_STATS", "0").strip() != "1":
+        return json_response({"error": "not_found"}, 404)
+    return {"mongoPool": mongo_pool_stats()}
+
+
+@health_bp.get("/metrics")
+def metrics():
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
@@ -1,35 +1,75 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
 from flask import Blueprint, request
 
-from ..db import db
-from ..models import Notification
+from ..http_cache import cache_policy
+from ..pagination import PageParamsError, encode_cursor, page_params
+from ..repositories import get_repositories
 from ..utils import get_json, json_response
 
 
 notifications_bp = Blueprint("notifications", __name__)
 
+def _parse_time(raw: Optional[str]) -> Optional[datetime]:
+    if not raw:
+        return None
+    parsed = datetime.fromisoformat(raw.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
-def serialize_notification(n: Notification) -> dict:
-    return {
-        "id": n.id,
-        "type": n.type,
-        "title": n.title,
-        "message": n.message,
-        "referenceId": n.reference_id,
-        "createdAt": n.created_at.isoformat(),
-        "isRead": bool(n.is_read),
-    }
+def _parse_cursor(cursor: Optional[list]) -> Optional[Tuple[datetime, str]]:
+    if cursor is None:
+        return None
+    if len(cursor) != 2 or not all(isinstance(v, str) for v in cursor):
+        raise PageParamsError("invalid_cursor")
+    try:
+        created_at = _parse_time(cursor[0])
+    except ValueError:
+        created_at = None
+    if created_at is None:
+        raise PageParamsError("invalid_cursor")
+    return created_at, cursor[1]
 
 
 @notifications_bp.get("/notifications")
+@cache_policy("private, no-cache")
 def list_notifications():
+    """
+    Newest first, paged with `limit` / `cursor` like the other lists (the
+    cursor is the createdAt and id of the last row, so rows sharing a
+    timestamp are never skipped). `before` / `since` (ISO timestamps,
+    exclusive) bound the window, e.g. to fetch only what is new. With a
+    userId, the user's notifications plus the broadcast ones.
+    """
+    user_id = request.args.get("userId")
+    try:
+        before = _parse_time(request.args.get("before"))
+        since = _parse_time(request.args.get("since"))
+    except ValueError:
+        return json_response({"error": "invalid_timestamp"}, 400)
+    try:
+        limit, cursor = page_params(request)
+        after = _parse_cursor(cursor)
+    except PageParamsError as exc:
+        return json_response({"error": str(exc)}, 400)
+
+    rows = get_repositories().notifications.list(user_id, before, since, limit, after)
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor([rows[-1]["createdAt"], rows[-1]["id"]])
+    return json_response({"notifications": rows, "nextCursor": next_cursor})
+
+
+@notifications_bp.get("/notifications/unread-count")
+@cache_policy("private, no-cache")
+def unread_count():
     user_id = request.args.get("userId")
-    q = Notification.query
-    if user_id:
-        q = q.filter((Notification.user_id == user_id) | (Notification.user_id.is_(None)))
-    rows = q.order_by(Notification.created_at.desc()).all()
-    return json_response({"notifications": [serialize_notification(n) for n in rows]})
+    return json_response({"unread": get_repositories().notifications.unread_count(user_id)})
 
 
 @notifications_bp.post("/notifications/mark-read")
@@ -39,24 +79,14 @@ def mark_read():
     if not isinstance(nid, str) or not nid:
         return json_response({"error": "id_required"}, 400)
 
-    n = Notification.query.get(nid)
-    if not n:
+    if not get_repositories().notifications.mark_read(nid):
         return json_response({"error": "not_found"}, 404)
 
-    n.is_read = True
-    db.session.commit()
-
     return json_response({"ok": True})
 
 
 @notifications_bp.post("/notifications/mark-all-read")
 def mark_all_read():
     user_id = request.args.get("userId")
-    q = Notification.query
-    if user_id:
-        q = q.filter((Notification.user_id == user_id) | (Notification.user_id.is_(None)))
-    rows = q.all()
-    for n in rows:
-        n.is_read = True
-    db.session.commit()
-    return json_response({"ok": True})
+    updated = get_repositories().notifications.mark_all_read(user_id)
+    return json_response({"ok": True, "updated": updated})
@@ -1,53 +1,102 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
 from flask import Blueprint, request
 
+from ..http_cache import cache_policy
 from ..models import Offer
-from ..utils import json_response
+from ..repositories import get_repositories
+from ..sql_cache import ModelCache
+from ..utils import get_json, json_response
 
 
 offers_bp = Blueprint("offers", __name__)
 
+MAX_BATCH_CARTS = 1000
 
-def serialize_offer(o: Offer) -> dict:
-    return {
-        "id": o.id,
-        "title": o.title,
-        "type": o.type,
-        "value": o.value,
-        "minOrderValue": o.min_order_value,
-        "requiresLoyalty": bool(o.requires_loyalty),
-    }
 
+class OfferBook:
+    """Offers sorted by minimum order value, so eligibility is a bisect."""
 
-@offers_bp.get("/offers")
-def list_offers():
-    offers = Offer.query.order_by(Offer.id.asc()).all()
-    return json_response({"offers": [serialize_offer(o) for o in offers]})
+    def __init__(self, offers: List[dict]):
+        rows = sorted(offers, key=lambda x: (x["minOrderValue"] or 0, x["id"]))
+        self.thresholds = [x["minOrderValue"] or 0 for x in rows]
+        self.offers = rows
+        self.by_id_order = {x["id"]: i for i, x in enumerate(sorted(rows, key=lambda x: x["id"]))}
 
+    def eligible(self, order_value: float, points: int) -> List[dict]:
+        reachable = self.offers[:bisect_right(self.thresholds, order_value)]
+        result = [x for x in reachable if points > 0 or not x["requiresLoyalty"]]
+        result.sort(key=lambda x: self.by_id_order[x["id"]])
+        return result
 
-@offers_bp.get("/offers/eligible")
-def eligible_offers():
+    def best(self, order_value: float, points: int) -> Tuple[Optional[dict], float]:
+        best, best_discount = None, 0.0
+        for offer in self.eligible(order_value, points):
+            discount = offer_discount(offer, order_value)
+            if discount > best_discount:
+                best, best_discount = offer, discount
+        return best, best_discount
+
+
+def offer_discount(offer: dict, order_value: float) -> float:
+    if offer["type"] == "PERCENT":
+        discount = order_value * offer["value"] / 100
+    else:
+        discount = float(offer["value"])
+    return round(min(discount, order_value), 2)
+
+
+_offer_book = ModelCache(lambda: OfferBook(get_repositories().offers.all()), Offer)
+
+
+def _cart_values(subtotal, loyalty_points) -> Tuple[float, int]:
     try:
-        subtotal = float(request.args.get("subtotal", "0"))
-    except ValueError:
+        subtotal = float(subtotal)
+    except (TypeError, ValueError):
         subtotal = 0
     try:
-        loyalty_points = int(request.args.get("loyaltyPoints", "0"))
-    except ValueError:
+        loyalty_points = int(loyalty_points)
+    except (TypeError, ValueError):
         loyalty_points = 0
+    return max(0, subtotal), max(0, loyalty_points)
+
+
+@offers_bp.get("/offers")
+@cache_policy("public, max-age=60")
+def list_offers():
+    return json_response({"offers": get_repositories().offers.all()})
+
+
+@offers_bp.get("/offers/eligible")
+@cache_policy("public, max-age=60")
+def eligible_offers():
+    order_value, points = _cart_values(request.args.get("subtotal", "0"), request.args.get("loyaltyPoints", "0"))
+    return json_response({"offers": _offer_book.get().eligible(order_value, points)})
 
-    order_value = max(0, subtotal)
-    points = max(0, loyalty_points)
 
-    result = []
-    for offer in Offer.query.all():
-        min_value = offer.min_order_value or 0
-        if order_value < min_value:
-            continue
-        if offer.requires_loyalty and points <= 0:
-            continue
-        result.append(serialize_offer(offer))
+@offers_bp.post("/offers/best")
+def best_offers():
+    """Best offer for each cart in `carts` (kiosk pre-pricing)."""
+    data = get_json(request)
+    carts = data.get("carts")
+    if not isinstance(carts, list):
+        return json_response({"error": "carts_required"}, 400)
+    if len(carts) > MAX_BATCH_CARTS:
+        return json_response({"error": "too_many_carts", "max": MAX_BATCH_CARTS}, 400)
 
-    result.sort(key=lambda x: x["id"])
-    return json_response({"offers": result})
+    book = _offer_book.get()
+    results = []
+    for cart in carts:
+        cart = cart if isinstance(cart, dict) else {}
+        order_value, points = _cart_values(cart.get("subtotal", 0), cart.get("loyaltyPoints", 0))
+        offer, discount = book.best(order_value, points)
+        results.append({
+            "cartId": cart.get("id"),
+            "offer": offer,
+            "discount": discount,
+            "total": round(order_value - discount, 2),
+        })
+    return json_response({"results": results})
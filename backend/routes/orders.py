@@ -2,12 +2,24 @@ from __future__ import annotations
 
 from flask import Blueprint, request
 
+from ..fields import FieldSet, FieldsError, sparse
+from ..http_cache import cache_policy
 from ..mongo import get_orders_collection, utc_now
+from ..order_journal import get_order_writer
+from ..pagination import PageParamsError, find_page, overlay_page, page_params
+from ..sessions import session_owns
 from ..utils import get_json, json_response
 
 
 orders_bp = Blueprint("orders", __name__)
 
+# What serialize_order reads; orders also carry createdAt/updatedAt, which
+# the API never returns, so reads leave them (and _id) on the server.
+ORDER_FIELDS = FieldSet(
+    "id", "userId", "items", "subtotal", "tax", "loyaltyDiscount", "loyaltyPointsRedeemed",
+    "total", "status", "type", "date", "deliveryAddress", "invoiceUrl",
+)
+
 
 def serialize_order(doc: dict) -> dict:
     return {
@@ -28,21 +40,45 @@ def serialize_order(doc: dict) -> dict:
 
 
 @orders_bp.get("/orders")
+@cache_policy("private, no-cache")
 def list_orders():
     user_id = request.args.get("userId")
+    try:
+        limit, cursor = page_params(request)
+        wanted = ORDER_FIELDS.requested(request)
+    except (PageParamsError, FieldsError) as exc:
+        return json_response({"error": str(exc)}, 400)
     orders = get_orders_collection()
     query = {"userId": user_id} if user_id else {}
-    rows = list(orders.find(query).sort([("date", -1)]))
-    return json_response({"orders": [serialize_order(o) for o in rows]})
+    writer = get_order_writer()
+    projection = ORDER_FIELDS.projection_for(wanted)
+    if writer is not None:
+        projection["updatedAt"] = 1
+    sort = [("date", -1)]
+    rows, next_cursor = find_page(orders, query, sort, limit, cursor, projection)
+    if writer is not None:
+        # Orders still in a journal, so a new order shows up before its flush.
+        rows = overlay_page(rows, writer.pending_orders(user_id or None), sort, cursor, next_cursor is not None)
+    return json_response({"orders": [sparse(serialize_order(o), wanted) for o in rows], "nextCursor": next_cursor})
 
 
 @orders_bp.get("/orders/<order_id>")
+@cache_policy("private, no-cache")
 def get_order(order_id: str):
-    orders = get_orders_collection()
-    o = orders.find_one({"id": order_id})
+    try:
+        wanted = ORDER_FIELDS.requested(request)
+    except FieldsError as exc:
+        return json_response({"error": str(exc)}, 400)
+    # Read-your-writes: an order this process has not flushed yet.
+    writer = get_order_writer()
+    o = writer.get(order_id) if writer is not None else None
+    if o is None:
+        o = get_orders_collection().find_one({"id": order_id}, ORDER_FIELDS.projection_for(wanted))
+    if o is None and writer is not None:
+        o = writer.find(order_id)  # taken by another worker, not flushed yet
     if not o:
         return json_response({"error": "not_found"}, 404)
-    return json_response(serialize_order(o))
+    return json_response(sparse(serialize_order(o), wanted))
 
 
 @orders_bp.post("/orders")
@@ -60,6 +96,11 @@ def create_order():
     if not isinstance(total, (int, float)):
         return json_response({"error": "total_required"}, 400)
 
+    # Guests check out without a userId; an order filed under a user needs their session.
+    if data.get("userId") is not None and not session_owns(data["userId"]):
+        return json_response({"error": "forbidden"}, 403)
+
+    now = utc_now()
     doc = {
         "id": order_id,
         "userId": data.get("userId"),
@@ -74,12 +115,17 @@ def create_order():
         "date": data.get("date"),
         "deliveryAddress": data.get("deliveryAddress"),
         "invoiceUrl": data.get("invoiceUrl"),
-        "createdAt": utc_now(),
-        "updatedAt": utc_now(),
+        "createdAt": now,
+        "updatedAt": now,
     }
 
-    orders = get_orders_collection()
-    orders.update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
+    # With ORDERS_WRITE_BEHIND=1 the order is acknowledged once journaled
+    # and reaches Mongo with the next batch.
+    writer = get_order_writer()
+    if writer is not None:
+        writer.save(doc)
+    else:
+        get_orders_collection().update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
 
     return json_response(serialize_order(doc), 201)
 
@@ -87,7 +133,12 @@ def create_order():
 @orders_bp.patch("/orders/<order_id>")
 def update_order(order_id: str):
     orders = get_orders_collection()
-    existing = orders.find_one({"id": order_id})
+    writer = get_order_writer()
+    existing = writer.get(order_id) if writer is not None else None
+    if existing is None:
+        existing = orders.find_one({"id": order_id}, {"_id": 0})
+    if existing is None and writer is not None:
+        existing = writer.find(order_id)
     if not existing:
         return json_response({"error": "not_found"}, 404)
 
@@ -100,7 +151,12 @@ def update_order(order_id: str):
 
     if updates:
         updates["updatedAt"] = utc_now()
-        orders.update_one({"id": order_id}, {"$set": updates})
-        existing.update(updates)
+        existing = {**existing, **updates}
+        # The full order goes through the journal too, newer updatedAt and
+        # all, so neither a pending flush nor a replay can undo this update.
+        if writer is not None:
+            writer.save(existing)
+        else:
+            orders.update_one({"id": order_id}, {"$set": updates})
 
     return json_response(serialize_order(existing))
@@ -1,16 +1,39 @@
 from __future__ import annotations
 
+import os
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
+from pymongo import UpdateOne
 
-from ..mongo import get_queue_collection, get_reservations_collection, utc_now
-from ..utils import get_json, json_response
+from ..counters import counter_key, max_position, next_position, release_position
+from ..fields import FieldSet, FieldsError, sparse
+from ..http_cache import cache_policy
+from ..mongo import get_queue_collection, utc_now
+from ..pagination import PageParamsError, find_page, page_params
+from ..queue_events import get_queue_events
+from ..repositories import get_repositories
+from ..sessions import require_session, session_owns
+from ..utils import dumps_json, get_json, json_response
 
 
 queue_bp = Blueprint("queue", __name__)
 
+# /queue/stream sends a comment line this often so proxies keep the connection
+# open, and closes after QUEUE_STREAM_MAX_SECONDS so EventSource reconnects
+# instead of pinning a worker thread forever.
+STREAM_HEARTBEAT_SECONDS = 15.0
+STREAM_MAX_SECONDS = float(os.getenv("QUEUE_STREAM_MAX_SECONDS", "300"))
+# Open streams per worker process. Each one holds a worker thread, so keep
+# this well under GUNICORN_THREADS; past it /queue/stream answers 503 and
+# clients fall back to polling.
+STREAM_MAX_OPEN = int(os.getenv("QUEUE_STREAM_MAX_OPEN", "4"))
+
+# Upper bound on read/fix-up passes in _resequence_queue under contention.
+RESEQUENCE_MAX_PASSES = 5
+
 
 # ─── field mapping ────────────────────────────────────────────────────────────
 # Queue timeSlot:       "07:30-08:50"       (hyphen)
@@ -31,6 +54,13 @@ def map_hall_to_location(hall: str) -> str:
     return mapping.get(hall, hall.lower())
 
 
+QUEUE_FIELDS = FieldSet(
+    "id", "userId", "name", "guests", "notificationMethod", "contact", "hall", "segment",
+    "position", "estimatedWaitMinutes", "joinedAt", "queueDate", "timeSlot", "timeSlotDisplay",
+    "notifiedAt15Min", "tableAvailable", "notificationExpiresAt", "fromReservationCancellation",
+)
+
+
 def serialize_entry(e: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "id": e.get("id"),
@@ -57,9 +87,15 @@ def serialize_entry(e: Dict[str, Any]) -> Dict[str, Any]:
 # ─── routes (static before dynamic!) ─────────────────────────────────────────
 
 @queue_bp.get("/queue")
+@cache_policy("private, no-cache")
 def list_queue():
     queue_date = request.args.get("queueDate")
     user_id = request.args.get("userId")
+    try:
+        limit, cursor = page_params(request)
+        wanted = QUEUE_FIELDS.requested(request)
+    except (PageParamsError, FieldsError) as exc:
+        return json_response({"error": str(exc)}, 400)
 
     queue_col = get_queue_collection()
     query = {}
@@ -68,13 +104,14 @@ def list_queue():
     if user_id:
         query["userId"] = user_id
 
-    entries = list(queue_col.find(query).sort([
+    entries, next_cursor = find_page(queue_col, query, [
         ("queueDate", -1), ("timeSlot", 1), ("position", 1)
-    ]))
-    return json_response({"entries": [serialize_entry(e) for e in entries]})
+    ], limit, cursor, QUEUE_FIELDS.projection_for(wanted))
+    return json_response({"entries": [sparse(serialize_entry(e), wanted) for e in entries], "nextCursor": next_cursor})
 
 
 @queue_bp.post("/queue/join")
+@require_session
 def join_queue():
     data = get_json(request)
 
@@ -82,6 +119,8 @@ def join_queue():
     for k in required:
         if k not in data:
             return json_response({"error": f"{k}_required"}, 400)
+    if not session_owns(data.get("userId", data.get("contact"))):
+        return json_response({"error": "forbidden"}, 403)
 
     queue_col = get_queue_collection()
 
@@ -112,6 +151,13 @@ def join_queue():
     }
 
     queue_col.replace_one({"id": entry["id"]}, entry, upsert=True)
+    get_queue_events().publish(entry["userId"])
+    # A cancel may have compacted the group between taking the position and
+    # the insert above, leaving it duplicated; renumber now the entry is in.
+    positions = _resequence_queue(
+        entry["queueDate"], entry["timeSlot"], entry["guests"], entry["hall"], entry["segment"]
+    )
+    entry["position"] = positions.get(entry["id"], position)
     return json_response(serialize_entry(entry), 201)
 
 
@@ -134,81 +180,96 @@ def check_slot_availability():
     if not all([queue_date, time_slot, hall, segment]):
         return json_response({"error": "missing_parameters"}, 400)
 
-    reservations_col = get_reservations_collection()
-
     reservation_time_slot = QUEUE_TO_RESERVATION_TIMESLOT.get(time_slot, time_slot)
-
-    query: Dict[str, Any] = {
-        "date": queue_date,
-        "timeSlot": reservation_time_slot,
-    }
-
-    if hall != "Any":
-        query["location"] = {"$regex": map_hall_to_location(hall), "$options": "i"}
-
-    if segment != "Any":
-        query["segment"] = {"$regex": f"^{segment}", "$options": "i"}
-
-    reservation = reservations_col.find_one(query)
+    reserved = get_repositories().reservations.exists(
+        queue_date,
+        reservation_time_slot,
+        map_hall_to_location(hall) if hall != "Any" else None,
+        segment if segment != "Any" else None,
+    )
     return json_response({
-        "isReserved": reservation is not None,
-        "available": reservation is None,
+        "isReserved": reserved,
+        "available": not reserved,
     })
 
 
 # ✅ STATIC — frontend polls this every 5s to detect backend-triggered availability
 @queue_bp.get("/queue/poll")
+@cache_policy("no-store")
 def poll_queue_status():
     """
     Frontend polls this every 5 seconds to detect:
     1. tableAvailable set by reservation cancellation (fromReservationCancellation=True)
     2. Auto-expire: if 3 mins passed since notificationExpiresAt → cancel entry automatically
+    Clients that support EventSource should use /queue/stream instead.
     """
     user_id = request.args.get("userId")
     if not user_id:
         return json_response({"error": "userId_required"}, 400)
 
-    queue_col = get_queue_collection()
+    status, _ = _queue_status(user_id)
+    return json_response(status)
 
-    # Check if this user has a tableAvailable=True entry (set by reservation cancellation)
-    notified_entry = queue_col.find_one({"userId": user_id, "tableAvailable": True})
-    if notified_entry:
-        expires_at = notified_entry.get("notificationExpiresAt")
-        if expires_at:
-            try:
-                if isinstance(expires_at, str):
-                    expires_dt = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-                    expires_dt = expires_dt.replace(tzinfo=None)
-                else:
-                    expires_dt = expires_at.replace(tzinfo=None) if expires_at.tzinfo else expires_at
-
-                if datetime.utcnow() > expires_dt:
-                    # 3 minutes passed — auto cancel and resequence
-                    queue_col.delete_one({"userId": user_id})
-                    _resequence_queue(
-                        notified_entry["queueDate"], notified_entry["timeSlot"],
-                        notified_entry["guests"], notified_entry["hall"], notified_entry["segment"],
-                    )
-                    return json_response({"entry": None, "autoExpired": True})
-            except Exception:
-                pass
 
-        return json_response({
-            "entry": serialize_entry(notified_entry),
-            "tableAvailable": True,
-            "fromReservationCancellation": notified_entry.get("fromReservationCancellation", False),
-        })
-
-    # Normal entry — just return current state
-    entry = queue_col.find_one({"userId": user_id})
-    if not entry:
-        return json_response({"entry": None, "tableAvailable": False})
+# ✅ STATIC — Server-Sent Events replacement for /queue/poll
+@queue_bp.get("/queue/stream")
+def stream_queue_status():
+    """
+    Pushes the /queue/poll payload as a `status` event whenever the user's
+    queue state changes. Idle clients sit on a wait and do not touch the DB;
+    the state is only re-read when a queue write for this user is published
+    or when a pending table offer is due to expire. With the in-process broker
+    (which misses writes made by other workers) it is also re-read on every
+    heartbeat.
+    """
+    user_id = request.args.get("userId")
+    if not user_id:
+        return json_response({"error": "userId_required"}, 400)
 
-    return json_response({"entry": serialize_entry(entry), "tableAvailable": False})
+    events = get_queue_events()
+    if events.subscriber_count() >= STREAM_MAX_OPEN:
+        return {"error": "too_many_streams"}, 503, {"Retry-After": "30"}
+
+    def generate():
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        last_sent = None
+        with events.subscribe(user_id) as sub:
+            yield "retry: 5000\n\n"
+            while True:
+                status, expires_in = _queue_status(user_id)
+                payload = dumps_json(status)
+                if payload != last_sent:
+                    last_sent = payload
+                    yield f"event: status\ndata: {payload}\n\n"
+
+                # Sleep until a write for this user is published, sending
+                # heartbeats meanwhile; wake early if an offer is due to expire.
+                wake_at = None if expires_in is None else time.monotonic() + max(expires_in, 0) + 0.5
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        return
+                    if wake_at is not None and now >= wake_at:
+                        break
+                    timeout = min(STREAM_HEARTBEAT_SECONDS, deadline - now)
+                    if wake_at is not None:
+                        timeout = min(timeout, wake_at - now)
+                    if sub.wait(timeout):
+                        break
+                    yield ": keep-alive\n\n"
+                    if not events.cross_process:
+                        break  # a write on another worker would not have woken us
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ✅ STATIC — visit in browser to verify DB contents
 @queue_bp.get("/queue/debug")
+@cache_policy("no-store")
 def debug_queue():
     """Visit /api/queue/debug in browser to verify stored data — remove in production"""
     queue_col = get_queue_collection()
@@ -221,28 +282,39 @@ def debug_queue():
 
 # ✅ DYNAMIC — after all static routes
 @queue_bp.delete("/queue/<entry_id>")
+@require_session
 def cancel_queue(entry_id: str):
     queue_col = get_queue_collection()
 
     entry = queue_col.find_one({"id": entry_id})
     if not entry:
         return json_response({"error": "not_found"}, 404)
-
-    queue_col.delete_one({"id": entry_id})
-    _resequence_queue(
-        entry["queueDate"], entry["timeSlot"],
-        entry["guests"], entry["hall"], entry["segment"]
-    )
+    if not session_owns(entry.get("userId")):
+        return json_response({"error": "forbidden"}, 403)
+
+    # Only the request that actually deleted the entry gives its position
+    # back; a concurrent cancel (or auto-expiry) of the same entry must not
+    # release it a second time.
+    if queue_col.delete_one({"id": entry_id}).deleted_count == 1:
+        _release_position(entry)
+        get_queue_events().publish(entry.get("userId"))
+        _resequence_queue(
+            entry["queueDate"], entry["timeSlot"],
+            entry["guests"], entry["hall"], entry["segment"]
+        )
     return json_response({"ok": True})
 
 
 @queue_bp.patch("/queue/<entry_id>")
+@require_session
 def update_queue_entry(entry_id: str):
     queue_col = get_queue_collection()
 
     entry = queue_col.find_one({"id": entry_id})
     if not entry:
         return json_response({"error": "not_found"}, 404)
+    if not session_owns(entry.get("userId")):
+        return json_response({"error": "forbidden"}, 403)
 
     data = get_json(request)
     update_fields: Dict[str, Any] = {}
@@ -260,6 +332,7 @@ def update_queue_entry(entry_id: str):
 
     if update_fields:
         queue_col.update_one({"id": entry_id}, {"$set": update_fields})
+        get_queue_events().publish(entry.get("userId"))
 
     updated = queue_col.find_one({"id": entry_id})
     return json_response(serialize_entry(updated))
@@ -267,13 +340,75 @@ def update_queue_entry(entry_id: str):
 
 # ─── helpers ─────────────────────────────────────────────────────────────────
 
-def _calculate_position(queue_date: str, time_slot: str, guests: int, hall: str, segment: str) -> int:
+def _parse_expiry(expires_at) -> datetime:
+    if isinstance(expires_at, str):
+        expires_dt = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        return expires_dt.replace(tzinfo=None)
+    return expires_at.replace(tzinfo=None) if expires_at.tzinfo else expires_at
+
+
+def _queue_status(user_id: str) -> Tuple[Dict[str, Any], Optional[float]]:
+    """
+    Current queue state for a user, as returned by /queue/poll, plus the
+    seconds left before a pending table offer expires (None if there is none).
+    Expired offers are cancelled here and the queue is resequenced.
+    """
     queue_col = get_queue_collection()
-    count = queue_col.count_documents({
-        "queueDate": queue_date, "timeSlot": time_slot,
-        "guests": guests, "hall": hall, "segment": segment,
-    })
-    return count + 1
+
+    # Check if this user has a tableAvailable=True entry (set by reservation cancellation)
+    notified_entry = queue_col.find_one({"userId": user_id, "tableAvailable": True}, QUEUE_FIELDS.projection)
+    if notified_entry:
+        expires_in = None
+        expires_at = notified_entry.get("notificationExpiresAt")
+        if expires_at:
+            try:
+                expires_in = (_parse_expiry(expires_at) - datetime.utcnow()).total_seconds()
+                if expires_in < 0:
+                    # 3 minutes passed — auto cancel and resequence, unless
+                    # another stream or a cancel removed the entry first
+                    if queue_col.delete_one({"id": notified_entry["id"]}).deleted_count == 1:
+                        _release_position(notified_entry)
+                        get_queue_events().publish(user_id)
+                        _resequence_queue(
+                            notified_entry["queueDate"], notified_entry["timeSlot"],
+                            notified_entry["guests"], notified_entry["hall"], notified_entry["segment"],
+                        )
+                    return {"entry": None, "autoExpired": True}, None
+            except Exception:
+                expires_in = None
+
+        return {
+            "entry": serialize_entry(notified_entry),
+            "tableAvailable": True,
+            "fromReservationCancellation": notified_entry.get("fromReservationCancellation", False),
+        }, expires_in
+
+    # Normal entry — just return current state
+    entry = queue_col.find_one({"userId": user_id}, QUEUE_FIELDS.projection)
+    if not entry:
+        return {"entry": None, "tableAvailable": False}, None
+
+    return {"entry": serialize_entry(entry), "tableAvailable": False}, None
+
+
+def _position_key(queue_date: str, time_slot: str, guests: int, hall: str, segment: str) -> str:
+    return counter_key("queue", queue_date, time_slot, guests, hall, segment)
+
+
+def _calculate_position(queue_date: str, time_slot: str, guests: int, hall: str, segment: str) -> int:
+    def seed() -> int:
+        return max_position(get_queue_collection(), {
+            "queueDate": queue_date, "timeSlot": time_slot,
+            "guests": guests, "hall": hall, "segment": segment,
+        })
+
+    return next_position(_position_key(queue_date, time_slot, guests, hall, segment), seed)
+
+
+def _release_position(entry: Dict[str, Any]) -> None:
+    release_position(_position_key(
+        entry["queueDate"], entry["timeSlot"], entry["guests"], entry["hall"], entry["segment"],
+    ))
 
 
 def _calculate_wait_time(queue_date: str, time_slot: str) -> float:
@@ -287,15 +422,42 @@ def _calculate_wait_time(queue_date: str, time_slot: str) -> float:
         return 60.0
 
 
-def _resequence_queue(queue_date: str, time_slot: str, guests: int, hall: str, segment: str) -> None:
+def _resequence_queue(queue_date: str, time_slot: str, guests: int, hall: str, segment: str) -> Dict[str, int]:
+    """
+    Renumber a queue group 1..n in joinedAt order, sending only the changed
+    positions in a single bulk_write. Returns the positions by entry id.
+
+    A concurrent join or cancellation can land between our read and our write
+    and leave stale positions behind, so the group is re-read after each write
+    and fixed up until it is consistent. Normally the second read finds nothing
+    to do, so a resequence costs three round trips whatever the queue length
+    (one when nothing moved, as after most joins).
+    """
     queue_col = get_queue_collection()
-    entries = list(queue_col.find({
+    events = get_queue_events()
+    group = {
         "queueDate": queue_date, "timeSlot": time_slot,
         "guests": guests, "hall": hall, "segment": segment,
-    }).sort("joinedAt", 1))
+    }
 
-    for idx, entry in enumerate(entries, start=1):
-        queue_col.update_one({"id": entry["id"]}, {"$set": {"position": idx}})
+    for _ in range(RESEQUENCE_MAX_PASSES):
+        entries = queue_col.find(group, {"_id": 0, "id": 1, "userId": 1, "position": 1}).sort(
+            [("joinedAt", 1), ("id", 1)]
+        )
+        ops = []
+        moved = []
+        positions = {}
+        for idx, entry in enumerate(entries, start=1):
+            positions[entry["id"]] = idx
+            if entry.get("position") != idx:
+                ops.append(UpdateOne({"id": entry["id"]}, {"$set": {"position": idx}}))
+                moved.append(entry.get("userId"))
+        if not ops:
+            return positions
+        queue_col.bulk_write(ops, ordered=False)
+        for user_id in moved:
+            events.publish(user_id)
+    return positions
 
 
 def _get_time_slot_display(time_slot: str) -> str:
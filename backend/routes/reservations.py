@@ -1,24 +1,41 @@
 from __future__ import annotations
 
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
 from flask import Blueprint, request
 
+from ..counters import counter_key, max_position, next_position
+from ..fields import FieldSet, FieldsError, sparse
+from ..http_cache import cache_policy
 from ..models import Table
-from ..mongo import get_reservations_collection, get_waiting_queue_collection
+from ..mongo import get_waiting_queue_collection
 from ..mongo import utc_now
+from ..pagination import PageParamsError, find_page, page_params
+from ..repositories import get_repositories
+from ..sessions import current_user_id, require_session, session_owns
+from ..sql_cache import ModelCache
 from ..utils import get_json, json_response
 
 
 reservations_bp = Blueprint("reservations", __name__)
 
+# Slots offered on the reservation screen, in display order.
+RESERVATION_TIME_SLOTS = [
+    "7:30 AM \u2013 8:50 AM",
+    "9:10 AM \u2013 10:30 AM",
+    "12:00 PM \u2013 1:20 PM",
+    "1:40 PM \u2013 3:00 PM",
+    "6:40 PM \u2013 8:00 PM",
+    "8:20 PM \u2013 9:40 PM",
+]
 
-def serialize_table(t: Table) -> dict:
-    return {
-        "tableId": t.table_id,
-        "tableName": t.table_name,
-        "location": t.location,
-        "segment": t.segment,
-        "capacity": t.capacity,
-    }
+
+RESERVATION_FIELDS = FieldSet(
+    "reservationId", "userId", "tableNumber", "date", "timeSlot", "guests",
+    "location", "segment", "userName", "userPhone", "status",
+)
+WAITING_FIELDS = FieldSet("queueId", "userId", "date", "timeSlot", "guests", "position", "estimatedWait")
 
 
 def serialize_reservation(doc: dict) -> dict:
@@ -49,22 +66,96 @@ def serialize_waiting(doc: dict) -> dict:
     }
 
 
+class TableIndex:
+    """
+    Tables in table_id order, indexed by location, segment and capacity.
+    Filter results are memoized per (location, segment, guests); there are
+    only a handful of distinct combinations in practice.
+    """
+
+    MAX_MEMO = 256
+
+    def __init__(self, tables: List[dict]):
+        self.tables = sorted(tables, key=lambda t: t["tableId"])
+        self.by_location: Dict[str, Set[int]] = {}
+        for pos, t in enumerate(self.tables):
+            self.by_location.setdefault(t["location"].lower(), set()).add(pos)
+        by_capacity = sorted(range(len(self.tables)), key=lambda p: self.tables[p]["capacity"])
+        self._capacities = [self.tables[p]["capacity"] for p in by_capacity]
+        self._by_capacity = by_capacity
+        self._segments: Dict[str, Set[int]] = {}
+        self._matches: Dict[Tuple[str, str, int], List[dict]] = {}
+
+    def _with_segment(self, word: str) -> Set[int]:
+        # Segment filters match on the first word of the requested segment
+        # ("Front side Tables" -> "front"), as a substring of the table's.
+        positions = self._segments.get(word)
+        if positions is None:
+            positions = {p for p, t in enumerate(self.tables) if word in t["segment"].lower()}
+            if len(self._segments) < self.MAX_MEMO:
+                self._segments[word] = positions
+        return positions
+
+    def match(self, location: str, segment: str, guests: int) -> List[dict]:
+        key = (location.lower(), segment.lower(), guests)
+        found = self._matches.get(key)
+        if found is not None:
+            return found
+
+        positions = set(self._by_capacity[bisect_left(self._capacities, guests):])
+        if key[0] != "any":
+            positions &= self.by_location.get(key[0], set())
+        if key[1] != "any":
+            positions &= self._with_segment(key[1].split(" ")[0])
+        found = [self.tables[p] for p in sorted(positions)]
+        if len(self._matches) < self.MAX_MEMO:
+            self._matches[key] = found
+        return found
+
+
+# Rebuilt on SQL writes to tables; with DATA_STORE=mongo or memory, after
+# SQL_CACHE_MAX_AGE_SECONDS.
+_table_index = ModelCache(lambda: TableIndex(get_repositories().tables.all()), Table)
+
+
+def _slot_availability(tables: List[dict], reserved: Set[str]) -> dict:
+    result = [{**t, "isAvailable": t["tableId"] not in reserved} for t in tables]
+    show_waiting = all(not x["isAvailable"] for x in result) and len(result) > 0
+    return {"tables": result, "showWaitingQueueOption": show_waiting}
+
+
+def _availability_filters() -> Optional[Tuple[str, str, int]]:
+    """location, segment and guests from the query string; None if guests is not a number."""
+    location = request.args.get("location", "any")
+    segment = request.args.get("segment", "any")
+    try:
+        guests = int(request.args.get("guests", "2"))
+    except ValueError:
+        return None
+    return location, segment, guests
+
+
 @reservations_bp.get("/tables")
+@cache_policy("public, max-age=60")
 def list_tables():
-    tables = Table.query.order_by(Table.table_id.asc()).all()
-    return json_response({"tables": [serialize_table(t) for t in tables]})
+    return json_response({"tables": _table_index.get().tables})
 
 
 @reservations_bp.get("/reservations")
+@cache_policy("private, no-cache")
 def list_reservations():
     user_id = request.args.get("userId")
-    reservations = get_reservations_collection()
-    query = {"userId": user_id} if user_id else {}
-    res = list(reservations.find(query).sort([("date", -1), ("timeSlot", 1)]))
-    return json_response({"reservations": [serialize_reservation(r) for r in res]})
+    try:
+        limit, cursor = page_params(request)
+        wanted = RESERVATION_FIELDS.requested(request)
+        res, next_cursor = get_repositories().reservations.page(user_id, limit, cursor, wanted)
+    except (PageParamsError, FieldsError) as exc:
+        return json_response({"error": str(exc)}, 400)
+    return json_response({"reservations": [sparse(serialize_reservation(r), wanted) for r in res], "nextCursor": next_cursor})
 
 
 @reservations_bp.post("/reservations")
+@require_session
 def create_reservation():
     data = get_json(request)
 
@@ -72,6 +163,8 @@ def create_reservation():
     for k in required:
         if k not in data:
             return json_response({"error": f"{k}_required"}, 400)
+    if not session_owns(data["userId"]):
+        return json_response({"error": "forbidden"}, 403)
 
     # assign table number if missing
     table_number = data.get("tableNumber")
@@ -92,25 +185,17 @@ def create_reservation():
         "userName": str(data["userName"]),
         "userPhone": str(data["userPhone"]),
         "status": str(data.get("status", "Confirmed")),
-        "createdAt": utc_now(),
-        "updatedAt": utc_now(),
     }
-
-    reservations = get_reservations_collection()
-    reservations.update_one(
-        {"reservationId": doc["reservationId"]},
-        {"$set": doc},
-        upsert=True,
-    )
+    get_repositories().reservations.save(doc)
 
     return json_response(serialize_reservation(doc), 201)
 
 
 @reservations_bp.delete("/reservations/<reservation_id>")
+@require_session
 def delete_reservation(reservation_id: str):
-    reservations = get_reservations_collection()
-    result = reservations.delete_one({"reservationId": reservation_id})
-    if result.deleted_count == 0:
+    # Someone else's reservation is "not found" too, rather than a 403 that confirms it exists.
+    if not get_repositories().reservations.delete(reservation_id, current_user_id()):
         return json_response({"error": "not_found"}, 404)
     return json_response({"ok": True})
 
@@ -122,53 +207,67 @@ def availability():
     if not date or not time_slot:
         return json_response({"error": "date_and_timeSlot_required"}, 400)
 
-    location = request.args.get("location", "any")
-    segment = request.args.get("segment", "any")
-    guests = int(request.args.get("guests", "2"))
-
-    reservations = get_reservations_collection()
-    reserved_table_numbers = {
-        int(r.get("tableNumber", 0))
-        for r in reservations.find({"date": date, "timeSlot": time_slot}, {"tableNumber": 1})
-        if r.get("tableNumber")
-    }
-
-    tables = Table.query.all()
-
-    def match(t: Table):
-        location_match = (location == "any") or (t.location.lower() == location.lower())
-        segment_match = (segment == "any") or (segment.lower().split(" ")[0] in t.segment.lower())
-        capacity_match = t.capacity >= guests
-        return location_match and segment_match and capacity_match
+    filters = _availability_filters()
+    if filters is None:
+        return json_response({"error": "invalid_guests"}, 400)
+    location, segment, guests = filters
+    tables = _table_index.get().match(location, segment, guests)
+    reserved = get_repositories().reservations.reserved_table_ids(date, [time_slot]).get(time_slot, set())
+    return json_response(_slot_availability(tables, reserved))
 
-    filtered = [t for t in tables if match(t)]
 
-    result = []
-    for t in filtered:
-        is_available = t.table_id not in {f"T{str(n).zfill(3)}" for n in reserved_table_numbers}
-        result.append({**serialize_table(t), "isAvailable": is_available})
-
-    show_waiting = all(not x["isAvailable"] for x in result) and len(result) > 0
-
-    return json_response({"tables": result, "showWaitingQueueOption": show_waiting})
+@reservations_bp.get("/reservations/availability/day")
+def availability_for_day():
+    """Availability for every time slot of a date, in one response."""
+    date = request.args.get("date")
+    if not date:
+        return json_response({"error": "date_required"}, 400)
+
+    raw_slots = request.args.get("timeSlots")
+    time_slots = [t.strip() for t in raw_slots.split(",") if t.strip()] if raw_slots else RESERVATION_TIME_SLOTS
+
+    filters = _availability_filters()
+    if filters is None:
+        return json_response({"error": "invalid_guests"}, 400)
+    location, segment, guests = filters
+    tables = _table_index.get().match(location, segment, guests)
+    reserved = get_repositories().reservations.reserved_table_ids(date, time_slots)
+    return json_response({
+        "date": date,
+        "slots": [
+            {"timeSlot": slot, **_slot_availability(tables, reserved.get(slot, set()))}
+            for slot in time_slots
+        ],
+    })
 
 
 @reservations_bp.get("/reservation-waiting-queue")
+@cache_policy("private, no-cache")
 def list_waiting_queue():
     user_id = request.args.get("userId")
+    try:
+        limit, cursor = page_params(request)
+        wanted = WAITING_FIELDS.requested(request)
+    except (PageParamsError, FieldsError) as exc:
+        return json_response({"error": str(exc)}, 400)
     waiting = get_waiting_queue_collection()
     query = {"userId": user_id} if user_id else {}
-    rows = list(waiting.find(query).sort([("date", -1), ("timeSlot", 1), ("position", 1)]))
-    return json_response({"entries": [serialize_waiting(x) for x in rows]})
+    rows, next_cursor = find_page(
+        waiting, query, [("date", -1), ("timeSlot", 1), ("position", 1)], limit, cursor, WAITING_FIELDS.projection_for(wanted),
+    )
+    return json_response({"entries": [sparse(serialize_waiting(x), wanted) for x in rows], "nextCursor": next_cursor})
 
 
 @reservations_bp.post("/reservation-waiting-queue")
+@require_session
 def join_waiting_queue():
     data = get_json(request)
     required = ["queueId", "userId", "date", "timeSlot", "guests"]
     for k in required:
         if k not in data:
             return json_response({"error": f"{k}_required"}, 400)
+    if not session_owns(str(data["userId"])):
+        return json_response({"error": "forbidden"}, 403)
 
     position = _next_waiting_position(str(data["date"]), str(data["timeSlot"]))
     estimated_wait = f"{max(5, position * 10)}-{max(10, position * 10 + 5)} mins"
@@ -195,21 +294,17 @@ def join_waiting_queue():
 
 
 @reservations_bp.delete("/reservation-waiting-queue/<queue_id>")
+@require_session
 def delete_waiting_entry(queue_id: str):
     waiting = get_waiting_queue_collection()
-    result = waiting.delete_one({"queueId": queue_id})
+    result = waiting.delete_one({"queueId": queue_id, "userId": current_user_id()})
     if result.deleted_count == 0:
         return json_response({"error": "not_found"}, 404)
     return json_response({"ok": True})
 
 
 def _get_next_available_table(date: str, time_slot: str):
-    reservations = get_reservations_collection()
-    reserved = {
-        int(r.get("tableNumber", 0))
-        for r in reservations.find({"date": date, "timeSlot": time_slot}, {"tableNumber": 1})
-        if r.get("tableNumber")
-    }
+    reserved = get_repositories().reservations.reserved_table_numbers(date, time_slot)
 
     # Table numbers are 1..12 (mirrors UI)
     for n in range(1, 13):
@@ -219,6 +314,8 @@ def _get_next_available_table(date: str, time_slot: str):
 
 
 def _next_waiting_position(date: str, time_slot: str) -> int:
-    waiting = get_waiting_queue_collection()
-    count = waiting.count_documents({"date": date, "timeSlot": time_slot})
-    return int(count) + 1
+    # Positions are tickets: never reused after a delete, so they stay unique.
+    def seed() -> int:
+        return max_position(get_waiting_queue_collection(), {"date": date, "timeSlot": time_slot})
+
+    return next_position(counter_key("waiting", date, time_slot), seed)
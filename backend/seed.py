@@ -1,42 +1,56 @@
 from __future__ import annotations
 
 import os
+from typing import Optional
 
 try:
     from .app import create_app
     from .db import db
-    from .models import MenuItem, Offer, Table, Notification
-    from .mongo import get_menu_collection
+    from .importer import import_records
 except ImportError:  # pragma: no cover
     from backend.app import create_app
     from backend.db import db
-    from backend.models import MenuItem, Offer, Table, Notification
-    from backend.mongo import get_menu_collection
+    from backend.importer import import_records
 
 
-def _menu_item_doc(item: MenuItem) -> dict:
+def _menu_item(
+    id: str,
+    name: str,
+    description: str,
+    price: int,
+    image: str,
+    category: str,
+    is_veg: bool = True,
+    available: bool = True,
+    popular: bool = False,
+    todays_special: bool = False,
+    calories: int = 0,
+    prep_time: str = "",
+    offer: Optional[str] = None,
+) -> dict:
+    """A menu_items document (see docs/db/menu.md)."""
     return {
-        "id": item.id,
-        "name": item.name,
-        "description": item.description,
-        "price": item.price,
-        "image": item.image,
-        "isVeg": bool(item.is_veg),
-        "category": item.category,
-        "available": bool(item.available),
-        "popular": bool(item.popular),
-        "todaysSpecial": bool(item.todays_special),
-        "calories": item.calories,
-        "prepTime": item.prep_time,
-        "offer": item.offer,
+        "id": id,
+        "name": name,
+        "description": description,
+        "price": price,
+        "image": image,
+        "isVeg": is_veg,
+        "category": category,
+        "available": available,
+        "popular": popular,
+        "todaysSpecial": todays_special,
+        "calories": calories,
+        "prepTime": prep_time,
+        "offer": offer,
     }
 
 
-def seed_menu_items(session):
+def seed_menu_items():
     # Mirrored from src/app/data/menuData.ts
     items = [
         # Veg Starters
-        MenuItem(
+        _menu_item(
             id="v1",
             name="Paneer Tikka",
             description="Grilled cottage cheese marinated in spices",
@@ -49,7 +63,7 @@ def seed_menu_items(session):
             calories=280,
             prep_time="15-20 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="v2",
             name="Vegetable Spring Rolls",
             description="Crispy rolls filled with fresh vegetables",
@@ -62,7 +76,7 @@ def seed_menu_items(session):
             prep_time="12-15 mins",
             offer="15% OFF",
         ),
-        MenuItem(
+        _menu_item(
             id="v3",
             name="Hara Bhara Kabab",
             description="Green vegetable patties with spices",
@@ -76,7 +90,7 @@ def seed_menu_items(session):
         ),
 
         # Veg Main Course
-        MenuItem(
+        _menu_item(
             id="v4",
             name="Dal Makhani",
             description="Creamy black lentils cooked overnight",
@@ -90,7 +104,7 @@ def seed_menu_items(session):
             calories=385,
             prep_time="25-30 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="v5",
             name="Paneer Butter Masala",
             description="Cottage cheese in rich tomato gravy",
@@ -103,7 +117,7 @@ def seed_menu_items(session):
             calories=420,
             prep_time="20-25 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="v6",
             name="Veg Biryani",
             description="Aromatic rice with mixed vegetables",
@@ -116,7 +130,7 @@ def seed_menu_items(session):
             prep_time="30-35 mins",
             offer="10% OFF",
         ),
-        MenuItem(
+        _menu_item(
             id="v7",
             name="Malai Kofta",
             description="Cottage cheese dumplings in creamy sauce",
@@ -128,7 +142,7 @@ def seed_menu_items(session):
             calories=395,
             prep_time="22-28 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="v8",
             name="Chole Bhature",
             description="Spicy chickpeas with fluffy fried bread",
@@ -142,7 +156,7 @@ def seed_menu_items(session):
         ),
 
         # Non-Veg Starters
-        MenuItem(
+        _menu_item(
             id="nv1",
             name="Chicken Tikka",
             description="Grilled chicken pieces marinated in yogurt",
@@ -155,7 +169,7 @@ def seed_menu_items(session):
             calories=310,
             prep_time="18-22 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="nv2",
             name="Fish Amritsari",
             description="Crispy fried fish with spices",
@@ -168,7 +182,7 @@ def seed_menu_items(session):
             prep_time="15-18 mins",
             offer="20% OFF",
         ),
-        MenuItem(
+        _menu_item(
             id="nv3",
             name="Mutton Seekh Kabab",
             description="Minced mutton on skewers",
@@ -182,7 +196,7 @@ def seed_menu_items(session):
         ),
 
         # Non-Veg Main Course
-        MenuItem(
+        _menu_item(
             id="nv4",
             name="Butter Chicken",
             description="Tender chicken in creamy tomato sauce",
@@ -196,7 +210,7 @@ def seed_menu_items(session):
             calories=490,
             prep_time="25-30 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="nv5",
             name="Chicken Biryani",
             description="Aromatic basmati rice with chicken",
@@ -209,7 +223,7 @@ def seed_menu_items(session):
             calories=550,
             prep_time="30-35 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="nv6",
             name="Mutton Rogan Josh",
             description="Slow-cooked mutton in aromatic gravy",
@@ -222,7 +236,7 @@ def seed_menu_items(session):
             prep_time="35-40 mins",
             offer="Free Dessert",
         ),
-        MenuItem(
+        _menu_item(
             id="nv7",
             name="Fish Curry",
             description="Fresh fish in spicy coconut curry",
@@ -234,7 +248,7 @@ def seed_menu_items(session):
             calories=360,
             prep_time="20-25 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="nv8",
             name="Chicken Korma",
             description="Chicken in mild creamy sauce with nuts",
@@ -248,7 +262,7 @@ def seed_menu_items(session):
         ),
 
         # Breads
-        MenuItem(
+        _menu_item(
             id="b1",
             name="Butter Naan",
             description="Soft leavened bread with butter",
@@ -260,7 +274,7 @@ def seed_menu_items(session):
             calories=280,
             prep_time="8-10 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="b2",
             name="Garlic Naan",
             description="Naan bread topped with garlic",
@@ -272,7 +286,7 @@ def seed_menu_items(session):
             calories=290,
             prep_time="8-10 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="b3",
             name="Tandoori Roti",
             description="Whole wheat flatbread",
@@ -286,7 +300,7 @@ def seed_menu_items(session):
         ),
 
         # Desserts
-        MenuItem(
+        _menu_item(
             id="d1",
             name="Gulab Jamun",
             description="Soft milk dumplings in sugar syrup",
@@ -300,7 +314,7 @@ def seed_menu_items(session):
             calories=375,
             prep_time="12-15 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="d2",
             name="Rasmalai",
             description="Cottage cheese discs in sweet milk",
@@ -312,7 +326,7 @@ def seed_menu_items(session):
             calories=285,
             prep_time="10-12 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="d3",
             name="Kulfi",
             description="Traditional Indian ice cream",
@@ -326,7 +340,7 @@ def seed_menu_items(session):
         ),
 
         # Beverages
-        MenuItem(
+        _menu_item(
             id="bv1",
             name="Mango Lassi",
             description="Sweet yogurt drink with mango",
@@ -338,7 +352,7 @@ def seed_menu_items(session):
             calories=180,
             prep_time="3-5 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="bv2",
             name="Masala Chai",
             description="Spiced Indian tea",
@@ -350,7 +364,7 @@ def seed_menu_items(session):
             calories=90,
             prep_time="5-7 mins",
         ),
-        MenuItem(
+        _menu_item(
             id="bv3",
             name="Fresh Lime Soda",
             description="Refreshing lime and soda water",
@@ -364,67 +378,59 @@ def seed_menu_items(session):
         ),
     ]
 
-    for item in items:
-        session.merge(item)
+    # menu_items in Mongo is the only copy; the API reads it through the
+    # snapshot in menu_cache.py (the import bumps its version).
+    import_records("menu_items", items)
 
-    menu = get_menu_collection()
-    for item in items:
-        doc = _menu_item_doc(item)
-        menu.update_one({"id": doc["id"]}, {"$set": doc}, upsert=True)
 
-
-def seed_offers(session):
-    offers = [
-        Offer(id="OFF10", title="10% OFF on orders above ₹500", type="PERCENT", value=10, min_order_value=500),
-        Offer(id="FLAT50", title="Flat ₹50 OFF on orders above ₹700", type="FLAT", value=50, min_order_value=700),
-        Offer(id="LOYAL20", title="Extra ₹20 OFF for loyalty members", type="FLAT", value=20, requires_loyalty=True),
-    ]
-    for offer in offers:
-        session.merge(offer)
+def seed_offers():
+    import_records("offers", [
+        {"id": "OFF10", "title": "10% OFF on orders above ₹500", "type": "PERCENT", "value": 10, "minOrderValue": 500},
+        {"id": "FLAT50", "title": "Flat ₹50 OFF on orders above ₹700", "type": "FLAT", "value": 50, "minOrderValue": 700},
+        {"id": "LOYAL20", "title": "Extra ₹20 OFF for loyalty members", "type": "FLAT", "value": 20, "requiresLoyalty": True},
+    ])
 
 
-def seed_tables(session):
+def seed_tables():
     tables = [
-        Table(table_id="T001", table_name="VIP Table 1", location="VIP Hall", segment="Front", capacity=4),
-        Table(table_id="T002", table_name="VIP Table 2", location="VIP Hall", segment="Middle", capacity=6),
-        Table(table_id="T003", table_name="VIP Table 3", location="VIP Hall", segment="Back", capacity=8),
-        Table(table_id="T004", table_name="AC Table 1", location="AC Hall", segment="Front", capacity=4),
-        Table(table_id="T005", table_name="AC Table 2", location="AC Hall", segment="Middle", capacity=4),
-        Table(table_id="T006", table_name="AC Table 3", location="AC Hall", segment="Middle", capacity=6),
-        Table(table_id="T007", table_name="AC Table 4", location="AC Hall", segment="Back", capacity=2),
-        Table(table_id="T008", table_name="Main Table 1", location="Main Hall", segment="Front", capacity=4),
-        Table(table_id="T009", table_name="Main Table 2", location="Main Hall", segment="Front", capacity=6),
-        Table(table_id="T010", table_name="Main Table 3", location="Main Hall", segment="Middle", capacity=8),
-        Table(table_id="T011", table_name="Main Table 4", location="Main Hall", segment="Back", capacity=2),
-        Table(table_id="T012", table_name="Main Table 5", location="Main Hall", segment="Back", capacity=4),
+        ("T001", "VIP Table 1", "VIP Hall", "Front", 4),
+        ("T002", "VIP Table 2", "VIP Hall", "Middle", 6),
+        ("T003", "VIP Table 3", "VIP Hall", "Back", 8),
+        ("T004", "AC Table 1", "AC Hall", "Front", 4),
+        ("T005", "AC Table 2", "AC Hall", "Middle", 4),
+        ("T006", "AC Table 3", "AC Hall", "Middle", 6),
+        ("T007", "AC Table 4", "AC Hall", "Back", 2),
+        ("T008", "Main Table 1", "Main Hall", "Front", 4),
+        ("T009", "Main Table 2", "Main Hall", "Front", 6),
+        ("T010", "Main Table 3", "Main Hall", "Middle", 8),
+        ("T011", "Main Table 4", "Main Hall", "Back", 2),
+        ("T012", "Main Table 5", "Main Hall", "Back", 4),
     ]
-    for t in tables:
-        session.merge(t)
+    import_records("tables", [
+        {"tableId": tid, "tableName": name, "location": location, "segment": segment, "capacity": capacity}
+        for tid, name, location, segment, capacity in tables
+    ])
 
 
-def seed_notifications(session):
-    seeds = [
-        Notification(
-            id="n-001",
-            user_id=None,
-            type="pending",
-            title="Order Placed",
-            message="Your order has been placed and is awaiting confirmation.",
-            reference_id="ORD-1042",
-            is_read=False,
-        ),
-        Notification(
-            id="n-002",
-            user_id=None,
-            type="pending",
-            title="Order Being Prepared",
-            message="The kitchen has started preparing your order.",
-            reference_id="ORD-1042",
-            is_read=False,
-        ),
-    ]
-    for n in seeds:
-        session.merge(n)
+def seed_notifications():
+    import_records("notifications", [
+        {
+            "id": "n-001",
+            "userId": None,
+            "type": "pending",
+            "title": "Order Placed",
+            "message": "Your order has been placed and is awaiting confirmation.",
+            "referenceId": "ORD-1042",
+        },
+        {
+            "id": "n-002",
+            "userId": None,
+            "type": "pending",
+            "title": "Order Being Prepared",
+            "message": "The kitchen has started preparing your order.",
+            "referenceId": "ORD-1042",
+        },
+    ])
 
 
 def main():
@@ -432,11 +438,11 @@ def main():
 
     with app.app_context():
         db.create_all()
-        seed_menu_items(db.session)
-        seed_offers(db.session)
-        seed_tables(db.session)
-        seed_notifications(db.session)
-        db.session.commit()
+        seed_menu_items()
+        # Tables, offers and notifications land wherever DATA_STORE keeps them.
+        seed_offers()
+        seed_tables()
+        seed_notifications()
 
     print("Seed complete.")
 
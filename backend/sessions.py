@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Optional, Tuple
+
+from flask import Flask, g, request
+
+
+logger = logging.getLogger(__name__)
+
+# Stateless session tokens: "<payload>.<signature>", both base64url, where the
+# payload is {"sub": email, "iat": ..., "exp": ...} and the signature is
+# HMAC-SHA256 over it. Login runs bcrypt once; later requests only pay for an
+# HMAC (or an LRU hit), with no database lookup.
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(12 * 60 * 60)))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "4096"))
+
+# The value shipped in .env.example; anyone could forge tokens with it.
+_PLACEHOLDER_SECRETS = {b"change-me"}
+
+_secret = os.getenv("SESSION_SECRET", "").encode("utf-8")
+if _secret in _PLACEHOLDER_SECRETS:
+    raise RuntimeError(
+        "SESSION_SECRET is the placeholder from .env.example; set a random value "
+        "(python -c \"import secrets; print(secrets.token_hex(32))\") or leave it unset for development."
+    )
+if not _secret:
+    logger.warning("SESSION_SECRET is not set; using a random key, sessions will not survive restarts or span workers.")
+    _secret = secrets.token_bytes(32)
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return base64.urlsafe_b64encode(hmac.new(_secret, payload, hashlib.sha256).digest()).rstrip(b"=")
+
+
+def issue_token(user_id: str) -> Tuple[str, int]:
+    """Signed token for `user_id` (the account email), and its expiry (epoch seconds)."""
+    now = int(time.time())
+    expires_at = now + SESSION_TTL_SECONDS
+    payload = _b64encode(json.dumps({"sub": user_id, "iat": now, "exp": expires_at}, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload.encode('ascii')).decode('ascii')}", expires_at
+
+
+class _VerifiedTokens:
+    """LRU of token -> (user_id, exp) for tokens whose signature checked out."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                self._entries.move_to_end(token)
+            return entry
+
+    def put(self, token: str, entry: Tuple[str, int]) -> None:
+        with self._lock:
+            self._entries[token] = entry
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+_verified = _VerifiedTokens(SESSION_CACHE_SIZE)
+
+
+def verify_token(token: str) -> Optional[str]:
+    """The user id a valid, unexpired token was issued for, else None."""
+    entry = _verified.get(token)
+    if entry is None:
+        try:
+            raw = token.encode("ascii")
+        except UnicodeEncodeError:
+            return None  # not one of ours: they are base64url
+        payload, _, signature = raw.partition(b".")
+        if not payload or not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+            entry = (str(claims["sub"]), int(claims["exp"]))
+        except Exception:
+            return None
+        _verified.put(token, entry)
+
+    user_id, expires_at = entry
+    if expires_at <= time.time():
+        return None
+    return user_id
+
+
+def current_user_id() -> Optional[str]:
+    """Email of the caller's session, if the request carried a valid token."""
+    return g.get("session_user")
+
+
+def session_owns(user_id: Any) -> bool:
+    """Whether the caller's session belongs to `user_id`."""
+    session_user = current_user_id()
+    return session_user is not None and user_id == session_user
+
+
+def require_session(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_user_id() is None:
+            return {"error": "unauthorized"}, 401
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def init_app(app: Flask) -> None:
+    @app.before_request
+    def _load_session():
+        header = request.headers.get("Authorization", "")
+        scheme, _, token = header.partition(" ")
+        g.session_user = verify_token(token.strip()) if scheme.lower() == "bearer" and token else None
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, Set, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+
+T = TypeVar("T")
+
+# Rebuild cached SQL data at least this often, so changes made by another
+# worker process (whose commits we never see) are picked up eventually.
+DEFAULT_MAX_AGE_SECONDS = float(os.getenv("SQL_CACHE_MAX_AGE_SECONDS", "60"))
+
+_PENDING_KEY = "model_caches_to_invalidate"
+
+
+class ModelCache(Generic[T]):
+    """
+    A value derived from one or more SQLAlchemy models, built on first use
+    and rebuilt after any committed ORM insert/update/delete of those models
+    (or bulk query update/delete on them) in this process.
+    """
+
+    def __init__(self, build: Callable[[], T], *models, max_age: float = DEFAULT_MAX_AGE_SECONDS):
+        self._build = build
+        self._tables = {m.__table__ for m in models}
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._built_at = 0.0
+
+        for model in models:
+            for name in ("after_insert", "after_update", "after_delete"):
+                event.listen(model, name, self._on_flush_write)
+        _caches.add(self)
+
+    def get(self) -> T:
+        value = self._value
+        if value is not None and time.monotonic() - self._built_at < self._max_age:
+            return value
+        with self._lock:
+            if self._value is None or time.monotonic() - self._built_at >= self._max_age:
+                self._value = self._build()
+                self._built_at = time.monotonic()
+            return self._value
+
+    def invalidate(self) -> None:
+        # Taking the lock waits out a build that may have read pre-commit rows.
+        with self._lock:
+            self._value = None
+
+    def _on_flush_write(self, mapper, connection, target) -> None:
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(self)
+
+
+_caches: Set[ModelCache] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session) -> None:
+    for cache in session.info.pop(_PENDING_KEY, ()):
+        cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    pending = orm_execute_state.session.info.setdefault(_PENDING_KEY, set())
+    for cache in _caches:
+        if table is None or table in cache._tables:
+            pending.add(cache)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from .db import db
+
+
+# Pragmas applied to every new SQLite connection. WAL lets readers run while
+# a writer commits (the default rollback journal locks the whole file), and
+# synchronous=NORMAL is durable across application crashes in WAL mode while
+# skipping an fsync per commit. busy_timeout makes a connection wait for a
+# competing writer instead of failing at once with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Negative values are KiB: -65536 is a 64 MiB page cache per connection.
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+# Connections kept open per process. Each gunicorn worker has its own pool
+# (see post_fork in gunicorn.conf.py); SQLite serializes writers anyway, so
+# a few connections per process are enough for its threads to read in parallel.
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "5"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "10"))
+
+
+def _is_file_database(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """SQLALCHEMY_ENGINE_OPTIONS for `url`: a bounded pool for file databases."""
+    if not _is_file_database(url):
+        return {}
+    return {
+        "pool_size": SQLITE_POOL_SIZE,
+        "max_overflow": SQLITE_MAX_OVERFLOW,
+        # The busy timeout below does the waiting; the pool itself should
+        # not also block for long.
+        "pool_timeout": 10,
+        "connect_args": {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+    }
+
+
+def apply_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    finally:
+        cursor.close()
+
+
+def install(engine: Engine) -> None:
+    """Run apply_pragmas on every new connection of a SQLite `engine`."""
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", apply_pragmas)
+
+
+def init_app(app: Flask) -> None:
+    """Call right after db.init_app, before anything opens a connection."""
+    with app.app_context():
+        install(db.engine)
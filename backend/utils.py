@@ -3,13 +3,25 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from flask import Request
+from flask import Request, make_response
 
 
 def json_response(obj: Any, status: int = 200):
     return obj, status
 
 
+def etag_response(obj: Any, etag: str, request: Request):
+    """200 with an ETag, or an empty 304 when the client already has `etag`."""
+    # Weak comparison: compression turns the ETag weak (see compression.py).
+    if request.if_none_match.contains_weak(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(obj, 200)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 def get_json(request: Request) -> dict:
     data = request.get_json(silent=True)
     return data if isinstance(data, dict) else {}
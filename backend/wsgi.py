@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from .app import create_app
+
+
+# WSGI entry point for production servers: gunicorn -c backend/gunicorn.conf.py
+app = create_app()
@@ -1,5 +1,5 @@
 import type { User } from "@/app/App";
-import { apiRequest } from "@/api/client";
+import { apiRequest, getSessionToken, setSessionToken } from "@/api/client";
 
 export interface RegisterPayload {
   name: string;
@@ -14,26 +14,51 @@ export interface LoginPayload {
   password: string;
 }
 
+interface SessionResponse {
+  user: User;
+  token?: string;
+  expiresAt?: number;
+}
+
 export async function registerUser(payload: RegisterPayload): Promise<User> {
-  const res = await apiRequest<{ user: User }>("/api/auth/register", {
+  const res = await apiRequest<SessionResponse>("/api/auth/register", {
     method: "POST",
     body: payload,
   });
+  if (res.token) setSessionToken(res.token);
   return res.user;
 }
 
 export async function loginUser(payload: LoginPayload): Promise<User> {
-  const res = await apiRequest<{ user: User }>("/api/auth/login", {
+  const res = await apiRequest<SessionResponse>("/api/auth/login", {
     method: "POST",
     body: payload,
   });
+  if (res.token) setSessionToken(res.token);
   return res.user;
 }
 
+/** Restore the signed-in user from the stored session token, if still valid. */
+export async function fetchSessionUser(): Promise<User | null> {
+  if (!getSessionToken()) return null;
+  try {
+    const res = await apiRequest<{ user: User }>("/api/auth/session");
+    return res.user;
+  } catch {
+    setSessionToken(null);
+    return null;
+  }
+}
+
+export function logoutUser(): void {
+  setSessionToken(null);
+}
+
 export async function updateUserProfile(currentEmail: string, user: User): Promise<User> {
-  const res = await apiRequest<{ user: User }>(`/api/users/${encodeURIComponent(currentEmail)}`, {
+  const res = await apiRequest<SessionResponse>(`/api/users/${encodeURIComponent(currentEmail)}`, {
     method: "PATCH",
     body: user,
   });
+  if (res.token) setSessionToken(res.token);
   return res.user;
 }
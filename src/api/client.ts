@@ -5,6 +5,26 @@ export function getApiBaseUrl(): string {
   return (raw && raw.trim().length > 0 ? raw.trim() : "http://127.0.0.1:5000").replace(/\/+$/, "");
 }
 
+const SESSION_TOKEN_KEY = "sessionToken";
+
+/** Bearer token from /auth/login or /auth/register, sent with every request. */
+export function setSessionToken(token: string | null): void {
+  try {
+    if (token) sessionStorage.setItem(SESSION_TOKEN_KEY, token);
+    else sessionStorage.removeItem(SESSION_TOKEN_KEY);
+  } catch {
+    // storage unavailable (private mode); requests go unauthenticated
+  }
+}
+
+export function getSessionToken(): string | null {
+  try {
+    return sessionStorage.getItem(SESSION_TOKEN_KEY);
+  } catch {
+    return null;
+  }
+}
+
 export async function apiRequest<T>(
   path: string,
   options?: {
@@ -20,6 +40,10 @@ export async function apiRequest<T>(
   const headers: Record<string, string> = {
     Accept: "application/json",
   };
+  const token = getSessionToken();
+  if (token) {
+    headers.Authorization = `Bearer ${token}`;
+  }
 
   let body: string | undefined;
   if (typeof options?.body !== "undefined") {
@@ -48,3 +72,21 @@ export async function apiRequest<T>(
 
   return payload as T;
 }
+
+/**
+ * Every item of a paged list endpoint: the server caps each response at its
+ * default page size, so follow `nextCursor` until the last page.
+ */
+export async function fetchAllPages<T>(path: string, key: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const sep = path.includes("?") ? "&" : "?";
+    const page: Record<string, unknown> = await apiRequest<Record<string, unknown>>(
+      cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path,
+    );
+    items.push(...((page[key] as T[] | undefined) ?? []));
+    cursor = (page.nextCursor as string | null | undefined) ?? null;
+  } while (cursor);
+  return items;
+}
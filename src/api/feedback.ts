@@ -1,4 +1,4 @@
-import { apiRequest } from "@/api/client";
+import { apiRequest, fetchAllPages } from "@/api/client";
 
 export interface FeedbackPayload {
   userId: string;
@@ -28,6 +28,5 @@ export async function submitFeedback(payload: FeedbackPayload): Promise<Feedback
 
 export async function fetchFeedback(userId?: string): Promise<FeedbackEntry[]> {
   const qs = userId ? `?userId=${encodeURIComponent(userId)}` : "";
-  const res = await apiRequest<{ items: FeedbackEntry[] }>(`/api/feedback${qs}`);
-  return res.items;
+  return fetchAllPages<FeedbackEntry>(`/api/feedback${qs}`, "items");
 }
@@ -10,15 +10,30 @@ function mapNotification(n: ApiNotification): AppNotification {
   };
 }
 
-export async function fetchNotifications(userId?: string): Promise<AppNotification[]> {
+export async function fetchNotifications(
+  userId?: string,
+  opts: { limit?: number; before?: string; since?: string } = {},
+): Promise<AppNotification[]> {
   const sp = new URLSearchParams();
   if (userId) sp.set("userId", userId);
+  if (opts.limit) sp.set("limit", String(opts.limit));
+  if (opts.before) sp.set("before", opts.before);
+  if (opts.since) sp.set("since", opts.since);
   const res = await apiRequest<{ notifications: ApiNotification[] }>(
     `/api/notifications${sp.toString() ? `?${sp.toString()}` : ""}`,
   );
   return (res.notifications ?? []).map(mapNotification);
 }
 
+export async function fetchUnreadNotificationCount(userId?: string): Promise<number> {
+  const sp = new URLSearchParams();
+  if (userId) sp.set("userId", userId);
+  const res = await apiRequest<{ unread: number }>(
+    `/api/notifications/unread-count${sp.toString() ? `?${sp.toString()}` : ""}`,
+  );
+  return res.unread ?? 0;
+}
+
 export async function markNotificationRead(id: string): Promise<void> {
   await apiRequest<{ ok: boolean }>("/api/notifications/mark-read", {
     method: "POST",
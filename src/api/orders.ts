@@ -1,4 +1,4 @@
-import { apiRequest } from "@/api/client";
+import { apiRequest, fetchAllPages } from "@/api/client";
 import type { Order } from "@/app/App";
 
 export async function createOrder(order: Order, userId?: string): Promise<Order> {
@@ -14,6 +14,5 @@ export async function createOrder(order: Order, userId?: string): Promise<Order>
 export async function fetchOrders(userId?: string): Promise<Order[]> {
   const sp = new URLSearchParams();
   if (userId) sp.set("userId", userId);
-  const res = await apiRequest<{ orders: Order[] }>(`/api/orders${sp.toString() ? `?${sp.toString()}` : ""}`);
-  return res.orders;
+  return fetchAllPages<Order>(`/api/orders${sp.toString() ? `?${sp.toString()}` : ""}`, "orders");
 }
@@ -1,4 +1,4 @@
-import { apiRequest } from "./client";
+import { apiRequest, fetchAllPages, getApiBaseUrl } from "./client";
 
 export interface QueueEntry {
   id: string;
@@ -64,8 +64,8 @@ export async function fetchQueueEntries(
   if (userId) params.append("userId", userId);
 
   const qs = params.toString() ? `?${params.toString()}` : "";
-  const res = await apiRequest<{ entries: QueueEntryWire[] }>(`/api/queue${qs}`);
-  return res.entries.map(fromWire);
+  const entries = await fetchAllPages<QueueEntryWire>(`/api/queue${qs}`, "entries");
+  return entries.map(fromWire);
 }
 
 export async function joinQueue(
@@ -187,4 +187,57 @@ export async function pollQueueStatus(userId: string): Promise<{
     fromReservationCancellation: res.fromReservationCancellation ?? false,
     autoExpired: res.autoExpired ?? false,
   };
-}
\ No newline at end of file
+}
+
+// ── Push (Server-Sent Events) ─────────────────────────────────────────────────
+
+export type QueueStatus = Awaited<ReturnType<typeof pollQueueStatus>>;
+
+/**
+ * Subscribe to queue state changes for a user. The backend pushes the same
+ * payload as /queue/poll whenever the entry changes. A slow poll runs
+ * alongside the stream as a safety net for missed pushes, and polling takes
+ * over every 5 seconds where EventSource is missing or the server turns the
+ * stream away (503 when a worker has too many open streams).
+ * Returns an unsubscribe function.
+ */
+export function subscribeQueueStatus(
+  userId: string,
+  onStatus: (status: QueueStatus) => void
+): () => void {
+  const poll = () => {
+    pollQueueStatus(userId).then(onStatus).catch((err) => {
+      console.error("Poll error:", err);
+    });
+  };
+
+  if (typeof EventSource === "undefined") {
+    const interval = setInterval(poll, 5000);
+    return () => clearInterval(interval);
+  }
+
+  let interval = setInterval(poll, 30000);
+  const source = new EventSource(
+    `${getApiBaseUrl()}/api/queue/stream?userId=${encodeURIComponent(userId)}`
+  );
+  source.addEventListener("status", (event) => {
+    const res = JSON.parse((event as MessageEvent<string>).data);
+    onStatus({
+      entry: res.entry ? fromWire(res.entry) : null,
+      tableAvailable: res.tableAvailable ?? false,
+      fromReservationCancellation: res.fromReservationCancellation ?? false,
+      autoExpired: res.autoExpired ?? false,
+    });
+  });
+  source.addEventListener("error", () => {
+    // CLOSED means the browser gave up reconnecting (e.g. a 503).
+    if (source.readyState === EventSource.CLOSED) {
+      clearInterval(interval);
+      interval = setInterval(poll, 5000);
+    }
+  });
+  return () => {
+    clearInterval(interval);
+    source.close();
+  };
+}
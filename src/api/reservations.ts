@@ -1,4 +1,4 @@
-import { apiRequest } from "./client";
+import { apiRequest, fetchAllPages } from "./client";
 
 export interface Table {
   tableId: string;
@@ -40,8 +40,7 @@ export async function fetchTables(): Promise<Table[]> {
 
 export async function fetchReservations(userId?: string): Promise<TableReservation[]> {
   const qs = userId ? `?userId=${encodeURIComponent(userId)}` : "";
-  const res = await apiRequest<{ reservations: TableReservation[] }>(`/api/reservations${qs}`);
-  return res.reservations;
+  return fetchAllPages<TableReservation>(`/api/reservations${qs}`, "reservations");
 }
 
 export async function createReservation(reservation: TableReservation): Promise<TableReservation> {
@@ -70,10 +69,34 @@ export async function fetchReservationAvailability(params: {
   return apiRequest<{ tables: Table[]; showWaitingQueueOption: boolean }>(`/api/reservations/availability?${qs.toString()}`);
 }
 
+export interface SlotAvailability {
+  timeSlot: string;
+  tables: Table[];
+  showWaitingQueueOption: boolean;
+}
+
+export async function fetchDayAvailability(params: {
+  date: string;
+  guests: number;
+  location?: string;
+  segment?: string;
+}): Promise<SlotAvailability[]> {
+  const qs = new URLSearchParams({
+    date: params.date,
+    guests: String(params.guests),
+    location: params.location ?? "any",
+    segment: params.segment ?? "any",
+  });
+
+  const res = await apiRequest<{ date: string; slots: SlotAvailability[] }>(
+    `/api/reservations/availability/day?${qs.toString()}`,
+  );
+  return res.slots;
+}
+
 export async function fetchWaitingQueueEntries(userId?: string): Promise<WaitingQueueEntry[]> {
   const qs = userId ? `?userId=${encodeURIComponent(userId)}` : "";
-  const res = await apiRequest<{ entries: WaitingQueueEntry[] }>(`/api/reservation-waiting-queue${qs}`);
-  return res.entries;
+  return fetchAllPages<WaitingQueueEntry>(`/api/reservation-waiting-queue${qs}`, "entries");
 }
 
 export async function joinWaitingQueue(entry: {
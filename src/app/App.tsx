@@ -1,7 +1,7 @@
 import { useEffect, useMemo, useState } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import { createOrder, fetchOrders } from '@/api/orders';
-import { updateUserProfile } from '@/api/auth';
+import { fetchSessionUser, logoutUser, updateUserProfile } from '@/api/auth';
 import TopDashboard from '@/app/components/TopDashboard';
 import Home from '@/app/components/Home';
 import MenuPreview from '@/app/components/MenuPreview';
@@ -221,6 +221,19 @@ export default function App() {
     notifications: []
   });
 
+  useEffect(() => {
+    // Restore the signed-in user after a reload from the stored session token.
+    let cancelled = false;
+    fetchSessionUser().then((user) => {
+      if (cancelled || !user) return;
+      setAppState((prev) => (prev.isLoggedIn ? prev : { ...prev, isLoggedIn: true, user }));
+    });
+
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
   useEffect(() => {
     if (!appState.user) {
       localStorage.removeItem(FAVORITES_STORAGE_KEY);
@@ -280,6 +293,7 @@ export default function App() {
   };
 
   const handleLogout = () => {
+    logoutUser();
     setAppState({
       isLoggedIn: false,
       user: null,
@@ -28,9 +28,9 @@ import {
   updateQueueEntry,
   checkSlotAvailability,
   createReservation,
-  pollQueueStatus,
+  subscribeQueueStatus,
 } from "@/api/queue";
-import type { QueueEntry } from "@/api/queue";
+import type { QueueEntry, QueueStatus } from "@/api/queue";
 
 interface QueueProps {
   queueNumber: number | null;
@@ -162,6 +162,13 @@ export default function Queue({
   const [currentUserEntry, setCurrentUserEntry] = useState<QueueEntry | null>(
     null
   );
+  // Latest entry for the queue subscription, which must not be torn down and
+  // reopened every time the entry object is replaced.
+  const currentUserEntryRef = useRef<QueueEntry | null>(null);
+  currentUserEntryRef.current = currentUserEntry;
+  const currentUserEntryId = currentUserEntry?.id;
+  // Re-renders the countdown every second.
+  const [, setClockTick] = useState(0);
 
   // ─── Slot time helpers ───────────────────────────────────────────────────────
 
@@ -375,20 +382,19 @@ export default function Queue({
     }
   };
 
-  // ─── Poll backend every 5s ────────────────────────────────────────────────────
+  // ─── Subscribe to backend queue pushes ────────────────────────────────────────
   useEffect(() => {
-    if (!currentUserEntry || showAvailabilityDialog || slotExpired) return;
+    if (!currentUserEntryId || showAvailabilityDialog || slotExpired) return;
 
-    const cancellationPoller = setInterval(async () => {
-      if (showAvailabilityDialog) return;
-      if (isSlotEnded(currentUserEntry.queueDate, currentUserEntry.timeSlot)) {
+    const handleStatus = async (pollResult: QueueStatus) => {
+      const entry = currentUserEntryRef.current;
+      if (showAvailabilityDialog || !entry) return;
+      if (isSlotEnded(entry.queueDate, entry.timeSlot)) {
         setSlotExpired(true);
         return;
       }
 
       try {
-        const pollResult = await pollQueueStatus(user.email);
-
         if (!pollResult.entry) {
           await loadQueueData(true);
           return;
@@ -397,7 +403,7 @@ export default function Queue({
         if (
           pollResult.tableAvailable &&
           !pollResult.autoExpired &&
-          !currentUserEntry.tableAvailable
+          !entry.tableAvailable
         ) {
           const reason = pollResult.fromReservationCancellation
             ? "cancellation"
@@ -432,12 +438,12 @@ export default function Queue({
           return prev;
         });
       } catch (err) {
-        console.error("Poll error:", err);
+        console.error("Queue status error:", err);
       }
-    }, 5000);
+    };
 
-    return () => clearInterval(cancellationPoller);
-  }, [currentUserEntry, showAvailabilityDialog, slotExpired, user.email]);
+    return subscribeQueueStatus(user.email, handleStatus);
+  }, [currentUserEntryId, showAvailabilityDialog, slotExpired, user.email]);
 
   // ─── Monitor 15-min window + slot start + slot expiry ────────────────────────
   useEffect(() => {
@@ -506,9 +512,13 @@ export default function Queue({
         }
       }
 
+      const waitMinutes = Math.ceil(minutesUntilSlot);
       setCurrentUserEntry((prev) =>
-        prev ? { ...prev, estimatedWaitMinutes: minutesUntilSlot } : null
+        prev && prev.estimatedWaitMinutes !== waitMinutes
+          ? { ...prev, estimatedWaitMinutes: waitMinutes }
+          : prev
       );
+      setClockTick((tick) => tick + 1);
     }, 1000);
 
     return () => clearInterval(interval);
@@ -5,11 +5,13 @@ import {
   createReservation,
   deleteReservation,
   deleteWaitingQueueEntry,
+  fetchDayAvailability,
   fetchReservationAvailability,
   fetchReservations,
   fetchWaitingQueueEntries,
   joinWaitingQueue,
 } from '@/api/reservations';
+import type { SlotAvailability } from '@/api/reservations';
 import reservationBg from '@/assets/bc26fc098845bd66b4573c68aa0755232c104a7c.png';
 import DatePicker from 'react-datepicker';
 import 'react-datepicker/dist/react-datepicker.css';
@@ -59,6 +61,7 @@ interface WaitingQueueEntry {
 
 // Total tables available (distributed across locations/segments)
 const TOTAL_TABLES = 16;
+const DAY_AVAILABILITY_MAX_AGE_MS = 30_000;
 
 // Sample table dataset (kept in frontend; backend mirrors this)
 const ALL_TABLES: Table[] = [
@@ -179,6 +182,18 @@ export default function Reservation({ user, onNavigate }: ReservationProps) {
   const [viewingAllTables, setViewingAllTables] = useState(false);
   const [showWaitingQueueOption, setShowWaitingQueueOption] = useState(false);
   const [selectedFullSlot, setSelectedFullSlot] = useState<string>('');
+  // Every slot of the checked day in one request; checking another slot of the
+  // same day and filters reuses it for DAY_AVAILABILITY_MAX_AGE_MS.
+  const [dayAvailability, setDayAvailability] = useState<{
+    key: string;
+    fetchedAt: number;
+    slots: SlotAvailability[];
+  } | null>(null);
+
+  useEffect(() => {
+    // A booking or cancellation here changes what is free.
+    setDayAvailability(null);
+  }, [tableReservations]);
 
   // Wrap derived data in useMemo for performance
   const guestOptions = useMemo(() => [1, 2, 3, 4, 5, 6, 7, 8], []);
@@ -368,13 +383,23 @@ export default function Reservation({ user, onNavigate }: ReservationProps) {
     setIsLoading(true);
     try {
       const dateStr = getLocalDateString(checkData.date);
-      const res = await fetchReservationAvailability({
-        date: dateStr,
-        timeSlot: checkData.time,
+      const filters = {
         guests: checkData.guests === 'any' ? 0 : parseInt(checkData.guests),
         location: checkData.location,
         segment: checkData.segment,
-      });
+      };
+      const dayKey = [dateStr, filters.guests, filters.location, filters.segment].join('|');
+      let slots =
+        dayAvailability && dayAvailability.key === dayKey && Date.now() - dayAvailability.fetchedAt < DAY_AVAILABILITY_MAX_AGE_MS
+          ? dayAvailability.slots
+          : null;
+      if (!slots) {
+        slots = await fetchDayAvailability({ date: dateStr, ...filters });
+        setDayAvailability({ key: dayKey, fetchedAt: Date.now(), slots });
+      }
+      const res =
+        slots.find((slot) => slot.timeSlot === checkData.time) ??
+        (await fetchReservationAvailability({ date: dateStr, timeSlot: checkData.time, ...filters }));
 
       // Fetch all reservations for this slot to calculate overall availability
       const totalReservedInSlot = tableReservations.filter(r => r.date === dateStr && r.timeSlot === checkData.time).length;
@@ -1,5 +1,10 @@
 import React, { createContext, useCallback, useContext, useEffect, useMemo, useState } from "react";
-import { fetchNotifications, markAllNotificationsRead, markNotificationRead } from "@/api/notifications";
+import {
+  fetchNotifications,
+  fetchUnreadNotificationCount,
+  markAllNotificationsRead,
+  markNotificationRead,
+} from "@/api/notifications";
 
 export type NotificationType = "success" | "pending" | "failed" | "info";
 
@@ -23,6 +28,8 @@ interface NotificationsContextValue {
 const NotificationsContext = createContext<NotificationsContextValue | null>(null);
 
 const STORAGE_KEY = "notifications.v1";
+// Only the newest page is loaded; the badge uses the server's unread count.
+const NOTIFICATIONS_PAGE_SIZE = 50;
 
 type PersistedNotification = Omit<AppNotification, "createdAt"> & { createdAt: string };
 
@@ -152,9 +159,20 @@ export function NotificationsProvider({ children }: { children: React.ReactNode
     return stored && stored.length > 0 ? stored : seedMockNotifications();
   });
 
+  // Unread count from the server; null until it answers (or if it is down),
+  // in which case the loaded list is counted instead.
+  const [unreadCount, setUnreadCount] = useState<number | null>(null);
+
   useEffect(() => {
     let cancelled = false;
-    fetchNotifications()
+    fetchUnreadNotificationCount()
+      .then((count) => {
+        if (!cancelled) setUnreadCount(count);
+      })
+      .catch(() => {
+        // count the local list instead
+      });
+    fetchNotifications(undefined, { limit: NOTIFICATIONS_PAGE_SIZE })
       .then((items) => {
         if (cancelled) return;
         if (items.length > 0) setNotifications(items);
@@ -176,13 +194,17 @@ export function NotificationsProvider({ children }: { children: React.ReactNode
   }, [notifications]);
 
   const markAsRead = useCallback((id: string) => {
+    if (notifications.some((n) => n.id === id && !n.isRead)) {
+      setUnreadCount((count) => (count === null ? count : Math.max(0, count - 1)));
+    }
     setNotifications((prev) => prev.map((n) => (n.id === id ? { ...n, isRead: true } : n)));
     markNotificationRead(id).catch(() => {
       // ignore; UI stays responsive
     });
-  }, []);
+  }, [notifications]);
 
   const markAllAsRead = useCallback(() => {
+    setUnreadCount((count) => (count === null ? count : 0));
     setNotifications((prev) => prev.map((n) => ({ ...n, isRead: true })));
     markAllNotificationsRead().catch(() => {
       // ignore; UI stays responsive
@@ -190,8 +212,8 @@ export function NotificationsProvider({ children }: { children: React.ReactNode
   }, []);
 
   const getUnreadCount = useCallback(() => {
-    return notifications.reduce((acc, n) => acc + (n.isRead ? 0 : 1), 0);
-  }, [notifications]);
+    return unreadCount ?? notifications.reduce((acc, n) => acc + (n.isRead ? 0 : 1), 0);
+  }, [notifications, unreadCount]);
 
   const value = useMemo<NotificationsContextValue>(
     () => ({